@@ -0,0 +1,182 @@
+import functools
+import json
+from typing import Dict, List
+
+import numpy as np
+from flask import Flask, Response, request
+from pydantic import ValidationError
+
+from immo_rechner.app.metrics import SCENARIOS_PER_REQUEST, SIMULATE_DURATION
+from immo_rechner.core.batch import (
+    SimulationInputError,
+    check_simulatable,
+    simulate_scenarios,
+)
+from immo_rechner.core.cache import get_compiled_calculator
+from immo_rechner.core.profit_calculator import RESULT_COLUMNS, InputParameters
+from immo_rechner.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_N_YEARS = 30
+MAX_N_YEARS = 100
+MAX_BATCH_SIZE = 10_000
+JSON_MIMETYPE = "application/json"
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def to_json_response(payload, status: int = 200) -> Response:
+    return Response(
+        json.dumps(payload, separators=(",", ":"), allow_nan=False),
+        status=status,
+        mimetype=JSON_MIMETYPE,
+    )
+
+
+def to_list(values: np.ndarray) -> list:
+    """
+    Nested lists of floats, with null for nan (e.g., return_rate when renting) and
+    infinite values (e.g., return_rate of own use without any capital), which JSON
+    cannot represent.
+    """
+    non_finite = ~np.isfinite(values)
+    if non_finite.any():
+        return np.where(non_finite, None, values).tolist()
+
+    return values.tolist()
+
+
+def get_n_years() -> int:
+    value = request.args.get("n_years")
+    if value is None:
+        return DEFAULT_N_YEARS
+
+    try:
+        n_years = int(value)
+    except ValueError:
+        raise ApiError(f"n_years should be an integer, got: {value}")
+
+    if not 1 <= n_years <= MAX_N_YEARS:
+        raise ApiError(f"n_years should be between 1 and {MAX_N_YEARS}.")
+
+    return n_years
+
+
+def get_payload():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        raise ApiError("The body should be JSON.")
+
+    return payload
+
+
+def parse_input_params(payload: dict) -> InputParameters:
+    if not isinstance(payload, dict):
+        raise ApiError("InputParameters should be a JSON object.")
+
+    try:
+        return InputParameters(**payload)
+    except ValidationError as e:
+        raise ApiError(json.loads(e.json(include_url=False)))
+
+
+def parse_simulatable_input_params(payload: dict) -> InputParameters:
+    """
+    parse_input_params for parameters of the batch engine, see check_simulatable.
+    """
+    input_params = parse_input_params(payload)
+    try:
+        check_simulatable(input_params)
+    except SimulationInputError as e:
+        raise ApiError(str(e))
+
+    return input_params
+
+
+def handle_api_errors(func):
+    """
+    Turns an ApiError into a JSON response {"error": ...} with its status; any other
+    error is an error of the engine (500).
+    """
+
+    @functools.wraps(func)
+    def wrapper():
+        try:
+            return func()
+        except ApiError as e:
+            return to_json_response(dict(error=e.message), status=e.status)
+
+    return wrapper
+
+
+@handle_api_errors
+def simulate():
+    """
+    POST /api/simulate?n_years=30 with InputParameters as JSON body. Returns the columns
+    year and RESULT_COLUMNS, one value per year. Compiled calculators are shared by
+    repeated requests of the same parameters.
+    """
+    n_years = get_n_years()
+    input_params = parse_simulatable_input_params(get_payload())
+
+    SCENARIOS_PER_REQUEST.observe(1, callback="api_simulate")
+    with SIMULATE_DURATION.time(callback="api_simulate"):
+        columns = get_compiled_calculator(input_params, n_years).simulate_columns()
+
+    return to_json_response(
+        {name: to_list(values) for (name, values) in columns.items()}
+    )
+
+
+@handle_api_errors
+def simulate_batch():
+    """
+    POST /api/simulate/batch?n_years=30 with a JSON list of InputParameters, possibly of
+    mixed usages. Returns year and RESULT_COLUMNS, every column as a list of one list of
+    yearly values per scenario, in the order of the request.
+    """
+    n_years = get_n_years()
+    payload = get_payload()
+    if not isinstance(payload, list) or not payload:
+        raise ApiError("The body should be a non-empty JSON list of InputParameters.")
+    if len(payload) > MAX_BATCH_SIZE:
+        raise ApiError(f"At most {MAX_BATCH_SIZE} scenarios per request.", status=413)
+
+    input_params: List[InputParameters] = []
+    errors: Dict[int, list] = {}
+    for index, item in enumerate(payload):
+        try:
+            input_params.append(parse_simulatable_input_params(item))
+        except ApiError as e:
+            errors[index] = e.message
+    if errors:
+        raise ApiError(errors)
+
+    SCENARIOS_PER_REQUEST.observe(len(input_params), callback="api_simulate_batch")
+    with SIMULATE_DURATION.time(callback="api_simulate_batch"):
+        result = simulate_scenarios(input_params, n_years=n_years)
+
+    return to_json_response(
+        dict(
+            n_scenarios=len(input_params),
+            year=result.years.tolist(),
+            **{name: to_list(result[name]) for name in RESULT_COLUMNS},
+        )
+    )
+
+
+def register_api(server: Flask):
+    server.add_url_rule("/api/simulate", "api_simulate", simulate, methods=["POST"])
+    server.add_url_rule(
+        "/api/simulate/batch",
+        "api_simulate_batch",
+        simulate_batch,
+        methods=["POST"],
+    )
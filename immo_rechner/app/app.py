@@ -1,23 +1,41 @@
+import functools
 import os.path
+import uuid
 
 import click
 import dash_auth
-from dash import Dash, html, dcc, Output, Input
+from dash import Dash, html, dcc, Output, Input, State
 from dotenv import dotenv_values
-from flask import jsonify
+from flask import Response, jsonify
 import dash_bootstrap_components as dbc
 
+from immo_rechner.app.api import register_api
+from immo_rechner.app.background import (
+    get_background_callback_manager,
+    get_background_options,
+    get_progress_controls,
+    with_progress,
+)
 from immo_rechner.app.callbacks import (
-    disable_repayment_range_or_value,
-    disable_monthly_rent,
-    use_own_capital,
+    update_goal_seek,
     update_graph,
+    update_heatmap,
+    warm_start,
+)
+from immo_rechner.app.clientside import (
+    add_clientside_callbacks,
+    get_debounce_toggle,
+    get_request_counter,
+    get_ui_toggles,
 )
 from immo_rechner.app.input_parameters import (
     get_income_table,
     get_cost_table,
     get_additional_params,
+    get_heatmap_params,
+    get_goal_seek_params,
 )
+from immo_rechner.app.metrics import CONTENT_TYPE, registry, timed_callback
 from immo_rechner.core.utils import get_logger
 
 FILE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -29,15 +47,61 @@ CSS_PATHS = [os.path.join(ASSET_PATH, "css", filename) for filename in ["w3.css"
 
 logger = get_logger("app")
 
+# Inputs of update_graph and update_heatmap, see also get_request_counter.
+GRAPH_INPUTS = [
+    Input("repayment-range", "value"),
+    Input("yearly-income", "value"),
+    Input("monthly-rent", "value"),
+    Input("initial-debt", "value"),
+    Input("num-years", "value"),
+    Input("interest-rate", "value"),
+    Input("facility-costs", "value"),
+    Input("facility-costs-owner-share", "value"),
+    Input("purchase-price", "value"),
+    Input("depreciation-rate", "value"),
+    Input("use-repayment-range", "value"),
+    Input("repayment-value", "value"),
+    Input("apt-own-usage", "value"),
+    Input("own-capital-box", "value"),
+    Input("own-capital", "value"),
+    Input("makler-provision", "value"),
+]
+
+HEATMAP_INPUTS = [
+    Input("heatmap-x", "value"),
+    Input("heatmap-y", "value"),
+    Input("heatmap-column", "value"),
+    Input("heatmap-year", "value"),
+    Input("heatmap-resolution", "value"),
+    Input("yearly-income", "value"),
+    Input("monthly-rent", "value"),
+    Input("initial-debt", "value"),
+    Input("interest-rate", "value"),
+    Input("facility-costs", "value"),
+    Input("facility-costs-owner-share", "value"),
+    Input("purchase-price", "value"),
+    Input("depreciation-rate", "value"),
+    Input("repayment-value", "value"),
+    Input("apt-own-usage", "value"),
+    Input("own-capital-box", "value"),
+    Input("own-capital", "value"),
+    Input("makler-provision", "value"),
+]
+
 
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
-def get_app():
-    app = Dash(__name__, external_stylesheets=CSS_PATHS)
-    app.title = "Immobilien Rechner"
-    app.layout = [
+def metrics():
+    return Response(registry.render(), mimetype=CONTENT_TYPE)
+
+
+def get_layout(default_figure, default_graph_state):
+    """
+    Layout of every page load; each page gets its own session id (see RequestCoalescer).
+    """
+    return [
         html.H1(
             children="Immobilien Rechner", className="w3-container w3-2xlarge w3-center"
         ),
@@ -65,49 +129,95 @@ def get_app():
         ),
         html.Div(
             className="w3-container w3-center",
-            children=dcc.Graph(id="graph-cashflow"),
+            children=[get_goal_seek_params()],
+        ),
+        html.Div(
+            className="w3-container w3-center",
+            children=[
+                get_progress_controls("graph"),
+                dcc.Graph(id="graph-cashflow", figure=default_figure),
+                dcc.Store(id="graph-state", data=default_graph_state),
+                dcc.Store(id="session-id", data=uuid.uuid4().hex),
+                dcc.Store(id="graph-request", data=0),
+            ],
+        ),
+        html.Div(
+            className="w3-container w3-center",
+            children=[
+                get_heatmap_params(),
+                get_progress_controls("heatmap"),
+                dcc.Graph(id="graph-heatmap"),
+                dcc.Store(id="heatmap-request", data=0),
+            ],
         ),
     ]
 
-    app.callback(
-        Output("repayment-value", "disabled"),
-        Output("repayment-range", "disabled"),
-        Input("use-repayment-range", "value"),
-    )(disable_repayment_range_or_value)
+
+def get_app():
+    app = Dash(__name__, external_stylesheets=CSS_PATHS)
+    app.title = "Immobilien Rechner"
+
+    # The first page load shows the default figure without waiting for a worker.
+    default_figure, default_graph_state = warm_start()
+    app.layout = functools.partial(get_layout, default_figure, default_graph_state)
+
+    # Pure UI logic runs in the browser, without a request to a worker.
+    add_clientside_callbacks(
+        app,
+        get_ui_toggles()
+        + [
+            get_debounce_toggle(),
+            get_request_counter("graph-request", GRAPH_INPUTS),
+            get_request_counter("heatmap-request", HEATMAP_INPUTS),
+        ],
+    )
+
+    # Heavy callbacks run in the background if a manager is configured, so that the
+    # web workers stay free.
+    manager = get_background_callback_manager()
 
     app.callback(
-        Output("monthly-rent", "disabled"),
-        Output("monthly-rent", "value"),
-        Input("apt-own-usage", "value"),
-    )(disable_monthly_rent)
+        Output("graph-cashflow", "figure"),
+        Output("graph-state", "data"),
+        *GRAPH_INPUTS,
+        Input("graph-request", "data"),
+        State("graph-state", "data"),
+        State("session-id", "data"),
+        **get_background_options(manager, "graph"),
+    )(timed_callback(with_progress(update_graph, manager)))
 
     app.callback(
-        Output("initial-debt", "disabled"),
-        Output("own-capital", "disabled"),
-        Input("own-capital-box", "value"),
-    )(use_own_capital)
+        Output("graph-heatmap", "figure"),
+        *HEATMAP_INPUTS,
+        Input("heatmap-request", "data"),
+        State("session-id", "data"),
+        **get_background_options(manager, "heatmap"),
+    )(timed_callback(with_progress(update_heatmap, manager)))
 
     app.callback(
-        Output("graph-cashflow", "figure"),
-        Input("repayment-range", "value"),
-        Input("yearly-income", "value"),
-        Input("monthly-rent", "value"),
-        Input("initial-debt", "value"),
-        Input("num-years", "value"),
-        Input("interest-rate", "value"),
-        Input("facility-costs", "value"),
-        Input("facility-costs-owner-share", "value"),
-        Input("purchase-price", "value"),
-        Input("depreciation-rate", "value"),
-        Input("use-repayment-range", "value"),
-        Input("repayment-value", "value"),
-        Input("apt-own-usage", "value"),
-        Input("own-capital-box", "value"),
-        Input("own-capital", "value"),
-        Input("makler-provision", "value"),
-    )(update_graph)
+        Output("goal-seek-result", "children"),
+        Input("goal-seek-button", "n_clicks"),
+        State("goal-seek-field", "value"),
+        State("goal-seek-target", "value"),
+        State("goal-seek-year", "value"),
+        State("yearly-income", "value"),
+        State("monthly-rent", "value"),
+        State("initial-debt", "value"),
+        State("interest-rate", "value"),
+        State("facility-costs", "value"),
+        State("facility-costs-owner-share", "value"),
+        State("purchase-price", "value"),
+        State("depreciation-rate", "value"),
+        State("repayment-value", "value"),
+        State("apt-own-usage", "value"),
+        State("own-capital-box", "value"),
+        State("own-capital", "value"),
+        State("makler-provision", "value"),
+    )(timed_callback(update_goal_seek))
 
     app.server.add_url_rule("/health", "health_check", health_check, methods=["GET"])
+    app.server.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+    register_api(app.server)
 
     secrets = dotenv_values()
 
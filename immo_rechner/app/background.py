@@ -0,0 +1,102 @@
+import functools
+import os
+from typing import Callable, Dict, Optional
+
+from dash import Input, Output, html
+
+from immo_rechner.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+BACKGROUND_DIR_ENV = "IMMO_RECHNER_BACKGROUND_DIR"
+
+VISIBLE = dict(visibility="visible")
+HIDDEN = dict(visibility="hidden")
+
+
+def get_background_callback_manager(directory: Optional[str] = None):
+    """
+    DiskcacheManager storing jobs, progress and results in directory (by default
+    IMMO_RECHNER_BACKGROUND_DIR), so no broker is needed. Returns None, i.e., callbacks
+    run in the web worker, if no directory is set or diskcache is not installed.
+    """
+    directory = directory or os.environ.get(BACKGROUND_DIR_ENV)
+    if not directory:
+        return None
+
+    try:
+        import diskcache
+        import multiprocess  # noqa: F401 (needed by DiskcacheManager)
+        import psutil  # noqa: F401
+        from dash import DiskcacheManager
+    except ImportError:
+        logger.warning(
+            "Background callbacks need diskcache, multiprocess and psutil, install "
+            "them with: poetry install --extras background. Running callbacks in the "
+            "worker."
+        )
+        return None
+
+    logger.info(f"Running heavy callbacks in the background, jobs in {directory}")
+    return DiskcacheManager(diskcache.Cache(directory))
+
+
+def get_progress_controls(prefix: str) -> html.Div:
+    """
+    Progress bar and cancel button of a background callback, only shown while it runs.
+    """
+    return html.Div(
+        children=[
+            html.Progress(id=f"{prefix}-progress", value="0", max="1", style=HIDDEN),
+            html.Button(
+                "Cancel",
+                id=f"{prefix}-cancel",
+                n_clicks=0,
+                className="w3-button w3-small w3-light-grey",
+                style=HIDDEN,
+            ),
+        ]
+    )
+
+
+def get_background_options(manager, prefix: str) -> Dict:
+    """
+    Options of app.callback running a callback in the background with the controls of
+    get_progress_controls; no options (i.e., a normal callback) without manager.
+    """
+    if manager is None:
+        return {}
+
+    return dict(
+        background=True,
+        manager=manager,
+        progress=[
+            Output(f"{prefix}-progress", "value"),
+            Output(f"{prefix}-progress", "max"),
+        ],
+        running=[
+            (Output(f"{prefix}-progress", "style"), VISIBLE, HIDDEN),
+            (Output(f"{prefix}-cancel", "style"), VISIBLE, HIDDEN),
+        ],
+        cancel=[Input(f"{prefix}-cancel", "n_clicks")],
+    )
+
+
+def with_progress(func: Callable, manager) -> Callable:
+    """
+    Background callbacks with progress get set_progress as first argument; func takes it
+    as keyword argument set_progress instead.
+    """
+    if manager is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(set_progress, *args):
+        return func(*args, set_progress=set_progress)
+
+    return wrapper
+
+
+def report_progress(set_progress: Optional[Callable], done: int, total: int):
+    if set_progress is not None:
+        set_progress((str(done), str(total)))
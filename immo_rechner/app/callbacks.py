@@ -1,160 +1,144 @@
-from typing import Iterable
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
+from dash import Patch, no_update
+from dash.exceptions import PreventUpdate
 from plotly import express
 from plotly.subplots import make_subplots
 
-from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.app.background import report_progress
+from immo_rechner.app.coalescing import request_coalescer
+from immo_rechner.app.input_parameters import (
+    DEFAULT_INPUTS,
+    GOAL_SEEK_FIELD_LABELS,
+    GOAL_SEEK_TARGET_LABELS,
+    HEATMAP_COLUMNS,
+    SWEEP_AXES,
+)
+from immo_rechner.app.metrics import (
+    FIGURE_DURATION,
+    SCENARIOS_PER_REQUEST,
+    SIMULATE_DURATION,
+    register_cache_metrics,
+    register_coalescer_metrics,
+)
+from immo_rechner.core.cache import simulation_cache
+from immo_rechner.core.goal_seek import goal_seek
+from immo_rechner.core.profit_calculator import InputParameters
+from immo_rechner.core.sweep import SweepResult, sweep
 from immo_rechner.core.tax_contexts import UsageContext
 from immo_rechner.core.utils import get_logger
 
 logger = get_logger(__name__)
 
-
-def disable_repayment_range_or_value(repayment_value):
-    if repayment_value:
-        return True, False
-    else:
-        return False, True
-
-
-def disable_monthly_rent(apt_own_usage):
-    if UsageContext(apt_own_usage) == UsageContext.OWN_USE:
-        return False, 1500
-    elif UsageContext(apt_own_usage) == UsageContext.RENTING:
-        return False, 1500
-    else:
-        raise ValueError(f"Usage not defined: {apt_own_usage}")
-
-
-def use_own_capital(use_own_capital):
-    if use_own_capital:
-        return True, False
-    else:
-        return False, True
+register_cache_metrics(simulation_cache)
+register_coalescer_metrics(request_coalescer)
 
 
 def get_color_map(names: Iterable):
     return {n: c for n, c in zip(names, express.colors.qualitative.Alphabet)}
 
 
-def update_graph(
-    repayment_range,
+def get_input_parameters(
     yearly_income,
     month_rent,
     initial_debt,
-    num_years,
     interest_rate_percentage,
     facility_costs,
     facility_costs_owner_share,
     purchase_price,
     depreciation_precentage,
-    use_repayment_range,
-    repayment_value,
+    repayment_amount,
     apt_own_usage,
     own_capital_box,
     own_capital,
     maker_provision,
-):
-    fig = make_subplots(rows=3, cols=2, vertical_spacing=0.1)
-
+) -> InputParameters:
     usage = UsageContext(apt_own_usage)
     logger.info(f"Using Tax context {usage}")
 
-    if use_repayment_range:
-        repayments = np.arange(*repayment_range, 500)
-    else:
-        repayments = np.array([repayment_value])
+    return InputParameters(
+        usage=usage,
+        yearly_income=yearly_income,
+        monthly_rent=month_rent,
+        facility_monthly_cost=facility_costs,
+        owner_share=facility_costs_owner_share / 100,
+        repayment_amount=repayment_amount,
+        yearly_interest_rate=interest_rate_percentage / 100,
+        initial_debt=initial_debt,
+        depreciation_rate=depreciation_precentage / 100,
+        purchase_price=purchase_price,
+        own_capital=own_capital if own_capital_box else None,
+        makler=maker_provision / 100,
+    )
 
-    color_maps = get_color_map(repayments)
-
-    for repayment in repayments:
-        input_parameters = InputParameters(
-            usage=usage,
-            yearly_income=yearly_income,
-            monthly_rent=month_rent,
-            facility_monthly_cost=facility_costs,
-            owner_share=facility_costs_owner_share / 100,
-            repayment_amount=repayment,
-            yearly_interest_rate=interest_rate_percentage / 100,
-            initial_debt=initial_debt,
-            depreciation_rate=depreciation_precentage / 100,
-            purchase_price=purchase_price,
-            own_capital=own_capital if own_capital_box else None,
-            makler=maker_provision / 100,
-        )
 
-        profit_calculater = ProfitCalculator.from_input_params(input_parameters)
-        df = profit_calculater.simulate(n_years=num_years)
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=df.cashflow,
-                name=f"repayment: {repayment}",
-                marker=dict(color=color_maps[repayment]),
-            ),
-            row=1,
-            col=1,
-        ).update_layout(
-            yaxis_title=dict(text="Cash flow (EUR)"),
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=df.tax_benefit,
-                marker=dict(color=color_maps[repayment]),
-                showlegend=False,
-            ),
-            row=2,
-            col=1,
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=df.remaining_debt,
-                marker=dict(color=color_maps[repayment]),
-                showlegend=False,
-            ),
-            row=1,
-            col=2,
-        )
+# Traces of one scenario as (column, scale, row, col), in the order they are added.
+SCENARIO_TRACES = [
+    ("cashflow", 1, 1, 1),
+    ("tax_benefit", 1, 2, 1),
+    ("remaining_debt", 1, 1, 2),
+    ("yearly_interest_cost", 1, 2, 2),
+    ("return_rate", 100, 3, 1),
+    ("cumulative_profit_before_tax", 1, 3, 2),
+]
 
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=df.yearly_interest_cost,
-                marker=dict(color=color_maps[repayment]),
-                showlegend=False,
-            ),
-            row=2,
-            col=2,
-        )
 
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=100 * df.return_rate,
-                marker=dict(color=color_maps[repayment]),
-                showlegend=False,
-            ),
-            row=3,
-            col=1,
-        )
+def get_trace_digest(x: np.ndarray, y: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(np.ascontiguousarray(x, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def get_trace_values(dfs: List[pd.DataFrame]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns (x, y) of all traces in the order of the figure.
+    """
+    return [
+        (df.year.to_numpy(), scale * df[column].to_numpy())
+        for df in dfs
+        for (column, scale, _, _) in SCENARIO_TRACES
+    ]
 
-        fig.add_trace(
-            go.Scatter(
-                x=df.year,
-                y=df.cumulative_profit_before_tax,
-                marker=dict(color=color_maps[repayment]),
-                showlegend=False,
-            ),
-            row=3,
-            col=2,
-        )
+
+def get_graph_state(
+    scenario_names: List[str], trace_values: List, annotation: str
+) -> Dict:
+    """
+    Small description of the figure shown in the browser, kept in a dcc.Store, so that
+    the next update can send only what changed.
+    """
+    return dict(
+        scenario_names=scenario_names,
+        digests=[get_trace_digest(x, y) for (x, y) in trace_values],
+        annotation=annotation,
+    )
+
+
+def build_figure(
+    scenario_names: List[str], trace_values: List, annotation: str
+) -> go.Figure:
+    fig = make_subplots(rows=3, cols=2, vertical_spacing=0.1)
+
+    color_maps = get_color_map(scenario_names)
+
+    for index, name in enumerate(scenario_names):
+        for trace_index, (_, _, row, col) in enumerate(SCENARIO_TRACES):
+            x, y = trace_values[index * len(SCENARIO_TRACES) + trace_index]
+            legend = dict(name=name) if trace_index == 0 else dict(showlegend=False)
+            fig.add_trace(
+                go.Scatter(x=x, y=y, marker=dict(color=color_maps[name]), **legend),
+                row=row,
+                col=col,
+            )
 
     fig.add_annotation(
-        text=f"Initial debt: {profit_calculater.initial_debt}",
+        text=annotation,
         row=1,
         col=2,
         showarrow=False,
@@ -165,6 +149,7 @@ def update_graph(
     fig.update_layout(
         xaxis5_title=dict(text="Year"),
         xaxis6_title=dict(text="Year"),
+        yaxis_title=dict(text="Cash flow (EUR)"),
         yaxis2_title=dict(text="Remaining debt (EUR)"),
         yaxis3_title=dict(text="Tax benefit (EUR)"),
         yaxis4_title=dict(text="Yearly interest cost (EUR)"),
@@ -173,3 +158,376 @@ def update_graph(
     )
 
     return fig
+
+
+def patch_figure(graph_state: Dict, trace_values: List, annotation: str):
+    """
+    Patch of the figure described by graph_state, containing only the changed traces and
+    annotation, or no_update if nothing changed.
+    """
+    patch = Patch()
+    n_changes = 0
+
+    for index, (x, y) in enumerate(trace_values):
+        if get_trace_digest(x, y) != graph_state["digests"][index]:
+            patch["data"][index]["x"] = x
+            patch["data"][index]["y"] = y
+            n_changes += 1
+
+    if annotation != graph_state["annotation"]:
+        patch["layout"]["annotations"][0]["text"] = annotation
+        n_changes += 1
+
+    logger.info(f"Patching {n_changes} elements of the figure")
+
+    return patch if n_changes else no_update
+
+
+def get_inputs_key(inputs: Dict) -> str:
+    """
+    Key of the inputs of update_graph. Numbers are compared as floats, since the browser
+    may send 1500 as well as 1500.0.
+    """
+
+    def normalize(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    return json.dumps(
+        {name: normalize(value) for (name, value) in inputs.items()}, sort_keys=True
+    )
+
+
+class PresetFigures:
+    """
+    Figures (as dicts) and graph states of update_graph for fixed inputs, computed once
+    per worker by warm_start.
+    """
+
+    def __init__(self):
+        self.figures: Dict[str, Tuple[Dict, Dict]] = {}
+
+    def __len__(self):
+        return len(self.figures)
+
+    def get(self, inputs: Dict) -> Optional[Tuple[Dict, Dict]]:
+        return self.figures.get(get_inputs_key(inputs))
+
+    def add(self, inputs: Dict, figure: Dict, graph_state: Dict):
+        self.figures[get_inputs_key(inputs)] = (figure, graph_state)
+
+
+preset_figures = PresetFigures()
+
+# Changes of DEFAULT_INPUTS whose figures are computed by warm_start; the first one is
+# the figure of the initial page.
+WARM_START_PRESETS = [
+    dict(),
+    dict(use_repayment_range=["Use Range"]),
+    dict(apt_own_usage=UsageContext.OWN_USE.value),
+]
+
+# Number of passes of the repayment sweep of update_graph, i.e., checkpoints for stale
+# requests and steps of its progress bar.
+GRAPH_CHUNKS = 5
+
+
+def update_graph(
+    repayment_range,
+    yearly_income,
+    month_rent,
+    initial_debt,
+    num_years,
+    interest_rate_percentage,
+    facility_costs,
+    facility_costs_owner_share,
+    purchase_price,
+    depreciation_precentage,
+    use_repayment_range,
+    repayment_value,
+    apt_own_usage,
+    own_capital_box,
+    own_capital,
+    maker_provision,
+    request_sequence=None,
+    graph_state=None,
+    session_id=None,
+    set_progress=None,
+):
+    """
+    Returns the figure and its graph state. If the browser already shows a figure with
+    the same scenarios (see get_graph_state), only a Patch of the changes is sent.
+    Figures of the presets computed by warm_start are served from memory.
+    The repayments are simulated in a few passes (GRAPH_CHUNKS); once a newer request
+    of the same session started (by request_sequence, see RequestCoalescer), this one is
+    dropped at the next pass. set_progress reports the progress of background callbacks.
+    """
+    inputs = {
+        name: value
+        for (name, value) in locals().items()
+        if name not in {"request_sequence", "graph_state", "session_id", "set_progress"}
+    }
+    token = request_coalescer.start(session_id, "update_graph", request_sequence)
+
+    preset = preset_figures.get(inputs)
+    if preset is not None:
+        figure, preset_graph_state = preset
+        logger.info("Serving a preset figure")
+        if graph_state == preset_graph_state:  # Already shown, e.g., the first page
+            figure = no_update
+        return figure, preset_graph_state
+
+    request_coalescer.check(session_id, "update_graph", token)
+
+    if use_repayment_range:
+        repayments = np.arange(*repayment_range, 500)
+        if len(repayments) == 0:  # Range narrower than one step or inverted
+            repayments = np.array(repayment_range[:1])
+    else:
+        repayments = np.array([repayment_value])
+
+    input_parameters = get_input_parameters(
+        yearly_income=yearly_income,
+        month_rent=month_rent,
+        initial_debt=initial_debt,
+        interest_rate_percentage=interest_rate_percentage,
+        facility_costs=facility_costs,
+        facility_costs_owner_share=facility_costs_owner_share,
+        purchase_price=purchase_price,
+        depreciation_precentage=depreciation_precentage,
+        repayment_amount=repayments[0],
+        apt_own_usage=apt_own_usage,
+        own_capital_box=own_capital_box,
+        own_capital=own_capital,
+        maker_provision=maker_provision,
+    )
+
+    # initial_debt/own_capital are already resolved, so copies need no validation.
+    SCENARIOS_PER_REQUEST.observe(len(repayments), callback="update_graph")
+    chunks = np.array_split(repayments, min(GRAPH_CHUNKS, len(repayments)))
+
+    dfs = []
+    with SIMULATE_DURATION.time(callback="update_graph"):
+        for index, chunk in enumerate(chunks):
+            report_progress(set_progress, index, len(chunks) + 1)
+            dfs.extend(
+                simulation_cache.simulate(
+                    [
+                        input_parameters.model_copy(
+                            update=dict(repayment_amount=float(repayment))
+                        )
+                        for repayment in chunk
+                    ],
+                    n_years=num_years,
+                )
+            )
+            request_coalescer.check(session_id, "update_graph", token)
+    logger.info(f"Simulation cache: {simulation_cache.get_stats()}")
+    report_progress(set_progress, len(chunks), len(chunks) + 1)
+
+    scenario_names = [f"repayment: {repayment}" for repayment in repayments]
+    trace_values = get_trace_values(dfs)
+    annotation = f"Initial debt: {input_parameters.initial_debt}"
+
+    with FIGURE_DURATION.time(callback="update_graph"):
+        new_graph_state = get_graph_state(scenario_names, trace_values, annotation)
+
+        if graph_state and (graph_state["scenario_names"] == scenario_names):
+            figure = patch_figure(graph_state, trace_values, annotation)
+        else:
+            figure = build_figure(scenario_names, trace_values, annotation)
+    request_coalescer.check(session_id, "update_graph", token)
+
+    return figure, new_graph_state
+
+
+def warm_start(presets: List[Dict] = WARM_START_PRESETS) -> Tuple[Dict, Dict]:
+    """
+    Computes the figures of the presets (changes of DEFAULT_INPUTS) once, so that they are
+    served from memory by update_graph.
+
+    :return: figure and graph state of the first preset, for the initial layout.
+    """
+    for changes in presets:
+        inputs = dict(DEFAULT_INPUTS, **changes)
+        if preset_figures.get(inputs) is None:
+            figure, graph_state = update_graph(**inputs)
+            preset_figures.add(inputs, figure.to_dict(), graph_state)
+
+    logger.info(f"Warm start: {len(preset_figures)} preset figures")
+
+    return preset_figures.get(dict(DEFAULT_INPUTS, **presets[0]))
+
+
+# Number of passes of the heatmap sweep, i.e., steps of its progress bar.
+HEATMAP_CHUNKS = 10
+
+
+def get_heatmap_figure(result, x_field, y_field, column, year) -> go.Figure:
+    x_axis, y_axis = SWEEP_AXES[x_field], SWEEP_AXES[y_field]
+    scale = 100 if column == "return_rate" else 1
+    fig = go.Figure(
+        go.Heatmap(
+            x=x_axis["scale"] * result.coords[x_field],
+            y=y_axis["scale"] * result.coords[y_field],
+            z=scale * result.at_year(column, year).T,
+            colorscale="RdBu",
+            zmid=0.0,
+            colorbar=dict(title=dict(text=HEATMAP_COLUMNS[column])),
+        )
+    )
+    fig.update_layout(
+        title=dict(text=f"{HEATMAP_COLUMNS[column]} in year {year}"),
+        xaxis_title=dict(text=x_axis["label"]),
+        yaxis_title=dict(text=y_axis["label"]),
+        height=600,
+    )
+
+    return fig
+
+
+def update_heatmap(
+    x_field,
+    y_field,
+    column,
+    year,
+    resolution,
+    yearly_income,
+    month_rent,
+    initial_debt,
+    interest_rate_percentage,
+    facility_costs,
+    facility_costs_owner_share,
+    purchase_price,
+    depreciation_precentage,
+    repayment_value,
+    apt_own_usage,
+    own_capital_box,
+    own_capital,
+    maker_provision,
+    request_sequence=None,
+    session_id=None,
+    set_progress=None,
+):
+    """
+    Heatmap of one column in one year over a grid of two fields (see SWEEP_AXES),
+    all other fields taken from the inputs. The grid is simulated in a few batched
+    passes (HEATMAP_CHUNKS), reporting the progress to set_progress after each.
+    Stale requests of a session are dropped as in update_graph.
+    """
+    if x_field == y_field:
+        raise PreventUpdate
+    token = request_coalescer.start(session_id, "update_heatmap", request_sequence)
+
+    base = get_input_parameters(
+        yearly_income=yearly_income,
+        month_rent=month_rent,
+        initial_debt=initial_debt,
+        interest_rate_percentage=interest_rate_percentage,
+        facility_costs=facility_costs,
+        facility_costs_owner_share=facility_costs_owner_share,
+        purchase_price=purchase_price,
+        depreciation_precentage=depreciation_precentage,
+        repayment_amount=repayment_value,
+        apt_own_usage=apt_own_usage,
+        own_capital_box=own_capital_box,
+        own_capital=own_capital,
+        maker_provision=maker_provision,
+    )
+
+    x_axis, y_axis = SWEEP_AXES[x_field], SWEEP_AXES[y_field]
+    SCENARIOS_PER_REQUEST.observe(resolution**2, callback="update_heatmap")
+    coords = {
+        x_field: np.linspace(x_axis["low"], x_axis["high"], resolution),
+        y_field: np.linspace(y_axis["low"], y_axis["high"], resolution),
+    }
+    chunks = np.array_split(coords[x_field], min(HEATMAP_CHUNKS, resolution))
+
+    results = []
+    with SIMULATE_DURATION.time(callback="update_heatmap"):
+        for index, x_values in enumerate(chunks):
+            report_progress(set_progress, index, len(chunks) + 1)
+            results.append(
+                sweep(
+                    base,
+                    grid={x_field: x_values, y_field: coords[y_field]},
+                    n_years=year,  # Later years are not needed
+                    keep="own_capital" if own_capital_box else "initial_debt",
+                )
+            )
+            request_coalescer.check(session_id, "update_heatmap", token)
+
+    result = SweepResult(
+        coords=coords,
+        years=results[0].years,
+        columns={
+            name: np.concatenate([chunk[name] for chunk in results])
+            for name in results[0].columns
+        },
+    )
+    report_progress(set_progress, len(chunks), len(chunks) + 1)
+
+    with FIGURE_DURATION.time(callback="update_heatmap"):
+        fig = get_heatmap_figure(result, x_field, y_field, column, year)
+    request_coalescer.check(session_id, "update_heatmap", token)
+
+    return fig
+
+
+def update_goal_seek(
+    n_clicks,
+    field,
+    target,
+    year,
+    yearly_income,
+    month_rent,
+    initial_debt,
+    interest_rate_percentage,
+    facility_costs,
+    facility_costs_owner_share,
+    purchase_price,
+    depreciation_precentage,
+    repayment_value,
+    apt_own_usage,
+    own_capital_box,
+    own_capital,
+    maker_provision,
+):
+    """
+    Lowest repayment amount or own capital meeting the target, see goal_seek. When
+    solving for the own capital, the initial debt follows from it.
+    """
+    if not n_clicks:
+        raise PreventUpdate
+
+    base = get_input_parameters(
+        yearly_income=yearly_income,
+        month_rent=month_rent,
+        initial_debt=initial_debt,
+        interest_rate_percentage=interest_rate_percentage,
+        facility_costs=facility_costs,
+        facility_costs_owner_share=facility_costs_owner_share,
+        purchase_price=purchase_price,
+        depreciation_precentage=depreciation_precentage,
+        repayment_amount=repayment_value,
+        apt_own_usage=apt_own_usage,
+        own_capital_box=own_capital_box,
+        own_capital=own_capital,
+        maker_provision=maker_provision,
+    )
+
+    with SIMULATE_DURATION.time(callback="update_goal_seek"):
+        result = goal_seek(base, field=field, target=target, year=year)
+    SCENARIOS_PER_REQUEST.observe(result.n_evaluations, callback="update_goal_seek")
+
+    goal = f"{GOAL_SEEK_TARGET_LABELS[target].lower()} year {year}"
+    if not result.feasible:
+        return f"No {GOAL_SEEK_FIELD_LABELS[field].lower()} reaches: {goal}."
+
+    return (
+        f"{GOAL_SEEK_FIELD_LABELS[field]}: {result.value:,.0f} "
+        f"({result.n_evaluations} simulations)"
+    )
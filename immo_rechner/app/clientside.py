@@ -0,0 +1,124 @@
+import json
+from typing import List, Sequence, Union
+
+from dash import Dash, Input, Output, State
+
+from immo_rechner.app.input_parameters import (
+    DEBOUNCE_SECONDS,
+    DEFAULT_INPUTS,
+    NUMBER_INPUT_IDS,
+)
+from immo_rechner.core.tax_contexts import UsageContext
+
+Dependency = Union[Output, Input, State]
+
+# JavaScript functions of the input values, returning the output values. Note that an
+# empty list (unchecked dcc.Checklist) is truthy in JavaScript.
+DISABLE_REPAYMENT_RANGE_OR_VALUE = """
+function(use_repayment_range) {
+    const use_range = Boolean(use_repayment_range && use_repayment_range.length);
+    return [use_range, !use_range];
+}
+"""
+
+DISABLE_MONTHLY_RENT = """
+function(apt_own_usage) {
+    if (!%(usages)s.includes(apt_own_usage)) {
+        throw new Error("Usage not defined: " + apt_own_usage);
+    }
+    return [false, %(monthly_rent)s];
+}
+""" % dict(
+    usages=json.dumps([usage.value for usage in UsageContext]),
+    monthly_rent=json.dumps(DEFAULT_INPUTS["month_rent"]),
+)
+
+USE_OWN_CAPITAL = """
+function(own_capital_box) {
+    const use_own_capital = Boolean(own_capital_box && own_capital_box.length);
+    return [use_own_capital, !use_own_capital];
+}
+"""
+
+SET_DEBOUNCE = """
+function(debounce_mode) {
+    const debounce = Boolean(debounce_mode && debounce_mode.length) && %(seconds)s;
+    return Array(%(n_inputs)s).fill(debounce);
+}
+""" % dict(
+    seconds=json.dumps(DEBOUNCE_SECONDS), n_inputs=len(NUMBER_INPUT_IDS)
+)
+
+# Counts up the sequence number in a dcc.Store (its current value is the last argument).
+COUNT_REQUESTS = """
+function(...args) {
+    return (args[args.length - 1] || 0) + 1;
+}
+"""
+
+
+class ClientsideCallback:
+    """
+    Callback that runs in the browser, for UI logic that needs no simulation and
+    therefore no request to a worker. function is the source of a JavaScript function.
+    """
+
+    def __init__(self, function: str, *dependencies: Dependency):
+        self.function = function
+        self.dependencies = dependencies
+
+    def register(self, app: Dash):
+        app.clientside_callback(self.function, *self.dependencies)
+
+
+def get_ui_toggles() -> List[ClientsideCallback]:
+    """
+    Inputs enabled or disabled by the checkboxes and the usage dropdown.
+    """
+    return [
+        ClientsideCallback(
+            DISABLE_REPAYMENT_RANGE_OR_VALUE,
+            Output("repayment-value", "disabled"),
+            Output("repayment-range", "disabled"),
+            Input("use-repayment-range", "value"),
+        ),
+        ClientsideCallback(
+            DISABLE_MONTHLY_RENT,
+            Output("monthly-rent", "disabled"),
+            Output("monthly-rent", "value"),
+            Input("apt-own-usage", "value"),
+        ),
+        ClientsideCallback(
+            USE_OWN_CAPITAL,
+            Output("initial-debt", "disabled"),
+            Output("own-capital", "disabled"),
+            Input("own-capital-box", "value"),
+        ),
+    ]
+
+
+def get_debounce_toggle() -> ClientsideCallback:
+    """
+    In debounce mode, the number inputs send their value once typing paused.
+    """
+    return ClientsideCallback(
+        SET_DEBOUNCE,
+        *(Output(input_id, "debounce") for input_id in NUMBER_INPUT_IDS),
+        Input("debounce-mode", "value"),
+    )
+
+
+def get_request_counter(store_id: str, inputs: Sequence[Input]) -> ClientsideCallback:
+    """
+    Counts the changes of inputs in the store store_id. A callback with these inputs
+    takes the store as input too, and thus runs after the counter, with the sequence
+    number of its request (see RequestCoalescer).
+    """
+    return ClientsideCallback(
+        COUNT_REQUESTS, Output(store_id, "data"), *inputs, State(store_id, "data")
+    )
+
+
+def add_clientside_callbacks(app: Dash, callbacks: Sequence[ClientsideCallback]):
+    for callback in callbacks:
+        callback.register(app)
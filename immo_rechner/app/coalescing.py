@@ -0,0 +1,176 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from dash.exceptions import PreventUpdate
+
+from immo_rechner.core.utils import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+SESSION_DIR_ENV = "IMMO_RECHNER_SESSION_DIR"
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{8,64}$")
+MAX_SESSION_AGE = 24 * 3600  # seconds
+CLEANUP_INTERVAL = 1024  # requests
+
+
+def lock_file(f, exclusive: bool):
+    """
+    Locks f until it is closed (without fcntl, e.g., on Windows, concurrent requests of
+    one session may both be computed).
+    """
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+class RequestCoalescer:
+    """
+    Keeps the latest request per session and callback. Every request carries a sequence
+    number, counted up by the browser on each change of the inputs of the callback (see
+    get_request_counter), so requests are ordered as they were sent, whichever worker
+    takes them first. A request is stale once a request of the same session and callback
+    with a higher sequence number has started; the callback then stops at its next
+    checkpoint (see check), so only the latest input state is computed and sent.
+
+    Requests of one session may run in different gunicorn workers. With a directory
+    (IMMO_RECHNER_SESSION_DIR) the highest sequence number is kept in a file there, so
+    the workers see each other's requests.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        # Highest sequence number and start time (in ns) of the latest request per key
+        self.latest: Dict[str, Tuple[int, int]] = {}
+        self.n_dropped: Counter = Counter()
+        self.n_started = 0
+        self.lock = threading.Lock()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(directory=os.environ.get(SESSION_DIR_ENV))
+
+    @staticmethod
+    def get_key(session_id: Optional[str], callback: str) -> Optional[str]:
+        """
+        Requests without a valid session id (e.g., from tests or the API) are never stale.
+        """
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            return None
+
+        return f"{session_id}-{callback}"
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def read(self, key: str) -> int:
+        try:
+            with open(self.get_path(key)) as f:
+                lock_file(f, exclusive=False)
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def write_max(self, key: str, sequence: int):
+        """
+        Writes sequence unless the file of key holds a higher one. The file is locked
+        from reading to writing, so that a lower sequence number of another worker never
+        overwrites a higher one.
+        """
+        fd = os.open(self.get_path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+") as f:
+            lock_file(f, exclusive=True)
+            try:
+                latest = int(f.read() or 0)
+            except ValueError:
+                latest = 0
+
+            if sequence > latest:
+                f.seek(0)
+                f.truncate()
+                f.write(str(sequence))
+
+    def get_latest(self, key: str) -> int:
+        latest, _ = self.latest.get(key, (0, 0))
+        if self.directory:
+            latest = max(latest, self.read(key))
+
+        return latest
+
+    def start(
+        self, session_id: Optional[str], callback: str, sequence: Optional[int]
+    ) -> Optional[int]:
+        """
+        Registers a new request with the sequence number sent by the browser. Requests
+        without sequence number are never stale.
+
+        :return: token of the request, to be passed to check.
+        """
+        key = self.get_key(session_id, callback)
+        if key is None or sequence is None:
+            return None
+
+        with self.lock:
+            latest, _ = self.latest.get(key, (0, 0))
+            self.latest[key] = (max(latest, sequence), time.time_ns())
+            self.n_started += 1
+            cleanup = self.n_started % CLEANUP_INTERVAL == 0
+
+        if self.directory:
+            self.write_max(key, sequence)
+        if cleanup:
+            self.cleanup()
+
+        return sequence
+
+    def is_stale(
+        self, session_id: Optional[str], callback: str, token: Optional[int]
+    ) -> bool:
+        key = self.get_key(session_id, callback)
+        return key is not None and token is not None and self.get_latest(key) > token
+
+    def check(self, session_id: Optional[str], callback: str, token: Optional[int]):
+        """
+        Checkpoint of a callback: raises PreventUpdate if a newer request of the same
+        session has started, i.e., one with a higher sequence number.
+        """
+        if self.is_stale(session_id, callback, token):
+            with self.lock:
+                self.n_dropped[callback] += 1
+            logger.info(f"Dropping a stale request of {callback}")
+            raise PreventUpdate
+
+    def cleanup(self, max_age: float = MAX_SESSION_AGE):
+        """
+        Forgets sessions without a request for max_age seconds.
+        """
+        oldest = time.time_ns() - int(max_age * 1e9)
+        with self.lock:
+            self.latest = {
+                key: (sequence, started)
+                for (key, (sequence, started)) in self.latest.items()
+                if started >= oldest
+            }
+
+        if not self.directory:
+            return
+
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime_ns < oldest:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+
+request_coalescer = RequestCoalescer.from_env()
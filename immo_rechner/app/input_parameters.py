@@ -4,6 +4,71 @@ from immo_rechner.core.tax_contexts import UsageContext
 
 import dash_bootstrap_components as dbc
 
+# Fields of InputParameters that can be swept in the heatmap, with their value range.
+# scale converts a value to the unit shown in the label.
+SWEEP_AXES = {
+    "yearly_interest_rate": dict(
+        label="Yearly interest rate (%)", low=0.005, high=0.08, scale=100
+    ),
+    "repayment_amount": dict(
+        label="Loan repayment (EUR)", low=500, high=5_000, scale=1
+    ),
+    "purchase_price": dict(
+        label="Purchase price (EUR)", low=100_000, high=1_000_000, scale=1
+    ),
+    "own_capital": dict(label="Own capital (EUR)", low=0, high=400_000, scale=1),
+    "monthly_rent": dict(label="Monthly rent (EUR)", low=300, high=4_000, scale=1),
+}
+
+# Initial values of the inputs, by the argument names of update_graph.
+DEFAULT_INPUTS = dict(
+    repayment_range=[500, 1500],
+    yearly_income=100000,
+    month_rent=1500,
+    initial_debt=450000,
+    num_years=20,
+    interest_rate_percentage=3.3,
+    facility_costs=350,
+    facility_costs_owner_share=50,
+    purchase_price=450_000,
+    depreciation_precentage=2,
+    use_repayment_range=[],
+    repayment_value=1500,
+    apt_own_usage=UsageContext.RENTING.value,
+    own_capital_box=[],
+    own_capital=100000,
+    maker_provision=3.57,
+)
+
+# Number inputs which update the figures; see DEBOUNCE_SECONDS.
+NUMBER_INPUT_IDS = [
+    "yearly-income",
+    "monthly-rent",
+    "purchase-price",
+    "own-capital",
+    "initial-debt",
+    "interest-rate",
+    "repayment-value",
+    "facility-costs",
+    "facility-costs-owner-share",
+    "depreciation-rate",
+    "makler-provision",
+    "num-years",
+    "heatmap-year",
+    "heatmap-resolution",
+]
+
+# In debounce mode, number inputs only update once typing paused for this long.
+DEBOUNCE_SECONDS = 0.5
+
+HEATMAP_COLUMNS = {
+    "cashflow": "Cash flow (EUR)",
+    "remaining_debt": "Remaining debt (EUR)",
+    "tax_benefit": "Tax benefit (EUR)",
+    "cumulative_interest_cost": "Cumulative interest cost (EUR)",
+    "return_rate": "Return rate (%)",
+}
+
 
 def get_income_table():
     return html.Table(
@@ -16,7 +81,7 @@ def get_income_table():
                     html.Td(
                         dcc.Input(
                             id="yearly-income",
-                            value=100000,
+                            value=DEFAULT_INPUTS["yearly_income"],
                             type="number",
                             min=1,
                             step=1,
@@ -33,7 +98,11 @@ def get_income_table():
                     html.Td("Monthly rent "),
                     html.Td(
                         dcc.Input(
-                            id="monthly-rent", value=1500, type="number", min=0, step=1
+                            id="monthly-rent",
+                            value=DEFAULT_INPUTS["month_rent"],
+                            type="number",
+                            min=0,
+                            step=1,
                         )
                     ),
                     dbc.Tooltip("Rental amount from the flat.", target="monthly-rent"),
@@ -53,7 +122,11 @@ def get_cost_table():
                     html.Td("Purchase price"),
                     html.Td(
                         dcc.Input(
-                            450_000, min=0, step=1, id="purchase-price", type="number"
+                            DEFAULT_INPUTS["purchase_price"],
+                            min=0,
+                            step=1,
+                            id="purchase-price",
+                            type="number",
                         )
                     ),
                     dbc.Tooltip(
@@ -67,14 +140,16 @@ def get_cost_table():
                     html.Td(
                         dcc.Input(
                             id="own-capital",
-                            value=100000,
+                            value=DEFAULT_INPUTS["own_capital"],
                             min=1,
                             type="number",
                             step=1,
                         )
                     ),
                     dcc.Checklist(
-                        options=["Use own capital"], value=[], id="own-capital-box"
+                        options=["Use own capital"],
+                        value=DEFAULT_INPUTS["own_capital_box"],
+                        id="own-capital-box",
                     ),
                     dbc.Tooltip(
                         "Check this box if you would like to compute using your own capital.",
@@ -88,7 +163,7 @@ def get_cost_table():
                     html.Td(
                         dcc.Input(
                             id="initial-debt",
-                            value=450000,
+                            value=DEFAULT_INPUTS["initial_debt"],
                             min=1,
                             type="number",
                             step=1,
@@ -97,7 +172,7 @@ def get_cost_table():
                     html.Td("Yearly interest rate (%)"),
                     html.Td(
                         dcc.Input(
-                            3.3,
+                            DEFAULT_INPUTS["interest_rate_percentage"],
                             min=0,
                             max=100,
                             step=0.01,
@@ -118,7 +193,7 @@ def get_cost_table():
                                     className="w3-container w3-row-padding",
                                     children=[
                                         dcc.Input(
-                                            1500,
+                                            DEFAULT_INPUTS["repayment_value"],
                                             min=0,
                                             step=1,
                                             id="repayment-value",
@@ -127,7 +202,7 @@ def get_cost_table():
                                         ),
                                         dcc.Checklist(
                                             options=["Use Range"],
-                                            value=[],
+                                            value=DEFAULT_INPUTS["use_repayment_range"],
                                             id="use-repayment-range",
                                             className="w3-half",
                                         ),
@@ -144,7 +219,7 @@ def get_cost_table():
                                             min=500,
                                             max=3000,
                                             step=500,
-                                            value=[500, 1500],
+                                            value=DEFAULT_INPUTS["repayment_range"],
                                             id="repayment-range",
                                         )
                                     ],
@@ -160,13 +235,17 @@ def get_cost_table():
                     html.Td("Facility monthly costs (Hausgeld)"),
                     html.Td(
                         dcc.Input(
-                            350, min=0, step=1, id="facility-costs", type="number"
+                            DEFAULT_INPUTS["facility_costs"],
+                            min=0,
+                            step=1,
+                            id="facility-costs",
+                            type="number",
                         )
                     ),
                     html.Td("Owner's share (%)"),
                     html.Td(
                         dcc.Input(
-                            50,
+                            DEFAULT_INPUTS["facility_costs_owner_share"],
                             min=0,
                             max=100,
                             step=1,
@@ -184,7 +263,7 @@ def get_cost_table():
                     html.Td("Depreciation rate (%) per year (for taxes)"),
                     html.Td(
                         dcc.Input(
-                            2,
+                            DEFAULT_INPUTS["depreciation_precentage"],
                             min=0,
                             max=100,
                             step=1,
@@ -203,7 +282,7 @@ def get_cost_table():
                     html.Td("Makler provision (%)"),
                     html.Td(
                         dcc.Input(
-                            3.57,
+                            DEFAULT_INPUTS["maker_provision"],
                             min=0,
                             max=5,
                             step=0.01,
@@ -227,11 +306,32 @@ def get_additional_params():
                     html.Td("Number of years"),
                     html.Td(
                         dcc.Input(
-                            20, min=5, max=100, step=1, id="num-years", type="number"
+                            DEFAULT_INPUTS["num_years"],
+                            min=5,
+                            max=100,
+                            step=1,
+                            id="num-years",
+                            type="number",
                         )
                     ),
                 ],
             ),
+            html.Tr(
+                children=[
+                    html.Td(
+                        dcc.Checklist(
+                            options=["Update after typing"],
+                            value=[],
+                            id="debounce-mode",
+                        )
+                    ),
+                    dbc.Tooltip(
+                        f"Numbers only update the figures once typing paused for "
+                        f"{DEBOUNCE_SECONDS} seconds.",
+                        target="debounce-mode",
+                    ),
+                ],
+            ),
             html.Tr(
                 children=[
                     html.Td(
@@ -240,7 +340,7 @@ def get_additional_params():
                                 UsageContext.OWN_USE.value,
                                 UsageContext.RENTING.value,
                             ],
-                            value=UsageContext.RENTING.value,
+                            value=DEFAULT_INPUTS["apt_own_usage"],
                             clearable=False,
                             id="apt-own-usage",
                         ),
@@ -249,3 +349,157 @@ def get_additional_params():
             ),
         ],
     )
+
+
+def get_heatmap_params():
+    return html.Table(
+        className="w3-table w3-bordered",
+        children=[
+            html.Th("Heatmap", colSpan=4, className="w3-indigo"),
+            html.Tr(
+                children=[
+                    html.Td("X axis"),
+                    html.Td(
+                        dcc.Dropdown(
+                            options=[
+                                dict(label=axis["label"], value=field)
+                                for (field, axis) in SWEEP_AXES.items()
+                            ],
+                            value="yearly_interest_rate",
+                            clearable=False,
+                            id="heatmap-x",
+                        )
+                    ),
+                    html.Td("Y axis"),
+                    html.Td(
+                        dcc.Dropdown(
+                            options=[
+                                dict(label=axis["label"], value=field)
+                                for (field, axis) in SWEEP_AXES.items()
+                            ],
+                            value="repayment_amount",
+                            clearable=False,
+                            id="heatmap-y",
+                        )
+                    ),
+                ]
+            ),
+            html.Tr(
+                children=[
+                    html.Td("Value"),
+                    html.Td(
+                        dcc.Dropdown(
+                            options=[
+                                dict(label=label, value=column)
+                                for (column, label) in HEATMAP_COLUMNS.items()
+                            ],
+                            value="cashflow",
+                            clearable=False,
+                            id="heatmap-column",
+                        )
+                    ),
+                    html.Td("Year"),
+                    html.Td(
+                        dcc.Input(
+                            10, min=1, max=100, step=1, id="heatmap-year", type="number"
+                        )
+                    ),
+                ]
+            ),
+            html.Tr(
+                children=[
+                    html.Td("Grid points per axis"),
+                    html.Td(
+                        dcc.Input(
+                            100,
+                            min=2,
+                            max=300,
+                            step=1,
+                            id="heatmap-resolution",
+                            type="number",
+                        )
+                    ),
+                    dbc.Tooltip(
+                        "The heatmap simulates (grid points per axis)^2 scenarios.",
+                        target="heatmap-resolution",
+                    ),
+                ]
+            ),
+        ],
+    )
+
+
+GOAL_SEEK_FIELD_LABELS = {
+    "repayment_amount": "Monthly loan repayment (EUR)",
+    "own_capital": "Own capital (EUR)",
+}
+
+GOAL_SEEK_TARGET_LABELS = {
+    "non_negative_cashflow": "Non-negative cash flow every year until",
+    "debt_free": "Debt free by",
+}
+
+
+def get_goal_seek_params():
+    return html.Table(
+        className="w3-table w3-bordered",
+        children=[
+            html.Th("Goal seek", colSpan=4, className="w3-amber"),
+            html.Tr(
+                children=[
+                    html.Td("Find the lowest"),
+                    html.Td(
+                        dcc.Dropdown(
+                            options=[
+                                dict(label=label, value=field)
+                                for (field, label) in GOAL_SEEK_FIELD_LABELS.items()
+                            ],
+                            value="repayment_amount",
+                            clearable=False,
+                            id="goal-seek-field",
+                        )
+                    ),
+                    html.Td("such that"),
+                    html.Td(
+                        dcc.Dropdown(
+                            options=[
+                                dict(label=label, value=target)
+                                for (target, label) in GOAL_SEEK_TARGET_LABELS.items()
+                            ],
+                            value="debt_free",
+                            clearable=False,
+                            id="goal-seek-target",
+                        )
+                    ),
+                ]
+            ),
+            html.Tr(
+                children=[
+                    html.Td("Year"),
+                    html.Td(
+                        dcc.Input(
+                            20,
+                            min=1,
+                            max=100,
+                            step=1,
+                            id="goal-seek-year",
+                            type="number",
+                        )
+                    ),
+                    html.Td(
+                        html.Button(
+                            "Solve",
+                            id="goal-seek-button",
+                            n_clicks=0,
+                            className="w3-button w3-amber",
+                        )
+                    ),
+                    html.Td(html.Div(id="goal-seek-result")),
+                    dbc.Tooltip(
+                        "All other values are taken from the inputs above.",
+                        target="goal-seek-button",
+                    ),
+                ]
+            ),
+        ],
+    )
@@ -0,0 +1,444 @@
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from immo_rechner.core.utils import get_logger
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+METRICS_DIR_ENV = "IMMO_RECHNER_METRICS_DIR"
+# Histograms of processes that exited (e.g., background jobs) are summed in this file
+# and reported with pid="exited".
+EXITED_SNAPSHOT = "exited.json"
+EXITED_PID = "exited"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SCENARIO_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 5_000, 10_000, 40_000)
+
+# (suffix, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Histogram:
+    """
+    Prometheus histogram with cumulative buckets, one per combination of label values.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DURATION_BUCKETS,
+        label_names: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+
+        # label values -> [count per bucket (last is +Inf), sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+        self.lock = threading.Lock()
+
+        # A forked process (e.g., a background job) reports only its own observations,
+        # so that summing its snapshot once it exited does not count the parent's twice.
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_samples(self) -> List[Sample]:
+        samples = []
+        with self.lock:
+            for key, counts in self.values.items():
+                labels = dict(zip(self.label_names, key))
+                for bound, count in zip(self.buckets + ("+Inf",), counts[:-1]):
+                    samples.append(("_bucket", dict(labels, le=str(bound)), count))
+                samples.append(("_count", labels, counts[-2]))
+                samples.append(("_sum", labels, counts[-1]))
+
+        return samples
+
+
+class Gauge:
+    """
+    Metric whose samples are read at scrape time, e.g., from the simulation cache.
+    get_values returns {label values: value}; type can also be "counter".
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        get_values: Callable[[], Dict[Tuple[str, ...], float]],
+        label_names: Sequence[str] = (),
+        type: str = "gauge",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.get_values = get_values
+        self.label_names = tuple(label_names)
+        self.type = type
+
+    def get_samples(self) -> List[Sample]:
+        return [
+            ("", dict(zip(self.label_names, key)), value)
+            for (key, value) in self.get_values().items()
+        ]
+
+
+def get_resident_memory() -> Optional[float]:
+    """
+    Current resident memory of the process in bytes (Linux only).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_max_resident_memory() -> Optional[float]:
+    if resource is None:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # kB on Linux
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if value == value else "NaN"
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+        for (name, value) in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def add_samples(samples: List[Sample], other: List[Sample]) -> List[Sample]:
+    """
+    Sums the values of samples with the same suffix and labels.
+    """
+    totals: Dict[Tuple[str, str], list] = {}
+    for suffix, labels, value in list(samples) + list(other):
+        key = (suffix, json.dumps(labels, sort_keys=True))
+        if key in totals:
+            totals[key][2] += value
+        else:
+            totals[key] = [suffix, labels, value]
+
+    return [tuple(sample) for sample in totals.values()]
+
+
+class MetricsRegistry:
+    """
+    Metrics of one process. Every gunicorn worker has its own registry; with a directory
+    (IMMO_RECHNER_METRICS_DIR) the workers write snapshots there and /metrics reports
+    all live workers, labelled by pid.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.metrics = []
+        self.directory = directory
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(directory=os.environ.get(METRICS_DIR_ENV))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def get_snapshot(self) -> List[dict]:
+        return [
+            dict(
+                name=metric.name,
+                type=metric.type,
+                documentation=metric.documentation,
+                samples=metric.get_samples(),
+            )
+            for metric in self.metrics
+        ]
+
+    def dump(self):
+        """
+        Atomically writes the snapshot of this process to the directory.
+        """
+        if not self.directory:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.get_snapshot(), f)
+        os.replace(tmp_path, os.path.join(self.directory, f"{os.getpid()}.json"))
+
+    def load_snapshots(self) -> Dict[int, List[dict]]:
+        """
+        Snapshots of all live processes. The histograms of processes that are gone are
+        added to the exited snapshot (see fold_exited) and their files removed.
+        """
+        snapshots = {os.getpid(): self.get_snapshot()}
+        if not self.directory:
+            return snapshots
+
+        for entry in os.scandir(self.directory):
+            name, suffix = os.path.splitext(entry.name)
+            if suffix != ".json" or not name.isdigit() or int(name) in snapshots:
+                continue
+
+            try:
+                os.kill(int(name), 0)
+                with open(entry.path) as f:
+                    snapshots[int(name)] = json.load(f)
+            except ProcessLookupError:
+                self.fold_exited(entry.path)
+            except (OSError, ValueError):  # No permission, or a partial file
+                continue
+
+        return snapshots
+
+    @contextmanager
+    def lock_exited(self):
+        """
+        Lock of the exited snapshot across processes (without fcntl, e.g., on Windows,
+        concurrent scrapes may lose an update).
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.directory, EXITED_SNAPSHOT + ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load_exited(self) -> List[dict]:
+        try:
+            with open(os.path.join(self.directory, EXITED_SNAPSHOT)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def fold_exited(self, path: str):
+        """
+        Adds the histograms of the snapshot at path, of a process that is gone, to the
+        exited snapshot and removes the file. Gauges (e.g., memory) and the cache
+        counters, which a forked process inherits, are dropped.
+        """
+        # Claim the file, so that concurrent scrapes fold it only once
+        claimed = f"{path}.{os.getpid()}.folding"
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return
+
+        try:
+            with open(claimed) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            snapshot = []
+        finally:
+            os.remove(claimed)
+
+        with self.lock_exited():
+            exited = {metric["name"]: metric for metric in self.load_exited()}
+            for metric in snapshot:
+                if metric["type"] != "histogram":
+                    continue
+
+                merged = exited.setdefault(metric["name"], dict(metric, samples=[]))
+                merged["samples"] = add_samples(merged["samples"], metric["samples"])
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(list(exited.values()), f)
+            os.replace(tmp_path, os.path.join(self.directory, EXITED_SNAPSHOT))
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        self.dump()
+
+        snapshots = [
+            (str(pid), snapshot)
+            for (pid, snapshot) in sorted(self.load_snapshots().items())
+        ]
+        if self.directory:
+            snapshots.append((EXITED_PID, self.load_exited()))
+
+        metrics: Dict[str, dict] = {}
+        for pid, snapshot in snapshots:
+            for metric in snapshot:
+                merged = metrics.setdefault(metric["name"], dict(metric, samples=[]))
+                merged["samples"].extend(
+                    (suffix, dict(labels, pid=pid), value)
+                    for (suffix, labels, value) in metric["samples"]
+                )
+
+        lines = []
+        for name, metric in metrics.items():
+            lines.append(f"# HELP {name} {metric['documentation']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for suffix, labels, value in metric["samples"]:
+                lines.append(
+                    f"{name}{suffix}{format_labels(labels)} {format_value(value)}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry.from_env()
+
+CALLBACK_DURATION = registry.register(
+    Histogram(
+        "immo_rechner_callback_duration_seconds",
+        "Duration of Dash callbacks.",
+        label_names=["callback"],
+    )
+)
+SIMULATE_DURATION = registry.register(
+    Histogram(
+        "immo_rechner_simulate_duration_seconds",
+        "Duration of the simulations of a callback.",
+        label_names=["callback"],
+    )
+)
+FIGURE_DURATION = registry.register(
+    Histogram(
+        "immo_rechner_figure_build_duration_seconds",
+        "Duration of building a figure or a patch of it.",
+        label_names=["callback"],
+    )
+)
+SCENARIOS_PER_REQUEST = registry.register(
+    Histogram(
+        "immo_rechner_scenarios_per_request",
+        "Number of simulated scenarios per callback.",
+        buckets=SCENARIO_BUCKETS,
+        label_names=["callback"],
+    )
+)
+
+
+def register_cache_metrics(cache):
+    """
+    Exposes the statistics of a SimulationCache.
+    """
+    for key, metric_type in [
+        ("hits", "counter"),
+        ("misses", "counter"),
+        ("hit_rate", "gauge"),
+        ("size", "gauge"),
+    ]:
+        suffix = "_total" if metric_type == "counter" else ""
+        registry.register(
+            Gauge(
+                f"immo_rechner_cache_{key}{suffix}",
+                f"Simulation cache {key.replace('_', ' ')}.",
+                get_values=lambda key=key: {(): cache.get_stats()[key]},
+                type=metric_type,
+            )
+        )
+
+
+def register_coalescer_metrics(coalescer):
+    """
+    Exposes the number of stale requests dropped by a RequestCoalescer.
+    """
+    registry.register(
+        Gauge(
+            "immo_rechner_stale_requests_dropped_total",
+            "Requests dropped because a newer request of the same session started.",
+            get_values=lambda: {
+                (callback,): n for (callback, n) in coalescer.n_dropped.items()
+            },
+            label_names=["callback"],
+            type="counter",
+        )
+    )
+
+
+registry.register(
+    Gauge(
+        "process_resident_memory_bytes",
+        "Resident memory of the worker in bytes.",
+        get_values=lambda: {
+            (): value for value in [get_resident_memory()] if value is not None
+        },
+    )
+)
+registry.register(
+    Gauge(
+        "process_max_resident_memory_bytes",
+        "Peak resident memory of the worker in bytes.",
+        get_values=lambda: {
+            (): value for value in [get_max_resident_memory()] if value is not None
+        },
+    )
+)
+
+
+def timed_callback(func: Callable) -> Callable:
+    """
+    Records the duration of every call of a Dash callback, also if it raises
+    (e.g., PreventUpdate).
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            with CALLBACK_DURATION.time(callback=func.__name__):
+                return func(*args, **kwargs)
+        finally:
+            registry.dump()
+
+    return wrapper
@@ -0,0 +1,287 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import click
+import numpy as np
+from pydantic import ValidationError
+
+from immo_rechner.core.batch import (
+    SimulationInputError,
+    check_simulatable,
+    simulate_scenarios,
+)
+from immo_rechner.core.profit_calculator import InputParameters, RESULT_COLUMNS
+from immo_rechner.core.utils import get_logger, quiet_loggers
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10_000
+INPUT_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+OUTPUT_FORMATS = {".csv": "csv", ".parquet": "parquet"}
+
+
+def get_format(path: str, formats: Dict[str, str]) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in formats:
+        raise click.BadParameter(
+            f"Unsupported file type {suffix} of {path}, expected one of {sorted(formats)}"
+        )
+
+    return formats[suffix]
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise click.UsageError(
+            "Parquet files need pyarrow, install it with: pip install pyarrow"
+        ) from e
+
+    return pyarrow
+
+
+def is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    """
+    Reads a CSV, JSONL or Parquet file of InputParameters rows in chunks of chunk_size rows.
+    """
+    import pandas as pd
+
+    file_format = get_format(path, INPUT_FORMATS)
+
+    if file_format == "csv":
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            yield from reader
+    elif file_format == "jsonl":
+        with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+            yield from reader
+    else:
+        parquet_file = import_pyarrow().parquet.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+
+
+def validate_records(
+    records: List[dict], first_row: int
+) -> Tuple[List[int], List[InputParameters], List[Tuple[int, str]]]:
+    """
+    Validates rows of an input file; empty cells take the defaults of InputParameters.
+    Rows the engine cannot simulate, see check_simulatable, are invalid as well.
+
+    :return: numbers of the valid rows, their InputParameters and (row, error) of the
+        invalid ones.
+    """
+    rows, input_params, errors = [], [], []
+    for row, record in enumerate(records, start=first_row):
+        try:
+            params = InputParameters(
+                **{
+                    key: value
+                    for (key, value) in record.items()
+                    if not is_missing(value)
+                }
+            )
+            check_simulatable(params)
+        except (ValidationError, SimulationInputError) as e:
+            errors.append((row, str(e)))
+            continue
+
+        rows.append(row)
+        input_params.append(params)
+
+    return rows, input_params, errors
+
+
+def process_chunk(
+    records: List[dict], first_row: int, n_years: int, use_lookup_table: bool
+) -> Tuple[Dict[str, np.ndarray], List[Tuple[int, str]]]:
+    """
+    Validates and simulates one chunk of rows. Workers only need NumPy, no pandas.
+
+    :return: long columns with the row number of the input, the year and RESULT_COLUMNS,
+        and the validation errors.
+    """
+    rows, input_params, errors = validate_records(records, first_row=first_row)
+
+    if input_params:
+        columns = simulate_scenarios(
+            input_params, n_years=n_years, use_lookup_table=use_lookup_table
+        ).columns
+    else:
+        columns = {name: np.empty((0, n_years)) for name in RESULT_COLUMNS}
+
+    output = dict(
+        row=np.repeat(np.asarray(rows, dtype=np.int64), n_years),
+        year=np.tile(np.arange(1, n_years + 1), len(rows)),
+        **{name: columns[name].ravel() for name in RESULT_COLUMNS},
+    )
+
+    return output, errors
+
+
+def map_in_order(
+    func: Callable, args: Iterable[tuple], n_workers: int
+) -> Iterator[Tuple[Dict[str, np.ndarray], List[Tuple[int, str]]]]:
+    """
+    Yields func(*arg) in the order of args. With several workers at most 2 * n_workers
+    chunks are in flight, so memory does not grow with the size of the input.
+    """
+    if n_workers <= 1:
+        for arg in args:
+            yield func(*arg)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=quiet_loggers
+    ) as executor:
+        futures = deque()
+        for arg in args:
+            futures.append(executor.submit(func, *arg))
+            if len(futures) >= 2 * n_workers:
+                yield futures.popleft().result()
+
+        while futures:
+            yield futures.popleft().result()
+
+
+class CsvWriter:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.has_header = False
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        import pandas as pd
+
+        pd.DataFrame(columns).to_csv(
+            self.path,
+            mode="a" if self.has_header else "w",
+            header=not self.has_header,
+            index=False,
+        )
+        self.has_header = True
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pyarrow = import_pyarrow()
+        self.writer = None
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        table = self.pyarrow.table(columns)
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def get_writer(path: str):
+    if get_format(path, OUTPUT_FORMATS) == "csv":
+        return CsvWriter(path)
+
+    return ParquetWriter(path)
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    n_years: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    n_workers: int = 1,
+    use_lookup_table: bool = False,
+    skip_invalid: bool = False,
+) -> Dict[str, int]:
+    """
+    Streams the rows of input_path through the simulator and appends the results to
+    output_path chunk by chunk.
+
+    :return: number of simulated and of invalid rows.
+    """
+    writer = get_writer(output_path)
+
+    def get_chunk_args():
+        first_row = 0
+        for chunk in read_chunks(input_path, chunk_size=chunk_size):
+            yield chunk.to_dict(orient="records"), first_row, n_years, use_lookup_table
+            first_row += len(chunk)
+
+    stats = dict(n_simulated=0, n_invalid=0)
+    try:
+        for columns, errors in map_in_order(process_chunk, get_chunk_args(), n_workers):
+            for row, error in errors:
+                if not skip_invalid:
+                    raise click.ClickException(f"Invalid row {row}: {error}")
+                logger.warning(f"Skipping invalid row {row}: {error}")
+
+            writer.write(columns)
+            stats["n_simulated"] += len(columns["row"]) // n_years
+            stats["n_invalid"] += len(errors)
+            logger.info(f"Simulated {stats['n_simulated']} rows")
+    finally:
+        writer.close()
+
+    return stats
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--n-years", default=30, type=click.IntRange(min=1))
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, type=click.IntRange(min=1))
+@click.option("--n-workers", default=1, type=click.IntRange(min=1))
+@click.option("--use-lookup-table", default=False, is_flag=True)
+@click.option("--skip-invalid", default=False, is_flag=True)
+def main(
+    input_path,
+    output_path,
+    n_years,
+    chunk_size,
+    n_workers,
+    use_lookup_table,
+    skip_invalid,
+):
+    """
+    Simulates every row of INPUT_PATH (CSV, JSONL or Parquet with the fields of
+    InputParameters) and writes one row per scenario and year to OUTPUT_PATH (CSV or Parquet).
+    """
+    quiet_loggers()
+    stats = run_batch(
+        input_path=input_path,
+        output_path=output_path,
+        n_years=n_years,
+        chunk_size=chunk_size,
+        n_workers=n_workers,
+        use_lookup_table=use_lookup_table,
+        skip_invalid=skip_invalid,
+    )
+    logger.info(
+        f"Done: {stats['n_simulated']} rows simulated, {stats['n_invalid']} invalid rows"
+    )
+
+
+if __name__ == "__main__":
+    main()
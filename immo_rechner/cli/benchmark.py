@@ -0,0 +1,307 @@
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import click
+import numpy as np
+
+from immo_rechner.core.cost import InterestRate
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from immo_rechner.core.utils import get_logger, quiet_loggers
+
+logger = get_logger(__name__)
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.1
+
+# name -> setup function returning the callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def register(name: str):
+    def decorator(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def get_input_params() -> InputParameters:
+    return InputParameters(
+        usage=UsageContext.RENTING,
+        yearly_income=100_000,
+        monthly_rent=1_500,
+        facility_monthly_cost=350.0,
+        owner_share=0.5,
+        repayment_amount=1_500,
+        yearly_interest_rate=0.033,
+        initial_debt=450_000,
+        purchase_price=450_000,
+    )
+
+
+@register("profit_calculator_from_input_params")
+def setup_from_input_params():
+    params = get_input_params()
+    return lambda: ProfitCalculator.from_input_params(params)
+
+
+def setup_simulate(n_years: int):
+    params = get_input_params()
+    return lambda: ProfitCalculator.from_input_params(params).simulate(n_years=n_years)
+
+
+for _n_years in [10, 30, 50]:
+    register(f"simulate_{_n_years}_years")(
+        lambda n_years=_n_years: setup_simulate(n_years)
+    )
+
+
+@register("interest_rate_evaluate_30_years")
+def setup_interest_rate_evaluate():
+    interest_rate = InterestRate(
+        usage=UsageContext.RENTING,
+        yearly_rate=0.033,
+        repayment_amount=1_500,
+        initial_debt=450_000,
+    )
+
+    def evaluate():
+        interest_rate.reset()
+        for _ in range(30):
+            interest_rate.evaluate()
+
+    return evaluate
+
+
+@register("income_tax_scalar")
+def setup_income_tax_scalar():
+    return lambda: ProfitCalculator.get_yearly_income_tax(85_000.0)
+
+
+@register("income_tax_10000_incomes")
+def setup_income_tax_array():
+    incomes = np.linspace(0, 300_000, 10_000)
+    return lambda: ProfitCalculator.get_yearly_income_tax(incomes)
+
+
+@register("compare_usages_30_years")
+def setup_compare_usages():
+    from immo_rechner.core.comparison import compare_usages
+
+    params = get_input_params()
+    return lambda: compare_usages(params, n_years=30)
+
+
+def setup_batch(kernel: str, n_scenarios: int = 10_000):
+    from immo_rechner.core.batch import BatchProfitCalculator
+
+    base = get_input_params()
+    calculator = BatchProfitCalculator.from_input_params(
+        [
+            base.model_copy(update=dict(repayment_amount=repayment))
+            for repayment in np.linspace(500, 10_000, n_scenarios)
+        ],
+        kernel=kernel,
+    )
+    calculator.simulate(n_years=30)  # Compiles the numba kernel
+
+    return lambda: calculator.simulate(n_years=30)
+
+
+def setup_monte_carlo(kernel: str, n_paths: int = 10_000):
+    from immo_rechner.core.monte_carlo import MonteCarloParameters, simulate_monte_carlo
+
+    base = get_input_params()
+    mc_params = MonteCarloParameters(n_paths=n_paths, seed=0, kernel=kernel)
+    simulate_monte_carlo(base, mc_params.model_copy(update=dict(n_paths=1)), 30)
+
+    return lambda: simulate_monte_carlo(base, mc_params, n_years=30)
+
+
+# Without numba, the numba benchmarks run the NumPy kernel, see get_kernel.
+for _kernel in ["numpy", "numba"]:
+    register(f"batch_10000_scenarios_{_kernel}")(
+        lambda kernel=_kernel: setup_batch(kernel)
+    )
+    register(f"monte_carlo_10000_paths_{_kernel}")(
+        lambda kernel=_kernel: setup_monte_carlo(kernel)
+    )
+
+
+def setup_update_graph(clear_cache: bool):
+    from immo_rechner.app.callbacks import update_graph
+    from immo_rechner.core.cache import simulation_cache
+
+    quiet_loggers("immo_rechner.app")
+
+    inputs = dict(
+        repayment_range=[500, 10_000],
+        yearly_income=100_000,
+        month_rent=1_500,
+        initial_debt=450_000,
+        num_years=50,
+        interest_rate_percentage=3.3,
+        facility_costs=350,
+        facility_costs_owner_share=50,
+        purchase_price=450_000,
+        depreciation_precentage=2,
+        use_repayment_range=["Use Range"],
+        repayment_value=1_500,
+        apt_own_usage="Renting",
+        own_capital_box=[],
+        own_capital=100_000,
+        maker_provision=3.57,
+    )
+
+    def call():
+        if clear_cache:
+            simulation_cache.clear()
+        return update_graph(**inputs)
+
+    return call
+
+
+register("update_graph_wide_range")(lambda: setup_update_graph(clear_cache=True))
+register("update_graph_wide_range_cached")(
+    lambda: setup_update_graph(clear_cache=False)
+)
+
+
+def measure(func: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> Dict:
+    """
+    Seconds per call: the number of calls per round is chosen by timeit such that a
+    round takes at least 0.2 seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+
+    return dict(min=min(times), median=statistics.median(times), number=number)
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT
+) -> Dict[str, Dict]:
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(
+                f"Unknown benchmark {name}, expected one of {list(BENCHMARKS)}"
+            )
+
+        results[name] = measure(BENCHMARKS[name](), repeat=repeat)
+        logger.info(f"{name}: {results[name]['min'] * 1e3:.4f} ms")
+
+    return results
+
+
+def get_metadata() -> Dict[str, str]:
+    return dict(
+        created=datetime.now(timezone.utc).isoformat(),
+        python=sys.version.split()[0],
+        numpy=np.__version__,
+        platform=platform.platform(),
+        processor=platform.processor(),
+    )
+
+
+def save_results(results: Dict[str, Dict], path: str):
+    with open(path, "w") as f:
+        json.dump(dict(metadata=get_metadata(), results=results), f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    baseline: Dict[str, Dict],
+    current: Dict[str, Dict],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict]:
+    """
+    Compares the fastest times of the benchmarks in both results. A benchmark regressed
+    if it got slower by more than threshold (relative).
+    """
+    rows = []
+    for name in current:
+        if name not in baseline:
+            continue
+
+        ratio = current[name]["min"] / baseline[name]["min"]
+        rows.append(
+            dict(
+                name=name,
+                baseline=baseline[name]["min"],
+                current=current[name]["min"],
+                ratio=ratio,
+                regression=ratio > 1.0 + threshold,
+            )
+        )
+
+    return rows
+
+
+def print_comparison(rows: List[Dict]):
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        click.echo(
+            f"{row['name']:<40} {row['baseline'] * 1e3:>12.4f} ms "
+            f"{row['current'] * 1e3:>12.4f} ms {row['ratio']:>8.2f}x {flag}"
+        )
+
+
+@click.group()
+def main():
+    """
+    Micro-benchmarks of the simulation hot paths.
+    """
+    quiet_loggers()
+
+
+@main.command()
+@click.option("--output", default=None, type=click.Path(dir_okay=False))
+@click.option("--name", "names", multiple=True, type=click.Choice(list(BENCHMARKS)))
+@click.option("--repeat", default=DEFAULT_REPEAT, type=click.IntRange(min=1))
+@click.option("--compare-to", default=None, type=click.Path(exists=True))
+@click.option("--threshold", default=DEFAULT_THRESHOLD, type=float)
+def run(output, names, repeat, compare_to, threshold):
+    """
+    Runs the benchmarks, optionally saves them to OUTPUT and compares them to a saved run.
+    """
+    results = run_benchmarks(names=list(names), repeat=repeat)
+    if output:
+        save_results(results, output)
+
+    if compare_to:
+        rows = compare_results(load_results(compare_to), results, threshold=threshold)
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+@main.command()
+@click.argument("baseline", type=click.Path(exists=True))
+@click.argument("current", type=click.Path(exists=True))
+@click.option("--threshold", default=DEFAULT_THRESHOLD, type=float)
+def compare(baseline, current, threshold):
+    """
+    Compares two saved runs; exits with 1 if a benchmark regressed by more than threshold.
+    """
+    rows = compare_results(
+        load_results(baseline), load_results(current), threshold=threshold
+    )
+    print_comparison(rows)
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
+import copy
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+N_MONTHS = 12
+
 
 class AbstractPosition(ABC):
 
+    # Constant positions return the same value every year, see immo_rechner.core.kernel.
+    is_constant = False
+    # (Hypothetical) rent, reported separately in monthly simulations.
+    is_rent = False
+
     @property
     @abstractmethod
     def is_cashflow(self) -> bool:
@@ -14,3 +24,23 @@ class AbstractPosition(ABC):
 
     def reset(self):
         pass
+
+    def evaluate_years(self, n_years: int) -> np.ndarray:
+        """
+        Values of the first n_years years, with the year as last axis. Positions with
+        a closed form override this; the default steps through evaluate of a reset copy,
+        so that the position itself is not modified (e.g., by concurrent simulations).
+        """
+        position = copy.copy(self)
+        position.reset()
+        values = [position.evaluate() for _ in range(n_years)]
+
+        return np.stack(np.broadcast_arrays(*values), axis=-1)
+
+    def evaluate_months(self, n_months: int) -> np.ndarray:
+        """
+        Values of the first n_months months (a multiple of 12), with the month as last axis.
+        By default, yearly values are spread evenly over the months of the year.
+        """
+        yearly = self.evaluate_years(n_months // N_MONTHS)
+        return np.repeat(yearly / N_MONTHS, N_MONTHS, axis=-1)
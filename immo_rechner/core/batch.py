@@ -0,0 +1,428 @@
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from immo_rechner.core.abstract_position import AbstractPosition
+from immo_rechner.core.income_tax import get_yearly_income_tax
+from immo_rechner.core.kernel import (
+    CompiledPositions,
+    compile_positions,
+    get_kernel,
+    sum_positions,
+)
+from immo_rechner.core.profit_calculator import (
+    InputParameters,
+    ProfitCalculator,
+    RESULT_COLUMNS,
+    get_simulation_columns,
+    postprocess_simulation,
+)
+from immo_rechner.core.tax_contexts import UsageContext
+from immo_rechner.core.utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+NUMERIC_FIELDS = [
+    "yearly_income",
+    "monthly_rent",
+    "facility_monthly_cost",
+    "owner_share",
+    "yearly_interest_rate",
+    "repayment_amount",
+    "initial_debt",
+    "purchase_price",
+    "own_capital",
+    "land_value",
+    "depreciation_rate",
+    "makler",
+    "notar",
+    "transfer_tax",
+    "appreciation_rate",
+]
+
+# Scenarios simulated at once by BatchProfitCalculator with a compact dtype.
+DEFAULT_CHUNK_SIZE = 2**16
+
+
+class SimulationInputError(ValueError):
+    """
+    Raised for valid InputParameters which the engine cannot simulate, e.g., renting
+    without a land value; an error of the input, not of the engine.
+    """
+
+
+def get_batch_params(
+    columns: Dict[str, np.ndarray],
+    approximate_land_value: np.ndarray,
+    renting: Union[bool, np.ndarray] = True,
+) -> SimpleNamespace:
+    """
+    Namespace of arrays of shape (n_scenarios,) from columns of NUMERIC_FIELDS and tax_year.
+
+    The land value is resolved per scenario (and approximate_land_value set to False),
+    so that the namespace can be passed to ProfitCalculator.get_*_positions as is. Only
+    scenarios rented out (renting, per scenario or for all) need a land value.
+    """
+    columns = dict(columns)
+
+    if np.any(renting & ~approximate_land_value & np.isnan(columns["land_value"])):
+        raise SimulationInputError(
+            "land_value is None and approximate_land_value is False."
+        )
+
+    columns["land_value"] = np.where(
+        approximate_land_value, 0.2 * columns["purchase_price"], columns["land_value"]
+    )
+
+    return SimpleNamespace(**columns, approximate_land_value=False)
+
+
+def check_simulatable(params: InputParameters):
+    """
+    Raises SimulationInputError for InputParameters that get_batch_params rejects, so that single
+    scenarios can be reported before a batch is simulated. Unknown tax years are
+    rejected by InputParameters itself.
+    """
+    if (
+        params.usage == UsageContext.RENTING
+        and (not params.approximate_land_value)
+        and (params.land_value is None)
+    ):
+        raise SimulationInputError(
+            "land_value is None and approximate_land_value is False."
+        )
+
+
+def stack_input_params(input_params: Sequence[InputParameters]) -> SimpleNamespace:
+    """
+    Stacks a sequence of InputParameters into one namespace of arrays of shape (n_scenarios,).
+    """
+    columns = {
+        field: np.array(
+            [getattr(p, field) for p in input_params], dtype=float
+        )  # None becomes nan
+        for field in NUMERIC_FIELDS
+    }
+    columns["tax_year"] = np.array([p.tax_year for p in input_params], dtype=int)
+
+    return get_batch_params(
+        columns,
+        approximate_land_value=np.array(
+            [p.approximate_land_value for p in input_params], dtype=bool
+        ),
+        renting=np.array(
+            [p.usage == UsageContext.RENTING for p in input_params], dtype=bool
+        ),
+    )
+
+
+class BatchResult:
+    """
+    Simulation results of many scenarios. Every column is an array of shape (n_scenarios, n_years).
+    """
+
+    def __init__(self, years: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.years = years
+        self.columns = columns
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.columns["cashflow"].shape[0]
+
+    @property
+    def n_years(self) -> int:
+        return len(self.years)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def astype(self, dtype) -> "BatchResult":
+        """
+        Result with all columns converted to dtype, e.g., np.float32 to halve its memory.
+        """
+        return BatchResult(
+            years=self.years,
+            columns={
+                name: values.astype(dtype, copy=False)
+                for (name, values) in self.columns.items()
+            },
+        )
+
+    def scenario(self, index: int) -> "pd.DataFrame":
+        """
+        Returns one scenario in the same format as ProfitCalculator.simulate.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            dict(
+                year=self.years,
+                **{name: values[index] for (name, values) in self.columns.items()},
+            )
+        )
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        Returns all scenarios as one long DataFrame with a scenario and a year column.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            dict(
+                scenario=np.repeat(np.arange(self.n_scenarios), self.n_years),
+                year=np.tile(self.years, self.n_scenarios),
+                **{name: values.ravel() for (name, values) in self.columns.items()},
+            )
+        )
+
+
+class BatchProfitCalculator:
+    """
+    Simulates many scenarios of the same usage at once.
+
+    Positions are the ones of ProfitCalculator, constructed with array-valued parameters
+    and compiled (see immo_rechner.core.kernel), so a simulation costs a handful of NumPy
+    operations regardless of the number of scenarios and years.
+    With use_lookup_table the income tax is read from the exact (whole euro) lookup table
+    of immo_rechner.core.income_tax instead of being evaluated.
+    Custom positions (e.g., with stochastic paths) can replace the default ones.
+
+    Large batches (e.g., Monte Carlo paths and sweeps) run the loop kernel of
+    immo_rechner.core.jit instead if numba is installed, see get_kernel.
+
+    With a compact dtype (e.g., np.float32) the results are stored in dtype and the
+    scenarios are simulated in chunks of chunk_size (default DEFAULT_CHUNK_SIZE), so that
+    only one chunk is held in float64 at a time. Chunking needs the default positions.
+    """
+
+    def __init__(
+        self,
+        usage: UsageContext,
+        params: SimpleNamespace,
+        use_lookup_table: bool = False,
+        positions: Optional[List[AbstractPosition]] = None,
+        kernel: Optional[str] = None,
+        dtype=np.float64,
+        chunk_size: Optional[int] = None,
+    ):
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size should be positive, got: {chunk_size}")
+        if chunk_size is not None and positions is not None:
+            raise ValueError("Custom positions cannot be simulated in chunks.")
+
+        self.usage = usage
+        self.params = params
+        self.use_lookup_table = use_lookup_table
+        self.kernel = kernel
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.has_custom_positions = positions is not None
+
+        if positions is not None:
+            self.positions = positions
+        elif usage == UsageContext.RENTING:
+            self.positions = ProfitCalculator.get_renting_positions(params)
+        elif usage == UsageContext.OWN_USE:
+            self.positions = ProfitCalculator.get_own_usage_positions(params)
+        else:
+            raise ValueError(f"Unknown usage: {usage}")
+
+        self.interest_rate_position = ProfitCalculator.fetch_interest_rate_position(
+            self.positions
+        )
+
+    @property
+    def n_scenarios(self) -> int:
+        return len(self.params.yearly_income)
+
+    @classmethod
+    def from_input_params(
+        cls,
+        input_params: Sequence[InputParameters],
+        use_lookup_table: bool = False,
+        kernel: Optional[str] = None,
+        dtype=np.float64,
+        chunk_size: Optional[int] = None,
+    ):
+        usages = {p.usage for p in input_params}
+        if len(usages) != 1:
+            raise ValueError(f"Expected exactly one usage, got: {usages}")
+
+        return cls(
+            usage=usages.pop(),
+            params=stack_input_params(input_params),
+            use_lookup_table=use_lookup_table,
+            kernel=kernel,
+            dtype=dtype,
+            chunk_size=chunk_size,
+        )
+
+    def get_chunk_size(self) -> int:
+        if self.chunk_size is not None:
+            return self.chunk_size
+        if self.dtype == np.float64 or self.has_custom_positions:
+            return self.n_scenarios
+
+        return DEFAULT_CHUNK_SIZE
+
+    def get_chunk(self, chunk: slice) -> "BatchProfitCalculator":
+        """
+        Calculator of the scenarios in chunk, with the default positions.
+        """
+        return BatchProfitCalculator(
+            usage=self.usage,
+            params=SimpleNamespace(
+                **{
+                    name: values[chunk] if np.ndim(values) > 0 else values
+                    for (name, values) in vars(self.params).items()
+                }
+            ),
+            use_lookup_table=self.use_lookup_table,
+            kernel=self.kernel,
+        )
+
+    def get_yearly_income_tax(self, taxable_income: np.ndarray) -> np.ndarray:
+        """
+        Income tax of taxable_income of shape (n_scenarios, ...).
+        """
+        tax_year = np.asarray(self.params.tax_year)
+        return get_yearly_income_tax(
+            taxable_income,
+            tax_year=tax_year.reshape(
+                tax_year.shape + (1,) * (taxable_income.ndim - 1)
+            ),
+            use_lookup_table=self.use_lookup_table,
+        )
+
+    def compile(self, n_years: int) -> CompiledPositions:
+        """
+        Yearly struct-of-arrays form of the positions of all scenarios.
+        """
+        return compile_positions(
+            self.positions,
+            interest_rate_position=self.interest_rate_position,
+            n_years=n_years,
+        )
+
+    def simulate(self, n_years: int) -> BatchResult:
+        """
+        Simulates all scenarios, chunk by chunk if get_chunk_size is smaller than the number
+        of scenarios, and returns the results in dtype.
+        """
+        chunk_size = self.get_chunk_size()
+        if chunk_size >= self.n_scenarios:
+            return self.simulate_batch(n_years).astype(self.dtype)
+
+        logger.debug(
+            f"Simulating {self.n_scenarios} scenarios in chunks of {chunk_size} "
+            f"as {self.dtype}"
+        )
+        columns = {
+            name: np.empty((self.n_scenarios, n_years), dtype=self.dtype)
+            for name in RESULT_COLUMNS
+        }
+        for start in range(0, self.n_scenarios, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            result = self.get_chunk(chunk).simulate_batch(n_years)
+            for name in RESULT_COLUMNS:
+                columns[name][chunk] = result[name]
+
+        return BatchResult(years=np.arange(1, n_years + 1), columns=columns)
+
+    def simulate_batch(self, n_years: int) -> BatchResult:
+        """
+        Simulates all scenarios at once with the positions compiled by
+        immo_rechner.core.kernel, or with the loop kernel of immo_rechner.core.jit, see
+        get_kernel.
+        """
+        if get_kernel(self.n_scenarios, self.kernel) == "numba":
+            columns = self.simulate_loop(n_years)
+        else:
+            columns = self.compile(n_years).simulate(
+                usage=self.usage,
+                yearly_income=self.params.yearly_income,
+                get_yearly_income_tax=self.get_yearly_income_tax,
+            )
+
+        return self.postprocess_simulation(
+            years=np.arange(1, n_years + 1), columns=get_simulation_columns(columns)
+        )
+
+    def simulate_loop(self, n_years: int) -> Dict[str, np.ndarray]:
+        """
+        Yearly columns of the kernel from the loop kernel of immo_rechner.core.jit: the
+        interest and the income tax are computed per scenario, all other positions are
+        summed as in the NumPy kernel.
+        """
+        from immo_rechner.core.jit import simulate_paths
+
+        constant, periodic = sum_positions(
+            [p for p in self.positions if p is not self.interest_rate_position],
+            n_years=n_years,
+        )
+        shape = (self.n_scenarios, n_years)
+
+        return simulate_paths(
+            yearly_rates=np.broadcast_to(
+                self.interest_rate_position.get_yearly_rates(n_years), shape
+            ),
+            repayment_amount=self.interest_rate_position.repayment_amount,
+            initial_debt=self.interest_rate_position.initial_debt,
+            profit=np.broadcast_to(
+                constant["profit"][..., None] + periodic["profit"], shape
+            ),
+            cashflow=np.broadcast_to(
+                constant["cashflow"][..., None] + periodic["cashflow"], shape
+            ),
+            yearly_income=self.params.yearly_income,
+            tax_year=self.params.tax_year,
+            taxed=self.usage == UsageContext.RENTING,
+            exact=self.use_lookup_table,
+        )
+
+    def postprocess_simulation(
+        self, years: np.ndarray, columns: Dict[str, np.ndarray]
+    ) -> BatchResult:
+        return BatchResult(
+            years=years,
+            columns=postprocess_simulation(
+                years=years,
+                columns=columns,
+                usage=self.usage,
+                own_capital=self.params.own_capital,
+            ),
+        )
+
+
+def simulate_scenarios(
+    input_params: Sequence[InputParameters],
+    n_years: int,
+    use_lookup_table: bool = False,
+) -> BatchResult:
+    """
+    Simulates scenarios of possibly mixed usages; one batched pass per usage.
+    The order of the scenarios is preserved.
+    """
+    n_scenarios = len(input_params)
+    columns = {name: np.empty((n_scenarios, n_years)) for name in RESULT_COLUMNS}
+
+    for usage in UsageContext:
+        indices: List[int] = [
+            i for (i, p) in enumerate(input_params) if p.usage == usage
+        ]
+        if not indices:
+            continue
+
+        logger.debug(f"Simulating {len(indices)} scenarios with usage {usage}")
+        result = BatchProfitCalculator.from_input_params(
+            [input_params[i] for i in indices], use_lookup_table=use_lookup_table
+        ).simulate(n_years=n_years)
+
+        for name in RESULT_COLUMNS:
+            columns[name][indices] = result[name]
+
+    return BatchResult(years=np.arange(1, n_years + 1), columns=columns)
@@ -0,0 +1,287 @@
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from immo_rechner.core.batch import simulate_scenarios
+from immo_rechner.core.income_tax import FILE_DIR, TARIFF_PATH
+from immo_rechner.core.profit_calculator import CompiledCalculator, InputParameters
+from immo_rechner.core.utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+CACHE_DIR_ENV = "IMMO_RECHNER_CACHE_DIR"
+CACHE_SIZE_ENV = "IMMO_RECHNER_CACHE_SIZE"
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_MAX_DISK_ENTRIES = 16384
+# Share of max_entries left by an eviction, so that the next one is only due after
+# max_entries / 10 writes.
+EVICT_TARGET = 0.9
+FILE_SUFFIX = ".npz"
+PACKAGE_NAME = "immo-rechner"
+
+
+@lru_cache(maxsize=None)
+def get_cache_version() -> str:
+    """
+    Version of the simulation model: the package version and a hash of the tariffs and
+    the sources of immo_rechner.core, so that results persisted by a DiskBackend are not
+    served after an upgrade (or a change of the code in a checkout).
+    """
+    try:
+        version = importlib.metadata.version(PACKAGE_NAME)
+    except importlib.metadata.PackageNotFoundError:  # Not installed, e.g., a checkout
+        version = "unknown"
+
+    digest = hashlib.sha256()
+    for path in [TARIFF_PATH] + sorted(glob.glob(os.path.join(FILE_DIR, "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+
+    return f"{version}-{digest.hexdigest()[:16]}"
+
+
+def get_cache_key(input_params: InputParameters, n_years: int) -> str:
+    """
+    Canonical hash of the parameters of a simulation and get_cache_version: equal inputs
+    give equal keys, independent of field order and of how the values were entered.
+    """
+    payload = json.dumps(
+        dict(
+            params=input_params.model_dump(mode="json"),
+            n_years=n_years,
+            version=get_cache_version(),
+        ),
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DiskBackend:
+    """
+    Stores DataFrames of numeric columns (such as simulation results) as one .npz file
+    per key in a directory, so that several processes (e.g., gunicorn workers) can share
+    entries. Files are loaded without pickle, so a file in the directory cannot run code.
+    Writes are atomic; the least recently used files are removed once there are more
+    than about max_entries.
+    """
+
+    def __init__(self, directory: str, max_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        # Number of files, counted by the last eviction and the writes since then
+        self.n_entries: Optional[int] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + FILE_SUFFIX)
+
+    def get(self, key: str) -> Optional["pd.DataFrame"]:
+        import pandas as pd
+
+        path = self.get_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                df = pd.DataFrame({name: data[name] for name in data.files})
+            os.utime(path)  # Marks as recently used
+        except (OSError, EOFError, ValueError, zipfile.BadZipFile):
+            return None
+
+        return df
+
+    def put(self, key: str, df: "pd.DataFrame"):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **{name: df[name].to_numpy() for name in df.columns})
+        os.replace(tmp_path, self.get_path(key))
+
+        # Files of other processes are only counted by the next eviction
+        if self.n_entries is None:
+            self.evict()
+        else:
+            self.n_entries += 1
+            if self.n_entries > self.max_entries:
+                self.evict()
+
+    def scan(self) -> List[os.DirEntry]:
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(FILE_SUFFIX)
+        ]
+
+    def evict(self):
+        """
+        Counts the files and, if there are more than max_entries, removes the least
+        recently used ones down to EVICT_TARGET of max_entries.
+        """
+        entries = self.scan()
+        self.n_entries = len(entries)
+        if self.n_entries <= self.max_entries:
+            return
+
+        n_surplus = self.n_entries - int(EVICT_TARGET * self.max_entries)
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in entries[:n_surplus]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:  # Removed by another process
+                pass
+        self.n_entries -= n_surplus
+
+    def clear(self):
+        for entry in self.scan():
+            os.remove(entry.path)
+        self.n_entries = 0
+
+
+class SimulationCache:
+    """
+    Size-bounded LRU cache of simulation results keyed by get_cache_key, with an
+    optional DiskBackend behind the in-memory entries.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        disk_backend: Optional[DiskBackend] = None,
+    ):
+        self.max_size = max_size
+        self.disk_backend = disk_backend
+
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        directory = os.environ.get(CACHE_DIR_ENV)
+        max_size = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_SIZE))
+
+        if directory:
+            logger.info(f"Using simulation cache on disk: {directory}")
+
+        return cls(
+            max_size=max_size,
+            disk_backend=DiskBackend(directory) if directory else None,
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        return dict(
+            hits=self.hits, misses=self.misses, hit_rate=self.hit_rate, size=len(self)
+        )
+
+    def get(self, key: str):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        value = self.disk_backend.get(key) if self.disk_backend else None
+
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.put_in_memory(key, value)
+
+        return value
+
+    def put(self, key: str, value):
+        with self.lock:
+            self.put_in_memory(key, value)
+
+        if self.disk_backend:
+            self.disk_backend.put(key, value)
+
+    def put_in_memory(self, key: str, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+        if self.disk_backend:
+            self.disk_backend.clear()
+
+    def simulate(
+        self, input_params: Sequence[InputParameters], n_years: int
+    ) -> List["pd.DataFrame"]:
+        """
+        Same as ProfitCalculator.simulate for every scenario. Only the scenarios
+        not in the cache are simulated, all together in one batched pass.
+        Returned DataFrames are shared with the cache and must not be modified.
+        """
+        keys = [get_cache_key(params, n_years) for params in input_params]
+        output = [self.get(key) for key in keys]
+
+        missing = [index for (index, df) in enumerate(output) if df is None]
+        if missing:
+            result = simulate_scenarios(
+                [input_params[index] for index in missing], n_years=n_years
+            )
+            for result_index, index in enumerate(missing):
+                output[index] = result.scenario(result_index)
+                self.put(keys[index], output[index])
+
+        return output
+
+
+simulation_cache = SimulationCache.from_env()
+
+# In memory only: compiled calculators are cheap to rebuild and shared between threads.
+compiled_calculators = SimulationCache()
+
+
+def get_compiled_calculator(
+    input_params: InputParameters,
+    n_years: int,
+    resolution: str = "yearly",
+    cache: Optional[SimulationCache] = None,
+) -> CompiledCalculator:
+    """
+    CompiledCalculator of input_params, compiled once and then shared, e.g., by all
+    threads of a worker.
+    """
+    cache = compiled_calculators if cache is None else cache
+    key = f"{get_cache_key(input_params, n_years)}-{resolution}"
+
+    calculator = cache.get(key)
+    if calculator is None:
+        calculator = CompiledCalculator.from_input_params(
+            input_params, n_years=n_years, resolution=resolution
+        )
+        cache.put(key, calculator)
+
+    return calculator
@@ -0,0 +1,214 @@
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+from immo_rechner.core.cost import InterestRate
+from immo_rechner.core.income_tax import get_yearly_income_tax
+from immo_rechner.core.kernel import CompiledPositions, sum_positions
+from immo_rechner.core.profit_calculator import (
+    InputParameters,
+    ProfitCalculator,
+    get_simulation_columns,
+    postprocess_simulation,
+)
+from immo_rechner.core.tax_contexts import UsageContext
+from immo_rechner.core.utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+# Order of the usages along the first axis of compile_usages.
+USAGES = [UsageContext.RENTING, UsageContext.OWN_USE]
+USAGE_PREFIXES = {UsageContext.RENTING: "renting", UsageContext.OWN_USE: "own_use"}
+
+
+def compile_usages(input_params: InputParameters, n_years: int) -> CompiledPositions:
+    """
+    Yearly compiled positions of input_params for all USAGES, whatever
+    input_params.usage is, with one row per usage, i.e., arrays of shape
+    (len(USAGES), n_years).
+
+    The loan does not depend on the usage, so its schedule is computed once and shared
+    by both rows; only the positions specific to a usage (rent, maintenance share,
+    depreciation or appreciation and write-offs) are summed per usage.
+    """
+    params = input_params.model_copy()
+    positions = [
+        ProfitCalculator.get_renting_positions(params),
+        ProfitCalculator.get_own_usage_positions(params),
+    ]
+    interest_rate_position = ProfitCalculator.fetch_interest_rate_position(positions[0])
+    sums = [
+        sum_positions(
+            [p for p in usage_positions if not isinstance(p, InterestRate)],
+            n_years=n_years,
+        )
+        for usage_positions in positions
+    ]
+
+    schedule = interest_rate_position.get_schedule(n_years)
+    interest = dict(
+        interest_cost=schedule.yearly_interest,
+        remaining_debt=schedule.yearly_remaining_debt,
+        cumulative_interest_cost=schedule.yearly_cumulative_interest,
+        total_paid=schedule.yearly_total_paid,
+    )
+    shape = (len(USAGES), n_years)
+
+    def stack_constant(name: str) -> np.ndarray:
+        return np.array([constant[name] for (constant, _) in sums])
+
+    def stack_periodic(name: str) -> np.ndarray:
+        values = np.zeros(shape)
+        for row, (_, periodic) in enumerate(sums):
+            values[row] += periodic[name]
+        return values
+
+    # The interest is a cashflow and deducted from the profit of both usages
+    interest_cost = interest["interest_cost"][:n_years]
+
+    return CompiledPositions(
+        n_years=n_years,
+        periods_per_year=1,
+        constant_profit=stack_constant("profit"),
+        constant_cashflow=stack_constant("cashflow"),
+        constant_rent=stack_constant("rent"),
+        periodic_profit=stack_periodic("profit") - interest_cost,
+        periodic_cashflow=stack_periodic("cashflow") - interest_cost,
+        periodic_rent=stack_periodic("rent"),
+        **{
+            name: np.broadcast_to(values[:n_years], shape)
+            for (name, values) in interest.items()
+        },
+    )
+
+
+class UsageComparison:
+    """
+    Yearly simulations (as ProfitCalculator.simulate_columns) of the same property rented
+    out and used by its owner.
+
+    The usages are compared by their net benefit: the cashflow, plus for own use the rent
+    the owner does not pay elsewhere (saved_rent, one value per year). advantage is the
+    net benefit of renting minus the one of own use, positive if renting is better in
+    that year.
+    """
+
+    def __init__(
+        self,
+        renting: Dict[str, np.ndarray],
+        own_use: Dict[str, np.ndarray],
+        saved_rent: np.ndarray,
+    ):
+        self.renting = renting
+        self.own_use = own_use
+        self.saved_rent = saved_rent
+
+    @property
+    def years(self) -> np.ndarray:
+        return self.renting["year"]
+
+    def get_net_benefit(self, usage: UsageContext) -> np.ndarray:
+        if usage == UsageContext.RENTING:
+            return self.renting["cashflow"]
+
+        return self.own_use["cashflow"] + self.saved_rent
+
+    @property
+    def advantage(self) -> np.ndarray:
+        return self.get_net_benefit(UsageContext.RENTING) - self.get_net_benefit(
+            UsageContext.OWN_USE
+        )
+
+    @property
+    def cumulative_advantage(self) -> np.ndarray:
+        return np.cumsum(self.advantage)
+
+    @property
+    def break_even_year(self) -> Optional[int]:
+        """
+        First year in which the cumulative advantage has the opposite sign of its first
+        non-zero value, i.e., from which on the usage behind at first is ahead; None if
+        that does not happen within the horizon. Touching zero is not a break-even.
+        """
+        sign = np.sign(self.cumulative_advantage)
+        non_zero = np.flatnonzero(sign)
+        if len(non_zero) == 0:
+            return None
+
+        opposite = np.flatnonzero(sign == -sign[non_zero[0]])
+        if len(opposite) == 0:
+            return None
+
+        return int(self.years[opposite[0]])
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        One row per year with the columns of both usages side by side (prefixed by
+        USAGE_PREFIXES), saved_rent, advantage and cumulative_advantage.
+        """
+        import pandas as pd
+
+        columns = dict(year=self.years)
+        for usage, usage_columns in [
+            (UsageContext.RENTING, self.renting),
+            (UsageContext.OWN_USE, self.own_use),
+        ]:
+            for name, values in usage_columns.items():
+                if name != "year":
+                    columns[f"{USAGE_PREFIXES[usage]}_{name}"] = values
+
+        return pd.DataFrame(
+            dict(
+                columns,
+                saved_rent=self.saved_rent,
+                advantage=self.advantage,
+                cumulative_advantage=self.cumulative_advantage,
+            )
+        )
+
+
+def compare_usages(input_params: InputParameters, n_years: int) -> UsageComparison:
+    """
+    Simulates input_params rented out and in own use in one pass over the positions
+    compiled by compile_usages. Only the profit of renting is taxed.
+    """
+    logger.info(f"Comparing renting and own use over {n_years} years")
+    columns = compile_usages(input_params, n_years).simulate_before_taxes()
+
+    # Income tax with and without the profit of renting in one call
+    income_tax = np.zeros((len(USAGES), n_years))
+    renting = USAGES.index(UsageContext.RENTING)
+    tax = get_yearly_income_tax(
+        input_params.yearly_income
+        + np.append(columns["profit_before_taxes"][renting], 0.0),
+        tax_year=input_params.tax_year,
+    )
+    income_tax[renting] = tax[:-1] - tax[-1]
+    columns = dict(
+        columns, cashflow=columns["cashflow"] - income_tax, income_tax=income_tax
+    )
+
+    years = np.arange(1, n_years + 1)
+    results = {
+        usage: dict(
+            year=years,
+            **postprocess_simulation(
+                years=years,
+                columns=get_simulation_columns(
+                    {name: values[index] for (name, values) in columns.items()}
+                ),
+                usage=usage,
+                own_capital=input_params.own_capital,
+            ),
+        )
+        for (index, usage) in enumerate(USAGES)
+    }
+
+    return UsageComparison(
+        renting=results[UsageContext.RENTING],
+        own_use=results[UsageContext.OWN_USE],
+        saved_rent=columns["rent"][USAGES.index(UsageContext.OWN_USE)],
+    )
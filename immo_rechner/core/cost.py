@@ -1,10 +1,21 @@
 from abc import ABC
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+import numpy as np
 
 from immo_rechner.core.abstract_position import AbstractPosition
 from immo_rechner.core.tax_contexts import RentingVsOwnUsageTaxContext, UsageContext
 
 N_MONTHS = 12
+DEFAULT_SCHEDULE_YEARS = 50
+MAX_CHUNK_SIZE = 2**20  # Number of monthly values computed at once
+
+YEARLY_COLUMNS = [
+    "yearly_interest",
+    "yearly_remaining_debt",
+    "yearly_total_paid",
+    "yearly_cumulative_interest",
+]
 
 
 class BuildingMaintenance(RentingVsOwnUsageTaxContext, AbstractPosition):
@@ -13,6 +24,7 @@ class BuildingMaintenance(RentingVsOwnUsageTaxContext, AbstractPosition):
     """
 
     is_cashflow = True
+    is_constant = True
 
     def __init__(
         self,
@@ -35,6 +47,243 @@ class BuildingMaintenance(RentingVsOwnUsageTaxContext, AbstractPosition):
         return -self.yearly_cost * self.owner_share
 
 
+def compute_remaining_debt(
+    yearly_rate: np.ndarray,
+    repayment_amount: np.ndarray,
+    initial_debt: np.ndarray,
+    n_months: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Remaining debt after every month and monthly interest of annuity loans given by arrays
+    of shape (n_scenarios,); both returned arrays have shape (n_scenarios, n_months).
+
+    The remaining debt follows the closed form of the recurrence
+        debt_k = (1 + r) * debt_{k-1} - repayment_amount,  r = yearly_rate / 12,
+    i.e., debt_k = (1 + r)^k * initial_debt - repayment_amount * ((1 + r)^k - 1) / r.
+    Once the loan is paid off, the last payment only covers the remaining debt and all
+    later payments are zero.
+    """
+    rate = yearly_rate[:, None] / N_MONTHS
+    repayment_amount = repayment_amount[:, None]
+    initial_debt = initial_debt[:, None]
+
+    months = np.arange(1, n_months + 1)
+    growth_minus_one = np.expm1(months * np.log1p(rate))
+    annuity_factor = np.where(
+        rate == 0.0, months, growth_minus_one / np.where(rate == 0.0, 1.0, rate)
+    )
+
+    remaining_debt = np.maximum(
+        (growth_minus_one + 1.0) * initial_debt - repayment_amount * annuity_factor,
+        0.0,
+    )
+    previous_debt = np.concatenate([initial_debt, remaining_debt[:, :-1]], axis=1)
+
+    return remaining_debt, rate * previous_debt
+
+
+def compute_monthly_schedule(
+    yearly_rate: np.ndarray,
+    repayment_amount: np.ndarray,
+    initial_debt: np.ndarray,
+    n_months: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Full monthly schedule, see compute_remaining_debt.
+    """
+    remaining_debt, interest = compute_remaining_debt(
+        yearly_rate, repayment_amount, initial_debt, n_months
+    )
+    previous_debt = np.concatenate(
+        [initial_debt[:, None], remaining_debt[:, :-1]], axis=1
+    )
+    payment = previous_debt + interest - remaining_debt
+
+    return dict(
+        interest=interest,
+        payment=payment,
+        repayment=payment - interest,
+        remaining_debt=remaining_debt,
+        total_paid=np.cumsum(payment, axis=1),
+        cumulative_interest=np.cumsum(interest, axis=1),
+    )
+
+
+def compute_yearly_schedule(
+    yearly_rate: np.ndarray,
+    repayment_amount: np.ndarray,
+    initial_debt: np.ndarray,
+    n_years: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Yearly schedule, see compute_remaining_debt. Yearly payments follow from
+        payment = interest + debt at the start of the year - debt at the end of the year.
+    """
+    remaining_debt, interest = compute_remaining_debt(
+        yearly_rate, repayment_amount, initial_debt, n_years * N_MONTHS
+    )
+
+    yearly_interest = interest.reshape(-1, n_years, N_MONTHS).sum(axis=-1)
+    yearly_remaining_debt = remaining_debt[:, N_MONTHS - 1 :: N_MONTHS]
+    start_of_year_debt = np.concatenate(
+        [initial_debt[:, None], yearly_remaining_debt[:, :-1]], axis=1
+    )
+    yearly_payment = yearly_interest + start_of_year_debt - yearly_remaining_debt
+
+    return dict(
+        yearly_interest=yearly_interest,
+        yearly_remaining_debt=yearly_remaining_debt,
+        yearly_total_paid=np.cumsum(yearly_payment, axis=1),
+        yearly_cumulative_interest=np.cumsum(yearly_interest, axis=1),
+    )
+
+
+class AmortizationSchedule:
+    """
+    Yearly (and on demand monthly) schedule of annuity loans, see compute_remaining_debt.
+    Parameters can be scalars or arrays; the schedule then has shape (..., n_years),
+    respectively (..., n_months) for get_monthly.
+
+    Yearly values are computed in chunks of scenarios, so that the memory stays bounded
+    for large sweeps.
+    """
+
+    def __init__(
+        self,
+        yearly_rate,
+        repayment_amount,
+        initial_debt,
+        n_years: int,
+    ):
+        self.n_years = n_years
+
+        params = np.broadcast_arrays(
+            *(
+                np.asarray(value, dtype=float)
+                for value in [yearly_rate, repayment_amount, initial_debt]
+            )
+        )
+        self.shape = params[0].shape
+        self.params = [value.reshape(-1) for value in params]
+        self.monthly: Optional[Dict[str, np.ndarray]] = None
+
+        n_scenarios = self.params[0].size
+        chunk_size = max(1, MAX_CHUNK_SIZE // (n_years * N_MONTHS))
+
+        yearly = {name: np.empty((n_scenarios, n_years)) for name in YEARLY_COLUMNS}
+        for start in range(0, n_scenarios, chunk_size):
+            chunk = compute_yearly_schedule(
+                *(value[start : start + chunk_size] for value in self.params),
+                n_years=n_years,
+            )
+            for name, values in chunk.items():
+                yearly[name][start : start + chunk_size] = values
+
+        yearly = {
+            name: values.reshape(self.shape + (n_years,))
+            for (name, values) in yearly.items()
+        }
+        self.yearly_interest = yearly["yearly_interest"]
+        self.yearly_remaining_debt = yearly["yearly_remaining_debt"]
+        self.yearly_total_paid = yearly["yearly_total_paid"]
+        self.yearly_cumulative_interest = yearly["yearly_cumulative_interest"]
+
+    def get_monthly(self) -> Dict[str, np.ndarray]:
+        """
+        Monthly interest, payment, repayment, remaining_debt, total_paid and cumulative_interest.
+        """
+        monthly = self.monthly
+        if monthly is None:
+            monthly = compute_monthly_schedule(
+                *self.params, n_months=self.n_years * N_MONTHS
+            )
+            monthly = {
+                name: values.reshape(self.shape + (-1,))
+                for (name, values) in monthly.items()
+            }
+            self.monthly = monthly
+
+        return monthly
+
+
+class RefinancedAmortizationSchedule:
+    """
+    Yearly schedule of annuity loans whose rate is reset every fixed_rate_years.
+    period_rates has shape (..., n_periods): the yearly rate of every fixed-rate period.
+    Every period is an AmortizationSchedule starting from the debt left by the previous one.
+    """
+
+    def __init__(
+        self,
+        period_rates,
+        repayment_amount,
+        initial_debt,
+        fixed_rate_years: int,
+        n_years: int,
+    ):
+        self.n_years = n_years
+
+        period_rates = np.asarray(period_rates, dtype=float)
+        shape = period_rates.shape[:-1] + (n_years,)
+        self.yearly_interest = np.empty(shape)
+        self.yearly_remaining_debt = np.empty(shape)
+        self.yearly_total_paid = np.empty(shape)
+        self.yearly_cumulative_interest = np.empty(shape)
+        self.monthly: Optional[Dict[str, np.ndarray]] = None
+        self.periods = []  # (schedule, total_paid and cumulative_interest before)
+
+        remaining_debt, total_paid, cumulative_interest = initial_debt, 0.0, 0.0
+        for period, start in enumerate(range(0, n_years, fixed_rate_years)):
+            stop = min(start + fixed_rate_years, n_years)
+            schedule = AmortizationSchedule(
+                yearly_rate=period_rates[..., period],
+                repayment_amount=repayment_amount,
+                initial_debt=remaining_debt,
+                n_years=stop - start,
+            )
+            self.periods.append((schedule, total_paid, cumulative_interest))
+
+            self.yearly_interest[..., start:stop] = schedule.yearly_interest
+            self.yearly_remaining_debt[..., start:stop] = schedule.yearly_remaining_debt
+            self.yearly_total_paid[..., start:stop] = (
+                np.asarray(total_paid)[..., None] + schedule.yearly_total_paid
+            )
+            self.yearly_cumulative_interest[..., start:stop] = (
+                np.asarray(cumulative_interest)[..., None]
+                + schedule.yearly_cumulative_interest
+            )
+
+            remaining_debt = self.yearly_remaining_debt[..., stop - 1]
+            total_paid = self.yearly_total_paid[..., stop - 1]
+            cumulative_interest = self.yearly_cumulative_interest[..., stop - 1]
+
+    def get_monthly(self) -> Dict[str, np.ndarray]:
+        """
+        See AmortizationSchedule.get_monthly.
+        """
+        monthly = self.monthly
+        if monthly is None:
+            parts = []
+            for schedule, total_paid, cumulative_interest in self.periods:
+                monthly = dict(schedule.get_monthly())
+                monthly["total_paid"] = (
+                    np.asarray(total_paid)[..., None] + monthly["total_paid"]
+                )
+                monthly["cumulative_interest"] = (
+                    np.asarray(cumulative_interest)[..., None]
+                    + monthly["cumulative_interest"]
+                )
+                parts.append(monthly)
+
+            monthly = {
+                name: np.concatenate([part[name] for part in parts], axis=-1)
+                for name in parts[0]
+            }
+            self.monthly = monthly
+
+        return monthly
+
+
 class InterestRate(RentingVsOwnUsageTaxContext, AbstractPosition):
     """
     Class for computing interest rate
@@ -52,44 +301,72 @@ class InterestRate(RentingVsOwnUsageTaxContext, AbstractPosition):
         RentingVsOwnUsageTaxContext.__init__(self, usage=usage)
 
         self.yearly_rate = yearly_rate
-        self.remaining_debt = initial_debt
         self.repayment_amount = repayment_amount
-
-        # Mutable values
         self.initial_debt = initial_debt
-        self.total_interest_cost = 0.0
-        self.this_year_interest_cost = 0.0
-        self.total_paid = 0.0
 
-        self.counter = 0
+        self.schedule: Optional[AmortizationSchedule] = None
+
+        # Mutable values
+        self.reset()
 
     def reset(self):
+        self.year = 0
         self.remaining_debt = self.initial_debt
         self.total_interest_cost = 0.0
         self.this_year_interest_cost = 0.0
         self.total_paid = 0.0
 
-    def pay_interest_per_month(self):
-        cost = (self.yearly_rate / N_MONTHS) * self.remaining_debt
-        self.total_interest_cost += cost
-        self.remaining_debt -= self.repayment_amount - cost
-        self.total_paid += self.repayment_amount
-
-        self.counter += 1
+    def get_schedule(self, n_years: int) -> AmortizationSchedule:
+        """
+        Returns the schedule covering at least n_years. The schedule is computed once
+        and only recomputed (for twice the horizon) if a longer horizon is asked for.
+        Schedules are never modified, so concurrent calls at worst compute one twice.
+        """
+        schedule = self.schedule
+        if (schedule is None) or (schedule.n_years < n_years):
+            current_n_years = 0 if schedule is None else schedule.n_years
+            schedule = AmortizationSchedule(
+                yearly_rate=self.yearly_rate,
+                repayment_amount=self.repayment_amount,
+                initial_debt=self.initial_debt,
+                n_years=max(n_years, 2 * current_n_years),
+            )
+            self.schedule = schedule
 
-        return cost
+        return schedule
 
     def evaluate(self, *args, **kwargs):
-        self.this_year_interest_cost = 0.0
+        self.year += 1
+        schedule = self.get_schedule(
+            self.year if self.schedule else DEFAULT_SCHEDULE_YEARS
+        )
+        index = self.year - 1
 
-        for _ in range(N_MONTHS):
-            self.this_year_interest_cost += self.pay_interest_per_month()
+        self.this_year_interest_cost = schedule.yearly_interest[..., index]
+        self.total_interest_cost = schedule.yearly_cumulative_interest[..., index]
+        self.remaining_debt = schedule.yearly_remaining_debt[..., index]
+        self.total_paid = schedule.yearly_total_paid[..., index]
 
         return -self.this_year_interest_cost
 
+    def evaluate_years(self, n_years: int) -> np.ndarray:
+        return -self.get_schedule(n_years).yearly_interest[..., :n_years]
+
+    def get_yearly_rates(self, n_years: int) -> np.ndarray:
+        """
+        Interest rate of every year, of shape (..., n_years).
+        """
+        rate = np.asarray(self.yearly_rate, dtype=float)[..., None]
+        return np.broadcast_to(rate, rate.shape[:-1] + (n_years,))
+
+    def evaluate_months(self, n_months: int) -> np.ndarray:
+        schedule = self.get_schedule(-(-n_months // N_MONTHS))
+        return -schedule.get_monthly()["interest"][..., :n_months]
+
 
 class PurchaseCost(RentingVsOwnUsageTaxContext, AbstractPosition):
     is_cashflow = False
+    is_constant = True
 
     def __init__(
         self,
@@ -170,6 +447,7 @@ class PurchaseSideCost(PurchaseCost):
 
 
 class InstantSideCostWriteOff(PurchaseSideCost):
+    is_constant = False
 
     def __init__(
         self,
@@ -207,3 +485,22 @@ class InstantSideCostWriteOff(PurchaseSideCost):
             )
         else:
             return 0.0
+
+    def evaluate_years(self, n_years: int) -> np.ndarray:
+        side_costs = np.asarray(
+            compute_side_costs(
+                makler=self.makler,
+                notar=self.notar,
+                transfer_tax=self.transfer_tax,
+                purchase_price=self.purchase_price,
+            ),
+            dtype=float,
+        )
+        values = np.zeros(side_costs.shape + (n_years,))
+        values[..., :1] = -side_costs[..., None]
+
+        return values
+
+    def evaluate_months(self, n_months: int) -> np.ndarray:
+        # Written off in the first month
+        return self.evaluate_years(n_months)
@@ -0,0 +1,193 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from immo_rechner.core.cost import compute_side_costs
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+GOAL_SEEK_FIELDS = ["repayment_amount", "own_capital"]
+DEFAULT_XTOL = 1.0  # EUR
+DEFAULT_MAX_EVALUATIONS = 50
+
+
+def get_cashflow_margin(columns: Dict[str, np.ndarray], year: int) -> float:
+    """
+    Lowest cashflow of the years 1 to year.
+    """
+    return float(np.min(columns["cashflow"][:year]))
+
+
+def get_debt_margin(columns: Dict[str, np.ndarray], year: int) -> float:
+    """
+    Minus the remaining debt at the end of year.
+    """
+    return -float(columns["remaining_debt"][year - 1])
+
+
+# A target is met if its margin is non-negative.
+TARGETS: Dict[str, Callable[[Dict[str, np.ndarray], int], float]] = {
+    "non_negative_cashflow": get_cashflow_margin,
+    "debt_free": get_debt_margin,
+}
+
+
+class GoalSeekResult:
+    """
+    Smallest value of field meeting target by the given year, within xtol. value is None
+    if the target is not met even at the upper bound.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        target: str,
+        year: int,
+        value: Optional[float],
+        margin: float,
+        n_evaluations: int,
+    ):
+        self.field = field
+        self.target = target
+        self.year = year
+        self.value = value
+        self.margin = margin
+        self.n_evaluations = n_evaluations
+
+    @property
+    def feasible(self) -> bool:
+        return self.value is not None
+
+    def __repr__(self):
+        return (
+            f"GoalSeekResult(field={self.field}, target={self.target}, "
+            f"year={self.year}, value={self.value}, n_evaluations={self.n_evaluations})"
+        )
+
+
+def get_default_bounds(base: InputParameters, field: str) -> Tuple[float, float]:
+    """
+    Repayment from nothing to the full debt in the first month, own capital from nothing
+    to the purchase price including side costs, i.e., no debt.
+    """
+    if field == "repayment_amount":
+        return 0.0, max(base.initial_debt, 1.0)
+
+    side_costs = compute_side_costs(
+        makler=base.makler,
+        notar=base.notar,
+        transfer_tax=base.transfer_tax,
+        purchase_price=base.purchase_price,
+    )
+    return 0.0, float(base.purchase_price + side_costs)
+
+
+def with_value(base: InputParameters, field: str, value: float) -> InputParameters:
+    if field == "own_capital":
+        # Validated again, so that initial_debt follows from the own capital.
+        return InputParameters(**dict(base.model_dump(), own_capital=value))
+
+    # initial_debt/own_capital are already resolved, so the copy needs no validation.
+    return base.model_copy(update={field: value})
+
+
+def goal_seek(
+    base: InputParameters,
+    field: str,
+    target: str,
+    year: int,
+    low: Optional[float] = None,
+    high: Optional[float] = None,
+    xtol: float = DEFAULT_XTOL,
+    max_evaluations: int = DEFAULT_MAX_EVALUATIONS,
+) -> GoalSeekResult:
+    """
+    Finds the smallest repayment amount or own capital such that target (see TARGETS) is
+    met by year, all other fields taken from base. Both targets improve with more
+    repayment and more own capital, so the margin of the target is non-decreasing in the
+    field and the boundary is bracketed by [low, high].
+
+    The bracket is shrunk by secant steps on the margin (regula falsi, Illinois variant)
+    and falls back to bisection when a step would not shrink it enough, e.g., when the
+    margin is flat as the remaining debt once the loan is paid off. This needs a few dozen
+    simulations instead of a brute-force grid.
+
+    :param base:
+    :param field: one of GOAL_SEEK_FIELDS.
+    :param target: one of TARGETS.
+    :param year: the target has to be met by this year, also the simulated horizon.
+    :param low: lower bound of the field, see get_default_bounds.
+    :param high: upper bound of the field, see get_default_bounds.
+    :param xtol: width of the bracket at which the search stops.
+    :param max_evaluations: maximal number of simulations.
+    :return:
+    """
+    if field not in GOAL_SEEK_FIELDS:
+        raise ValueError(f"field should be one of {GOAL_SEEK_FIELDS}, got: {field}")
+    if target not in TARGETS:
+        raise ValueError(f"target should be one of {list(TARGETS)}, got: {target}")
+
+    default_low, default_high = get_default_bounds(base, field)
+    low = default_low if low is None else float(low)
+    high = default_high if high is None else float(high)
+    if low > high:
+        raise ValueError(f"low should not be larger than high, got: {low} > {high}")
+
+    get_margin = TARGETS[target]
+    n_evaluations = 0
+
+    def evaluate(value: float) -> float:
+        nonlocal n_evaluations
+        n_evaluations += 1
+        columns = ProfitCalculator.from_input_params(
+            with_value(base, field, value)
+        ).simulate_columns(n_years=year)
+        return get_margin(columns, year)
+
+    def get_result(value: Optional[float], margin: float) -> GoalSeekResult:
+        logger.info(
+            f"Goal seek of {field} for {target} by year {year}: {value} "
+            f"after {n_evaluations} simulations"
+        )
+        return GoalSeekResult(
+            field=field,
+            target=target,
+            year=year,
+            value=value,
+            margin=margin,
+            n_evaluations=n_evaluations,
+        )
+
+    margin_high = evaluate(high)
+    if margin_high < 0:
+        return get_result(None, margin_high)
+
+    margin_low = evaluate(low)
+    if margin_low >= 0:
+        return get_result(low, margin_low)
+
+    # Invariant: margin(low) < 0 <= margin(high); secant_low and secant_high are the
+    # margins used for the secant steps.
+    secant_low, secant_high, last_side = margin_low, margin_high, None
+    while (high - low > xtol) and (n_evaluations < max_evaluations):
+        value = (low * secant_high - high * secant_low) / (secant_high - secant_low)
+
+        # Steps close to the bracket only shrink it slowly
+        width = high - low
+        if not (low + 0.1 * width <= value <= high - 0.1 * width):
+            value = 0.5 * (low + high)
+
+        margin = evaluate(value)
+        if margin >= 0:
+            high, margin_high, secant_high, side = value, margin, margin, "high"
+            if last_side == side:  # Illinois: the kept end counts half
+                secant_low *= 0.5
+        else:
+            low, margin_low, secant_low, side = value, margin, margin, "low"
+            if last_side == side:
+                secant_high *= 0.5
+        last_side = side
+
+    return get_result(high, margin_high)
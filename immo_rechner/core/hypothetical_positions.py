@@ -1,3 +1,5 @@
+import numpy as np
+
 from immo_rechner.core.abstract_position import AbstractPosition
 from immo_rechner.core.tax_contexts import RentingVsOwnUsageTaxContext, UsageContext
 
@@ -6,6 +8,8 @@ N_MONTHS = 12
 
 class HypotheticalRentIncome(AbstractPosition, RentingVsOwnUsageTaxContext):
     is_cashflow = False
+    is_constant = True
+    is_rent = True
 
     def __init__(self, monthly_rent: float, usage: UsageContext):
         RentingVsOwnUsageTaxContext.__init__(self, usage=usage)
@@ -32,5 +36,11 @@ class HypotheticalAppreciation(AbstractPosition, RentingVsOwnUsageTaxContext):
 
     def evaluate(self, *args, **kwargs) -> float:
         appreciation = self.current_price * self.appreciation_rate
-        self.current_price += appreciation
+        self.current_price = self.current_price + appreciation
         return appreciation
+
+    def evaluate_years(self, n_years: int) -> np.ndarray:
+        rate = np.asarray(self.appreciation_rate, dtype=float)[..., None]
+        initial_price = np.asarray(self.initial_price, dtype=float)[..., None]
+
+        return initial_price * rate * (1.0 + rate) ** np.arange(n_years)
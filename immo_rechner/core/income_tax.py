@@ -0,0 +1,140 @@
+import json
+import os.path
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+TARIFF_PATH = os.path.join(FILE_DIR, "data", "income_tax.json")
+
+DEFAULT_TAX_YEAR = 2024
+ZONE_SCALE = 10_000
+
+
+@lru_cache(maxsize=None)
+def load_tariff_data(path: str = TARIFF_PATH) -> Dict[int, Dict]:
+    with open(path) as f:
+        return {int(year): data for (year, data) in json.load(f).items()}
+
+
+def get_available_tax_years() -> List[int]:
+    return sorted(load_tariff_data())
+
+
+class IncomeTaxTariff:
+    """
+    German income tax tariff (§32a EStG) of one tax year, evaluated on arrays.
+
+    Every zone computes
+        tax = (quadratic * u + linear) * u + constant + rate * taxable_income,
+        u = (taxable_income - offset) / 10_000,
+    which covers both the progressive zones and the proportional ones.
+    Below the lowest zone (Grundfreibetrag) the tax is zero.
+    """
+
+    def __init__(self, tax_year: int, zones: List[Dict[str, float]]):
+        self.tax_year = tax_year
+
+        # Zone 0 is the tax free zone.
+        zones = [dict(lower=-np.inf)] + sorted(zones, key=lambda z: z["lower"])
+
+        self.lower = np.array([z["lower"] for z in zones], dtype=float)
+        self.offset = np.array([z.get("offset", 0.0) for z in zones], dtype=float)
+        self.quadratic = np.array([z.get("quadratic", 0.0) for z in zones])
+        self.linear = np.array([z.get("linear", 0.0) for z in zones])
+        self.constant = np.array([z.get("constant", 0.0) for z in zones])
+        self.rate = np.array([z.get("rate", 0.0) for z in zones])
+
+    @classmethod
+    def from_tax_year(cls, tax_year: int = DEFAULT_TAX_YEAR):
+        data = load_tariff_data()
+        if tax_year not in data:
+            raise ValueError(
+                f"Tax year {tax_year} is not available: {get_available_tax_years()}"
+            )
+
+        return cls(tax_year=tax_year, zones=data[tax_year]["zones"])
+
+    def __call__(self, taxable_income):
+        x = np.asarray(taxable_income, dtype=float)
+        zone = np.searchsorted(self.lower, x, side="right") - 1
+
+        u = (x - self.offset[zone]) / ZONE_SCALE
+        tax = (self.quadratic[zone] * u + self.linear[zone]) * u
+        return tax + self.constant[zone] + self.rate[zone] * x
+
+    def exact(self, taxable_income):
+        """
+        Tax as defined in §32a: the taxable income and the tax are rounded down to whole euros.
+        """
+        x = np.floor(np.maximum(np.asarray(taxable_income, dtype=float), 0.0))
+        return np.floor(self(x))
+
+    def get_lookup_table(self, max_income: int) -> "IncomeTaxTable":
+        return IncomeTaxTable(tariff=self, max_income=max_income)
+
+
+class IncomeTaxTable:
+    """
+    Lookup table of IncomeTaxTariff.exact for every whole euro in [0, max_income].
+    Evaluating it is a single array indexing; incomes above max_income are computed directly.
+    """
+
+    def __init__(self, tariff: IncomeTaxTariff, max_income: int):
+        self.tariff = tariff
+        self.max_income = max_income
+        self.table = tariff.exact(np.arange(max_income + 1))
+
+    def __call__(self, taxable_income):
+        x = np.floor(np.maximum(np.asarray(taxable_income, dtype=float), 0.0))
+        within = x <= self.max_income
+
+        if np.all(within):
+            return self.table[x.astype(np.int64)]
+
+        return np.where(
+            within,
+            self.table[np.where(within, x, 0).astype(np.int64)],
+            self.tariff.exact(x),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_tariff(tax_year: int = DEFAULT_TAX_YEAR) -> IncomeTaxTariff:
+    return IncomeTaxTariff.from_tax_year(tax_year)
+
+
+@lru_cache(maxsize=8)
+def get_lookup_table(
+    tax_year: int = DEFAULT_TAX_YEAR, max_income: int = 500_000
+) -> IncomeTaxTable:
+    return get_tariff(tax_year).get_lookup_table(max_income=max_income)
+
+
+def get_yearly_income_tax(
+    taxable_income, tax_year=DEFAULT_TAX_YEAR, use_lookup_table: bool = False
+):
+    """
+    Income tax of (arrays of) taxable incomes. tax_year can be an array broadcastable
+    to taxable_income; every distinct year is evaluated in one pass.
+    """
+    tax_years = np.unique(tax_year)
+
+    def get_tax_function(year):
+        if use_lookup_table:
+            return get_lookup_table(int(year))
+        return get_tariff(int(year))
+
+    if tax_years.size == 1:
+        return get_tax_function(tax_years[0])(taxable_income)
+
+    taxable_income, tax_year = np.broadcast_arrays(
+        np.asarray(taxable_income, dtype=float), tax_year
+    )
+    output = np.empty(taxable_income.shape)
+    for year in tax_years:
+        mask = tax_year == year
+        output[mask] = get_tax_function(year)(taxable_income[mask])
+
+    return output
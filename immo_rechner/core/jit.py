@@ -0,0 +1,213 @@
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from immo_rechner.core.income_tax import ZONE_SCALE, get_tariff
+
+# Loop kernel of batched simulations, compiled by numba if it is installed (see
+# immo_rechner.core.kernel.get_kernel). Importing this module imports numba, so it is
+# only imported once the kernel is used; without numba the loops run as plain Python.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Directory of the compiled code, read by numba; without it the kernel is compiled once
+# per process instead of written next to the (possibly read-only) installed package.
+NUMBA_CACHE_DIR_ENV = "NUMBA_CACHE_DIR"
+
+N_MONTHS = 12
+TARIFF_FIELDS = ["lower", "offset", "quadratic", "linear", "constant", "rate"]
+
+
+def njit(func):
+    """
+    numba.njit if numba is installed, with an on-disk cache of the compiled code if
+    NUMBA_CACHE_DIR is set.
+    """
+    if numba is None:
+        return func
+
+    return numba.njit(cache=bool(os.environ.get(NUMBA_CACHE_DIR_ENV)))(func)
+
+
+def get_tariff_arrays(tax_year: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Zones of the tariffs of all tax years, of shape (n_tax_years, len(TARIFF_FIELDS),
+    n_zones), padded with zones that are never reached, and the index of the tariff of
+    every scenario.
+    """
+    tax_years, tariff_index = np.unique(np.asarray(tax_year), return_inverse=True)
+    tariffs = [get_tariff(int(year)) for year in tax_years]
+    n_zones = max(len(tariff.lower) for tariff in tariffs)
+
+    zones = np.zeros((len(tariffs), len(TARIFF_FIELDS), n_zones))
+    zones[:, 0, :] = np.inf
+    for index, tariff in enumerate(tariffs):
+        for field_index, field in enumerate(TARIFF_FIELDS):
+            values = getattr(tariff, field)
+            zones[index, field_index, : len(values)] = values
+
+    return zones, tariff_index.reshape(-1).astype(np.int64)
+
+
+@njit
+def compute_tax(taxable_income, zones, exact):
+    """
+    IncomeTaxTariff (exact: IncomeTaxTariff.exact) of one taxable income.
+    """
+    x = taxable_income
+    if exact:
+        x = np.floor(max(x, 0.0))
+
+    zone = 0
+    while zone + 1 < zones.shape[1] and zones[0, zone + 1] <= x:
+        zone += 1
+
+    u = (x - zones[1, zone]) / ZONE_SCALE
+    tax = (
+        (zones[2, zone] * u + zones[3, zone]) * u + zones[4, zone] + zones[5, zone] * x
+    )
+    if exact:
+        tax = np.floor(tax)
+
+    return tax
+
+
+@njit
+def simulate_loop(
+    yearly_rates,
+    repayment_amount,
+    initial_debt,
+    profit,
+    cashflow,
+    yearly_income,
+    taxed,
+    tariff_index,
+    zones,
+    exact,
+    out_interest,
+    out_remaining_debt,
+    out_cumulative_interest,
+    out_total_paid,
+    out_profit,
+    out_income_tax,
+    out_cashflow,
+):
+    """
+    Steps all scenarios month by month through their annuity loans,
+        interest = rate / 12 * debt, payment = min(repayment_amount, debt + interest),
+    with the rate of the year (e.g., refinanced), and computes the income tax of the
+    yearly profit including interest. Equivalent to the closed forms of
+    immo_rechner.core.cost and CompiledPositions.simulate.
+
+    The scenarios are the inner loop, so that the monthly recurrences of different
+    scenarios do not wait for each other and can be vectorized; yearly arrays therefore
+    have shape (n_years, n_scenarios).
+    """
+    n_years, n_scenarios = yearly_rates.shape
+    debt = initial_debt.copy()
+    total_paid = np.zeros(n_scenarios)
+    cumulative_interest = np.zeros(n_scenarios)
+    interest = np.empty(n_scenarios)
+    rate = np.empty(n_scenarios)
+
+    base_tax = np.zeros(n_scenarios)
+    if taxed:
+        for i in range(n_scenarios):
+            base_tax[i] = compute_tax(yearly_income[i], zones[tariff_index[i]], exact)
+
+    for year in range(n_years):
+        for i in range(n_scenarios):
+            rate[i] = yearly_rates[year, i] / N_MONTHS
+            interest[i] = 0.0
+
+        for _ in range(N_MONTHS):
+            for i in range(n_scenarios):
+                monthly_interest = rate[i] * debt[i]
+                payment = min(repayment_amount[i], debt[i] + monthly_interest)
+                debt[i] = debt[i] + monthly_interest - payment
+                interest[i] += monthly_interest
+                total_paid[i] += payment
+
+        for i in range(n_scenarios):
+            cumulative_interest[i] += interest[i]
+            yearly_profit = profit[year, i] - interest[i]
+            income_tax = 0.0
+            if taxed:
+                income_tax = (
+                    compute_tax(
+                        yearly_income[i] + yearly_profit, zones[tariff_index[i]], exact
+                    )
+                    - base_tax[i]
+                )
+
+            out_interest[year, i] = interest[i]
+            out_remaining_debt[year, i] = debt[i]
+            out_cumulative_interest[year, i] = cumulative_interest[i]
+            out_total_paid[year, i] = total_paid[i]
+            out_profit[year, i] = yearly_profit
+            out_income_tax[year, i] = income_tax
+            out_cashflow[year, i] = cashflow[year, i] - interest[i] - income_tax
+
+
+def simulate_paths(
+    yearly_rates: np.ndarray,
+    repayment_amount: np.ndarray,
+    initial_debt: np.ndarray,
+    profit: np.ndarray,
+    cashflow: np.ndarray,
+    yearly_income: np.ndarray,
+    tax_year: np.ndarray,
+    taxed: bool,
+    exact: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Yearly columns of immo_rechner.core.kernel (without rent) of n_scenarios scenarios.
+
+    :param yearly_rates: interest rate of every scenario and year, (n_scenarios, n_years).
+    :param repayment_amount: monthly payment, (n_scenarios,).
+    :param initial_debt: (n_scenarios,).
+    :param profit: profit of all positions but the interest, (n_scenarios, n_years).
+    :param cashflow: cashflow of all positions but the interest, (n_scenarios, n_years).
+    :param yearly_income: (n_scenarios,).
+    :param tax_year: (n_scenarios,).
+    :param taxed: whether the profit is taxed, i.e., the usage is renting.
+    :param exact: exact income tax in whole euros, as the lookup table.
+    """
+    n_scenarios, n_years = np.shape(yearly_rates)
+
+    def to_year_major(values, shape) -> np.ndarray:
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), shape)
+        return np.ascontiguousarray(values.T) if values.ndim == 2 else values
+
+    zones, tariff_index = get_tariff_arrays(np.broadcast_to(tax_year, (n_scenarios,)))
+    columns = {
+        name: np.empty((n_years, n_scenarios))
+        for name in [
+            "interest_cost",
+            "remaining_debt",
+            "cumulative_interest_cost",
+            "total_paid",
+            "profit_before_taxes",
+            "income_tax",
+            "cashflow",
+        ]
+    }
+
+    simulate_loop(
+        to_year_major(yearly_rates, (n_scenarios, n_years)),
+        to_year_major(repayment_amount, (n_scenarios,)),
+        to_year_major(initial_debt, (n_scenarios,)),
+        to_year_major(profit, (n_scenarios, n_years)),
+        to_year_major(cashflow, (n_scenarios, n_years)),
+        to_year_major(yearly_income, (n_scenarios,)),
+        taxed,
+        np.broadcast_to(tariff_index, (n_scenarios,)).copy(),
+        zones,
+        exact,
+        *columns.values(),
+    )
+
+    return {name: np.ascontiguousarray(values.T) for (name, values) in columns.items()}
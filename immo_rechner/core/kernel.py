@@ -0,0 +1,316 @@
+import importlib.util
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from immo_rechner.core.abstract_position import AbstractPosition
+from immo_rechner.core.cost import InterestRate
+from immo_rechner.core.tax_contexts import UsageContext
+
+N_MONTHS = 12
+PERIODS_PER_YEAR = {"yearly": 1, "monthly": N_MONTHS}
+
+# Flows are summed over the months of a year, stocks are the values at the end of the year.
+FLOW_COLUMNS = [
+    "cashflow",
+    "profit_before_taxes",
+    "income_tax",
+    "rent",
+    "interest_cost",
+]
+STOCK_COLUMNS = ["remaining_debt", "cumulative_interest_cost", "total_paid"]
+
+# Batched simulations use the loop kernel of immo_rechner.core.jit, compiled by numba,
+# from this number of scenarios on; IMMO_RECHNER_KERNEL=numpy or numba overrides it.
+KERNEL_ENV = "IMMO_RECHNER_KERNEL"
+KERNELS = ["auto", "numpy", "numba"]
+JIT_MIN_SCENARIOS = 256
+
+
+def read_only(values) -> np.ndarray:
+    """
+    Read-only view of values; values itself stays writeable.
+    """
+    view = np.asarray(values).view()
+    view.flags.writeable = False
+    return view
+
+
+class Immutable:
+    """
+    Base of objects whose attributes (__slots__, in the order of the arguments of
+    __init__) cannot be changed once initialized; __init__ sets them with
+    object.__setattr__. Such objects, with read-only arrays, can be cached and shared
+    between threads without locks.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+
+def sum_positions(
+    positions: List[AbstractPosition], n_years: int, resolution: str = "yearly"
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Profit, cashflow and rent of the positions, summed separately over the constant
+    positions (values per period, of the shape of the parameters) and the others (of
+    shape (..., n_periods)).
+    """
+    if resolution not in PERIODS_PER_YEAR:
+        raise ValueError(
+            f"resolution should be one of {list(PERIODS_PER_YEAR)}, got: {resolution}"
+        )
+    periods_per_year = PERIODS_PER_YEAR[resolution]
+    n_periods = n_years * periods_per_year
+
+    constant = dict(profit=0.0, cashflow=0.0, rent=0.0)
+    periodic = dict(profit=0.0, cashflow=0.0, rent=0.0)
+
+    for position in positions:
+        if position.is_constant:
+            values, totals = position.evaluate() / periods_per_year, constant
+        elif resolution == "yearly":
+            values, totals = position.evaluate_years(n_years), periodic
+        else:
+            values, totals = position.evaluate_months(n_periods), periodic
+
+        values = np.asarray(values, dtype=float)
+        totals["profit"] = totals["profit"] + values
+        if position.is_cashflow:
+            totals["cashflow"] = totals["cashflow"] + values
+        if position.is_rent:
+            totals["rent"] = totals["rent"] + values
+
+    return (
+        {name: np.asarray(value, dtype=float) for (name, value) in constant.items()},
+        {name: np.asarray(value, dtype=float) for (name, value) in periodic.items()},
+    )
+
+
+class CompiledPositions(Immutable):
+    """
+    Struct-of-arrays form of a list of positions for a horizon of n_years, with one value
+    per year or per month (resolution).
+
+    Constant positions are folded into constant_profit/constant_cashflow/constant_rent, of
+    the shape of the parameters, i.e., () or (n_scenarios,). Stateful positions (interest,
+    appreciation, one-off write-offs) are evaluated once for all periods and summed into
+    periodic_profit/periodic_cashflow of shape (..., n_periods). Simulating is then a few
+    array operations instead of calling every position every year. The interest position
+    is stateful, so periodic_profit and periodic_cashflow always have the full shape.
+
+    Compiled positions are immutable and hold only read-only arrays, so simulate is a
+    pure function and can run concurrently on a shared instance.
+    """
+
+    __slots__ = (
+        "n_years",
+        "periods_per_year",
+        "constant_profit",
+        "constant_cashflow",
+        "constant_rent",
+        "periodic_profit",
+        "periodic_cashflow",
+        "periodic_rent",
+        "interest_cost",
+        "remaining_debt",
+        "cumulative_interest_cost",
+        "total_paid",
+    )
+
+    def __init__(
+        self,
+        n_years: int,
+        periods_per_year: int,
+        constant_profit: np.ndarray,
+        constant_cashflow: np.ndarray,
+        constant_rent: np.ndarray,
+        periodic_profit: np.ndarray,
+        periodic_cashflow: np.ndarray,
+        periodic_rent: np.ndarray,
+        interest_cost: np.ndarray,
+        remaining_debt: np.ndarray,
+        cumulative_interest_cost: np.ndarray,
+        total_paid: np.ndarray,
+    ):
+        object.__setattr__(self, "n_years", n_years)
+        object.__setattr__(self, "periods_per_year", periods_per_year)
+        for name, values in [
+            ("constant_profit", constant_profit),
+            ("constant_cashflow", constant_cashflow),
+            ("constant_rent", constant_rent),
+            ("periodic_profit", periodic_profit),
+            ("periodic_cashflow", periodic_cashflow),
+            ("periodic_rent", periodic_rent),
+            ("interest_cost", interest_cost),
+            ("remaining_debt", remaining_debt),
+            ("cumulative_interest_cost", cumulative_interest_cost),
+            ("total_paid", total_paid),
+        ]:
+            object.__setattr__(self, name, read_only(values))
+
+    @property
+    def n_periods(self) -> int:
+        return self.n_years * self.periods_per_year
+
+    @classmethod
+    def from_positions(
+        cls,
+        positions: List[AbstractPosition],
+        interest_rate_position: InterestRate,
+        n_years: int,
+        resolution: str = "yearly",
+    ):
+        constant, periodic = sum_positions(positions, n_years, resolution=resolution)
+        periods_per_year = PERIODS_PER_YEAR[resolution]
+        n_periods = n_years * periods_per_year
+
+        schedule = interest_rate_position.get_schedule(n_years)
+        if resolution == "yearly":
+            interest = dict(
+                interest_cost=schedule.yearly_interest,
+                remaining_debt=schedule.yearly_remaining_debt,
+                cumulative_interest_cost=schedule.yearly_cumulative_interest,
+                total_paid=schedule.yearly_total_paid,
+            )
+        else:
+            monthly = schedule.get_monthly()
+            interest = dict(
+                interest_cost=monthly["interest"],
+                remaining_debt=monthly["remaining_debt"],
+                cumulative_interest_cost=monthly["cumulative_interest"],
+                total_paid=monthly["total_paid"],
+            )
+
+        return cls(
+            n_years=n_years,
+            periods_per_year=periods_per_year,
+            **{f"constant_{name}": value for (name, value) in constant.items()},
+            **{f"periodic_{name}": value for (name, value) in periodic.items()},
+            **{name: values[..., :n_periods] for (name, values) in interest.items()},
+        )
+
+    def simulate_before_taxes(self) -> Dict[str, np.ndarray]:
+        """
+        FLOW_COLUMNS except income_tax and STOCK_COLUMNS, all of shape (..., n_periods),
+        with the cashflow before income tax.
+        """
+        cashflow = self.constant_cashflow[..., None] + self.periodic_cashflow
+        rent = np.broadcast_to(
+            self.constant_rent[..., None] + self.periodic_rent, cashflow.shape
+        ).copy()
+
+        return dict(
+            cashflow=cashflow,
+            profit_before_taxes=self.constant_profit[..., None] + self.periodic_profit,
+            rent=rent,
+            interest_cost=self.interest_cost.copy(),
+            remaining_debt=self.remaining_debt.copy(),
+            cumulative_interest_cost=self.cumulative_interest_cost.copy(),
+            total_paid=self.total_paid.copy(),
+        )
+
+    def simulate(
+        self,
+        usage: UsageContext,
+        yearly_income,
+        get_yearly_income_tax: Callable[[np.ndarray], np.ndarray],
+    ) -> Dict[str, np.ndarray]:
+        """
+        FLOW_COLUMNS and STOCK_COLUMNS, all of shape (..., n_periods). The income tax is
+        computed from the yearly profits and spread evenly over the months of the year.
+
+        :param usage:
+        :param yearly_income: a number or an array of the shape of the parameters.
+        :param get_yearly_income_tax: income tax of an array of shape (..., n_years) or
+            (..., 1).
+        """
+        columns = self.simulate_before_taxes()
+        profit_before_taxes = columns["profit_before_taxes"]
+
+        if usage == UsageContext.RENTING:
+            yearly_income = np.asarray(yearly_income, dtype=float)[..., None]
+            income_tax = get_yearly_income_tax(
+                yearly_income + self.to_yearly(profit_before_taxes)
+            ) - get_yearly_income_tax(yearly_income)
+            income_tax = np.repeat(
+                income_tax / self.periods_per_year, self.periods_per_year, axis=-1
+            )
+        else:
+            income_tax = np.zeros(profit_before_taxes.shape)
+
+        return dict(
+            columns,
+            cashflow=columns["cashflow"] - income_tax,
+            income_tax=income_tax,
+        )
+
+    def to_yearly(self, flow: np.ndarray) -> np.ndarray:
+        """
+        Sums a flow of shape (..., n_periods) over the periods of every year.
+        """
+        return flow.reshape(
+            flow.shape[:-1] + (self.n_years, self.periods_per_year)
+        ).sum(axis=-1)
+
+
+def compile_positions(
+    positions: List[AbstractPosition],
+    interest_rate_position: InterestRate,
+    n_years: int,
+    resolution: str = "yearly",
+) -> CompiledPositions:
+    return CompiledPositions.from_positions(
+        positions,
+        interest_rate_position=interest_rate_position,
+        n_years=n_years,
+        resolution=resolution,
+    )
+
+
+def aggregate_to_yearly(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Yearly values of monthly columns (the last axis is the month): flows are summed,
+    stocks are taken at the end of every year.
+    """
+    output = {}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        by_year = values.reshape(values.shape[:-1] + (-1, N_MONTHS))
+        if name in FLOW_COLUMNS:
+            output[name] = by_year.sum(axis=-1)
+        elif name in STOCK_COLUMNS:
+            output[name] = by_year[..., -1]
+
+    return output
+
+
+def is_numba_available() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def get_kernel(n_scenarios: int, kernel: Optional[str] = None) -> str:
+    """
+    "numba" or "numpy". With kernel "auto" (by default, see KERNEL_ENV), numba is used
+    if it is installed and there are at least JIT_MIN_SCENARIOS scenarios, for which
+    compiling once pays off. Without numba, the NumPy kernel is always used.
+    """
+    kernel = kernel or os.environ.get(KERNEL_ENV) or "auto"
+    if kernel not in KERNELS:
+        raise ValueError(f"kernel should be one of {KERNELS}, got: {kernel}")
+
+    if kernel == "numpy" or not is_numba_available():
+        return "numpy"
+    if kernel == "numba" or n_scenarios >= JIT_MIN_SCENARIOS:
+        return "numba"
+
+    return "numpy"
@@ -0,0 +1,347 @@
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from immo_rechner.core.abstract_position import AbstractPosition
+from immo_rechner.core.batch import BatchProfitCalculator, stack_input_params
+from immo_rechner.core.cost import InterestRate, RefinancedAmortizationSchedule
+from immo_rechner.core.hypothetical_positions import (
+    HypotheticalAppreciation,
+    HypotheticalRentIncome,
+)
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.revenue import RentIncome
+from immo_rechner.core.tax_contexts import RentingVsOwnUsageTaxContext, UsageContext
+from immo_rechner.core.utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+N_MONTHS = 12
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class MonteCarloParameters(BaseModel):
+    """
+    Yearly appreciation rates are normal around InputParameters.appreciation_rate,
+    yearly rent growth rates are normal around rent_growth_rate. The interest rate is
+    fixed for fixed_rate_years and then refinanced at a rate following a random walk
+    (not below zero) starting from InputParameters.yearly_interest_rate.
+    kernel is passed to BatchProfitCalculator, see immo_rechner.core.kernel.get_kernel.
+    """
+
+    n_paths: int = Field(default=1000, gt=0)
+    seed: Optional[int] = None
+    appreciation_volatility: float = 0.05
+    rent_growth_rate: float = 0.02
+    rent_growth_volatility: float = 0.02
+    fixed_rate_years: int = Field(default=10, gt=0)
+    refinancing_rate_volatility: float = 0.005  # per year
+    chunk_size: int = Field(default=1000, gt=0)
+    kernel: Optional[str] = None
+
+
+class PathPosition(RentingVsOwnUsageTaxContext, AbstractPosition):
+    """
+    Position whose yearly values are given by paths of shape (n_paths, n_years).
+    """
+
+    is_cashflow = False
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        is_cashflow: bool,
+        usage: UsageContext,
+        is_rent: bool = False,
+    ):
+        RentingVsOwnUsageTaxContext.__init__(self, usage=usage)
+        self.values = values
+        self.is_cashflow = is_cashflow
+        self.is_rent = is_rent
+
+        self.year = 0
+
+    def reset(self):
+        self.year = 0
+
+    def evaluate(self, *args, **kwargs) -> np.ndarray:
+        self.year += 1
+        return self.values[:, self.year - 1]
+
+    def evaluate_years(self, n_years: int) -> np.ndarray:
+        return self.values[:, :n_years]
+
+
+class RefinancedInterestRate(InterestRate):
+    """
+    InterestRate with one yearly rate per path and fixed-rate period,
+    period_rates of shape (n_paths, n_periods). The schedule is computed on first use,
+    i.e., not by the loop kernel of immo_rechner.core.jit.
+    """
+
+    def __init__(
+        self,
+        usage: UsageContext,
+        period_rates: np.ndarray,
+        repayment_amount: np.ndarray,
+        initial_debt: np.ndarray,
+        fixed_rate_years: int,
+    ):
+        super().__init__(
+            usage=usage,
+            yearly_rate=period_rates[:, 0],
+            repayment_amount=repayment_amount,
+            initial_debt=initial_debt,
+        )
+        self.period_rates = period_rates
+        self.fixed_rate_years = fixed_rate_years
+        self.n_years = period_rates.shape[1] * fixed_rate_years
+
+    def check_horizon(self, n_years: int):
+        if n_years > self.n_years:
+            raise ValueError(
+                f"Rates are sampled for {self.n_years} years, got {n_years}."
+            )
+
+    def get_schedule(self, n_years: int) -> RefinancedAmortizationSchedule:
+        self.check_horizon(n_years)
+
+        schedule = self.schedule
+        if schedule is None:
+            schedule = RefinancedAmortizationSchedule(
+                period_rates=self.period_rates,
+                repayment_amount=self.repayment_amount,
+                initial_debt=self.initial_debt,
+                fixed_rate_years=self.fixed_rate_years,
+                n_years=self.n_years,
+            )
+            self.schedule = schedule
+
+        return schedule
+
+    def get_yearly_rates(self, n_years: int) -> np.ndarray:
+        self.check_horizon(n_years)
+        return np.repeat(self.period_rates, self.fixed_rate_years, axis=-1)[
+            ..., :n_years
+        ]
+
+
+def sample_paths(
+    base: InputParameters,
+    mc_params: MonteCarloParameters,
+    n_paths: int,
+    n_years: int,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """
+    Samples appreciation rates and rent growth factors of shape (n_paths, n_years) and
+    the rates of the fixed-rate periods of shape (n_paths, n_periods).
+    """
+    appreciation_rates = rng.normal(
+        base.appreciation_rate, mc_params.appreciation_volatility, (n_paths, n_years)
+    )
+
+    rent_growth = rng.normal(
+        mc_params.rent_growth_rate,
+        mc_params.rent_growth_volatility,
+        (n_paths, n_years - 1),
+    )
+    rent_factors = np.concatenate(
+        [np.ones((n_paths, 1)), np.cumprod(1.0 + rent_growth, axis=1)], axis=1
+    )
+
+    n_periods = -(-n_years // mc_params.fixed_rate_years)
+    rate_shocks = rng.normal(
+        0.0,
+        mc_params.refinancing_rate_volatility * np.sqrt(mc_params.fixed_rate_years),
+        (n_paths, n_periods - 1),
+    )
+    period_rates = np.maximum(
+        base.yearly_interest_rate
+        + np.concatenate(
+            [np.zeros((n_paths, 1)), np.cumsum(rate_shocks, axis=1)], axis=1
+        ),
+        0.0,
+    )
+
+    return dict(
+        appreciation_rates=appreciation_rates,
+        rent_factors=rent_factors,
+        period_rates=period_rates,
+    )
+
+
+def get_stochastic_positions(
+    params: SimpleNamespace,
+    usage: UsageContext,
+    paths: Dict[str, np.ndarray],
+    fixed_rate_years: int,
+) -> List[AbstractPosition]:
+    """
+    Positions of ProfitCalculator where rent, appreciation and interest follow the paths.
+    """
+    if usage == UsageContext.RENTING:
+        positions = ProfitCalculator.get_renting_positions(params)
+    else:
+        positions = ProfitCalculator.get_own_usage_positions(params)
+
+    yearly_rent = params.monthly_rent[:, None] * N_MONTHS * paths["rent_factors"]
+
+    prices = params.purchase_price[:, None] * np.cumprod(
+        1.0 + paths["appreciation_rates"], axis=1
+    )
+    previous_prices = np.concatenate(
+        [params.purchase_price[:, None], prices[:, :-1]], axis=1
+    )
+
+    output = []
+    for position in positions:
+        if isinstance(position, (RentIncome, HypotheticalRentIncome)):
+            position = PathPosition(
+                values=yearly_rent,
+                is_cashflow=position.is_cashflow,
+                usage=usage,
+                is_rent=True,
+            )
+        elif isinstance(position, HypotheticalAppreciation):
+            position = PathPosition(
+                values=previous_prices * paths["appreciation_rates"],
+                is_cashflow=position.is_cashflow,
+                usage=usage,
+            )
+        elif isinstance(position, InterestRate):
+            position = RefinancedInterestRate(
+                usage=usage,
+                period_rates=paths["period_rates"],
+                repayment_amount=params.repayment_amount,
+                initial_debt=params.initial_debt,
+                fixed_rate_years=fixed_rate_years,
+            )
+        output.append(position)
+
+    return output
+
+
+def simulate_chunk(
+    base: InputParameters,
+    mc_params: MonteCarloParameters,
+    n_paths: int,
+    n_years: int,
+    seed: np.random.SeedSequence,
+) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    paths = sample_paths(base, mc_params, n_paths=n_paths, n_years=n_years, rng=rng)
+
+    params = SimpleNamespace(
+        **{
+            name: (
+                np.repeat(values, n_paths) if isinstance(values, np.ndarray) else values
+            )
+            for (name, values) in vars(stack_input_params([base])).items()
+        }
+    )
+    positions = get_stochastic_positions(
+        params, base.usage, paths, fixed_rate_years=mc_params.fixed_rate_years
+    )
+
+    return (
+        BatchProfitCalculator(
+            usage=base.usage,
+            params=params,
+            positions=positions,
+            kernel=mc_params.kernel,
+        )
+        .simulate(n_years=n_years)
+        .columns
+    )
+
+
+class MonteCarloResult:
+    """
+    Simulated paths; every column is an array of shape (n_paths, n_years).
+    """
+
+    def __init__(self, years: np.ndarray, paths: Dict[str, np.ndarray]):
+        self.years = years
+        self.paths = paths
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.paths[name]
+
+    def get_percentiles(
+        self,
+        columns: Sequence[str] = ("cashflow", "remaining_debt", "return_rate"),
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> "pd.DataFrame":
+        """
+        Percentile bands per year, one row per column and year. For renting,
+        return_rate is not defined (nan).
+        """
+        import pandas as pd
+
+        frames = []
+        for column in columns:
+            bands = np.percentile(self.paths[column], percentiles, axis=0)
+            frames.append(
+                pd.DataFrame(
+                    dict(
+                        column=column,
+                        year=self.years,
+                        **{f"p{p:g}": band for (p, band) in zip(percentiles, bands)},
+                    )
+                )
+            )
+
+        return pd.concat(frames, ignore_index=True)
+
+
+def simulate_monte_carlo(
+    base: InputParameters,
+    mc_params: MonteCarloParameters,
+    n_years: int,
+    n_workers: int = 1,
+) -> MonteCarloResult:
+    """
+    Simulates mc_params.n_paths paths in chunks of mc_params.chunk_size, optionally on a
+    process pool. Every chunk has its own seed spawned from mc_params.seed, so the result
+    does not depend on n_workers.
+    """
+    if n_years < 1:
+        raise ValueError(f"n_years should be positive, got: {n_years}")
+
+    chunk_sizes = [
+        min(mc_params.chunk_size, mc_params.n_paths - start)
+        for start in range(0, mc_params.n_paths, mc_params.chunk_size)
+    ]
+    seeds = np.random.SeedSequence(mc_params.seed).spawn(len(chunk_sizes))
+    args = (
+        [base] * len(chunk_sizes),
+        [mc_params] * len(chunk_sizes),
+        chunk_sizes,
+        [n_years] * len(chunk_sizes),
+        seeds,
+    )
+
+    logger.info(
+        f"Simulating {mc_params.n_paths} paths in {len(chunk_sizes)} chunks "
+        f"on {n_workers} worker(s)"
+    )
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunks = list(executor.map(simulate_chunk, *args))
+    else:
+        chunks = list(map(simulate_chunk, *args))
+
+    return MonteCarloResult(
+        years=np.arange(1, n_years + 1),
+        paths={
+            name: np.concatenate([chunk[name] for chunk in chunks])
+            for name in chunks[0]
+        },
+    )
@@ -0,0 +1,254 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from immo_rechner.core.batch import BatchProfitCalculator, BatchResult
+from immo_rechner.core.income_tax import DEFAULT_TAX_YEAR, get_yearly_income_tax
+from immo_rechner.core.profit_calculator import InputParameters
+from immo_rechner.core.tax_contexts import UsageContext
+from immo_rechner.core.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Columns of every property before income tax, from its acquisition on.
+PROPERTY_COLUMNS = [
+    "cashflow",
+    "profit_before_taxes",
+    "taxable_profit",
+    "separate_income_tax",
+    "rent",
+    "interest_cost",
+    "remaining_debt",
+    "cumulative_interest_cost",
+    "total_paid",
+]
+
+PORTFOLIO_COLUMNS = [
+    "cashflow",
+    "profit_before_taxes",
+    "income_tax",
+    "separate_income_tax",
+    "rent",
+    "remaining_debt",
+    "cumulative_interest_cost",
+    "yearly_interest_cost",
+    "total_paid",
+    "tax_benefit",
+]
+
+
+def shift_and_sum(
+    columns: Dict[str, np.ndarray], acquisition_years: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Sums columns of shape (n_properties, n_years), the years counted from the acquisition
+    of every property, over the properties in the years of the portfolio: a property
+    acquired in year a contributes its year t - a + 1 to year t, and nothing before a.
+
+    acquisition_years has shape (..., n_properties), e.g., one row per acquisition order,
+    and the output columns have shape (..., n_years). Properties with the same
+    acquisition year are summed by one matrix product, i.e., one per distinct year.
+    """
+    names = list(columns)
+    values = np.stack([columns[name] for name in names], axis=1)
+    n_properties, n_columns, n_years = values.shape
+
+    acquisition_years = np.asarray(acquisition_years)
+    batch_shape = acquisition_years.shape[:-1]
+    acquisition_years = acquisition_years.reshape(-1, n_properties)
+
+    output = np.zeros((len(acquisition_years), n_columns, n_years))
+    flat_values = values.reshape(n_properties, -1)
+    for year in np.unique(acquisition_years):
+        offset = int(year) - 1
+        if offset >= n_years:
+            continue  # Acquired after the horizon
+
+        acquired = (acquisition_years == year).astype(float)
+        total = (acquired @ flat_values).reshape(-1, n_columns, n_years)
+        output[..., offset:] += total[..., : n_years - offset]
+
+    return {
+        name: output[:, index].reshape(batch_shape + (n_years,))
+        for (index, name) in enumerate(names)
+    }
+
+
+def get_acquisition_years(orders: np.ndarray, slots: Sequence[int]) -> np.ndarray:
+    """
+    Acquisition years of every property given orders of the properties, i.e., arrays of
+    shape (..., n_properties) of permutations of the property indices, where the k-th
+    property of an order is acquired in slots[k].
+    """
+    orders = np.asarray(orders)
+    slots = np.asarray(slots)
+    if slots.shape != orders.shape[-1:]:
+        raise ValueError(
+            f"Expected {orders.shape[-1]} slots, one per property, got: {len(slots)}"
+        )
+
+    acquisition_years = np.empty(orders.shape, dtype=int)
+    np.put_along_axis(
+        acquisition_years, orders, np.broadcast_to(slots, orders.shape), axis=-1
+    )
+    return acquisition_years
+
+
+def get_random_orders(
+    n_orders: int, n_properties: int, seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    n_orders random permutations of the property indices, of shape (n_orders, n_properties).
+    """
+    rng = np.random.default_rng(seed)
+    return rng.permuted(
+        np.broadcast_to(np.arange(n_properties), (n_orders, n_properties)), axis=-1
+    )
+
+
+class Portfolio:
+    """
+    Several properties of one owner. The income tax is computed once per year on
+    yearly_income plus the combined profit of all rented properties, instead of per
+    property against yearly_income, which underestimates the marginal tax rate as soon
+    as there is more than one property. yearly_income and tax_year of the single
+    InputParameters are ignored.
+
+    All properties are simulated in one batched pass per usage (see
+    BatchProfitCalculator), once for any number of acquisition years or orders.
+    """
+
+    def __init__(
+        self,
+        properties: Sequence[InputParameters],
+        yearly_income: float,
+        tax_year: int = DEFAULT_TAX_YEAR,
+        use_lookup_table: bool = False,
+    ):
+        if not properties:
+            raise ValueError("A portfolio needs at least one property.")
+
+        self.properties = list(properties)
+        self.yearly_income = yearly_income
+        self.tax_year = tax_year
+        self.use_lookup_table = use_lookup_table
+
+    @property
+    def n_properties(self) -> int:
+        return len(self.properties)
+
+    def get_income_tax(self, taxable_profit: np.ndarray) -> np.ndarray:
+        """
+        Income tax on top of the one of yearly_income, of arrays of taxable profits.
+        """
+        return get_yearly_income_tax(
+            self.yearly_income + taxable_profit,
+            tax_year=self.tax_year,
+            use_lookup_table=self.use_lookup_table,
+        ) - get_yearly_income_tax(
+            self.yearly_income,
+            tax_year=self.tax_year,
+            use_lookup_table=self.use_lookup_table,
+        )
+
+    def simulate_properties(self, n_years: int) -> Dict[str, np.ndarray]:
+        """
+        PROPERTY_COLUMNS of every property, of shape (n_properties, n_years), the years
+        counted from its acquisition. separate_income_tax is the income tax of the property
+        alone, as computed by ProfitCalculator.
+        """
+        columns = {
+            name: np.zeros((self.n_properties, n_years)) for name in PROPERTY_COLUMNS
+        }
+
+        for usage in UsageContext:
+            indices: List[int] = [
+                i for (i, p) in enumerate(self.properties) if p.usage == usage
+            ]
+            if not indices:
+                continue
+
+            logger.debug(f"Simulating {len(indices)} properties with usage {usage}")
+            usage_columns = (
+                BatchProfitCalculator.from_input_params(
+                    [self.properties[i] for i in indices],
+                    use_lookup_table=self.use_lookup_table,
+                )
+                .compile(n_years)
+                .simulate_before_taxes()
+            )
+            for name, values in usage_columns.items():
+                columns[name][indices] = values
+
+            if usage == UsageContext.RENTING:
+                profit = usage_columns["profit_before_taxes"]
+                columns["taxable_profit"][indices] = profit
+                columns["separate_income_tax"][indices] = self.get_income_tax(profit)
+
+        return columns
+
+    def get_default_acquisition_years(self) -> np.ndarray:
+        return np.ones(self.n_properties, dtype=int)
+
+    def simulate(
+        self, n_years: int, acquisition_years: Optional[Sequence[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        year and PORTFOLIO_COLUMNS of the portfolio, one value per year. A property
+        contributes from its acquisition year on (by default all from year 1).
+
+        income_tax is the joint income tax of all rented properties, separate_income_tax
+        the sum of their income taxes if each of them was the only one.
+        """
+        if acquisition_years is None:
+            acquisition_years = self.get_default_acquisition_years()
+
+        return dict(
+            year=np.arange(1, n_years + 1),
+            **self.simulate_acquisitions(n_years, np.asarray(acquisition_years)),
+        )
+
+    def sweep_orders(self, n_years: int, acquisition_years: np.ndarray) -> BatchResult:
+        """
+        Simulates the portfolio for many acquisition schedules at once, e.g., from
+        get_acquisition_years. acquisition_years has shape (n_orders, n_properties) and the
+        result has one scenario per row. The properties are simulated only once.
+        """
+        acquisition_years = np.asarray(acquisition_years)
+        if acquisition_years.ndim != 2:
+            raise ValueError(
+                "acquisition_years should have shape (n_orders, n_properties), "
+                f"got: {acquisition_years.shape}"
+            )
+
+        logger.info(
+            f"Sweeping {len(acquisition_years)} acquisition orders of "
+            f"{self.n_properties} properties"
+        )
+        return BatchResult(
+            years=np.arange(1, n_years + 1),
+            columns=self.simulate_acquisitions(n_years, acquisition_years),
+        )
+
+    def simulate_acquisitions(
+        self, n_years: int, acquisition_years: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        if acquisition_years.shape[-1] != self.n_properties:
+            raise ValueError(
+                f"Expected {self.n_properties} acquisition years, one per property, "
+                f"got: {acquisition_years.shape[-1]}"
+            )
+        if np.any(acquisition_years < 1):
+            raise ValueError("Acquisition years start at 1.")
+
+        columns = shift_and_sum(self.simulate_properties(n_years), acquisition_years)
+        income_tax = self.get_income_tax(columns.pop("taxable_profit"))
+
+        columns = dict(
+            columns,
+            cashflow=columns["cashflow"] - income_tax,
+            income_tax=income_tax,
+            yearly_interest_cost=columns["interest_cost"],
+            tax_benefit=-income_tax,
+        )
+        return {name: columns[name] for name in PORTFOLIO_COLUMNS}
@@ -1,7 +1,7 @@
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
-import pandas as pd
-from pydantic import BaseModel, computed_field, model_validator
+import numpy as np
+from pydantic import BaseModel, computed_field, field_validator, model_validator
 
 from immo_rechner.core.abstract_position import AbstractPosition
 from immo_rechner.core.cost import (
@@ -16,10 +16,27 @@ from immo_rechner.core.hypothetical_positions import (
     HypotheticalRentIncome,
     HypotheticalAppreciation,
 )
+from immo_rechner.core.income_tax import (
+    DEFAULT_TAX_YEAR,
+    get_available_tax_years,
+    get_yearly_income_tax,
+)
+from immo_rechner.core.kernel import (
+    FLOW_COLUMNS,
+    N_MONTHS,
+    STOCK_COLUMNS,
+    CompiledPositions,
+    Immutable,
+    aggregate_to_yearly,
+    compile_positions,
+)
 from immo_rechner.core.revenue import RentIncome
 from immo_rechner.core.tax_contexts import UsageContext, RentingVsOwnUsageTaxContext
 from immo_rechner.core.utils import get_logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = get_logger(__name__)
 
 
@@ -37,6 +54,13 @@ class YearlySummary(BaseModel):
     def tax_benefit(self) -> float:
         return -self.income_tax
 
+    @classmethod
+    def from_simulation(cls, df: "pd.DataFrame") -> List["YearlySummary"]:
+        """
+        Per-year view of the output of ProfitCalculator.simulate.
+        """
+        return [cls(**row) for row in df.to_dict(orient="records")]
+
 
 class InputParameters(BaseModel):
     usage: UsageContext
@@ -56,6 +80,16 @@ class InputParameters(BaseModel):
     notar: float = 0.015
     transfer_tax: float = 0.06
     appreciation_rate: float = 0.03
+    tax_year: int = DEFAULT_TAX_YEAR
+
+    @field_validator("tax_year")
+    @classmethod
+    def check_tax_year(cls, tax_year: int) -> int:
+        tax_years = get_available_tax_years()
+        if tax_year not in tax_years:
+            raise ValueError(f"Tax year {tax_year} is not available: {tax_years}")
+
+        return tax_year
 
     @model_validator(mode="after")
     def compute_initial_debt_if_needed(self):
@@ -78,6 +112,157 @@ class InputParameters(BaseModel):
         return self
 
 
+SIMULATION_COLUMNS = [
+    "cashflow",
+    "profit_before_taxes",
+    "income_tax",
+    "remaining_debt",
+    "cumulative_interest_cost",
+    "yearly_interest_cost",
+    "total_paid",
+]
+
+RESULT_COLUMNS = SIMULATION_COLUMNS + [
+    "tax_benefit",
+    "return_rate",
+    "cumulative_profit_before_tax",
+]
+
+MONTHLY_COLUMNS = FLOW_COLUMNS + STOCK_COLUMNS
+
+DEFAULT_CHUNK_YEARS = 10
+
+
+def get_simulation_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    SIMULATION_COLUMNS of yearly columns of the kernel (see CompiledPositions.simulate).
+    """
+    columns = dict(columns, yearly_interest_cost=columns["interest_cost"])
+    return {name: columns[name] for name in SIMULATION_COLUMNS}
+
+
+def postprocess_simulation(
+    years: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    usage: UsageContext,
+    own_capital: Union[float, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    r"""
+    This method computes tax_benefit, cumulative_profit_before_tax and
+
+    return_rate: defined as
+    $
+    \frac{1}{n_years} \frac{\sum_{i=1}^{n_years} profit_i}{initial_capital + \sum_{i=1}^{n_years} paid_i}
+    $
+
+    Columns are arrays whose last axis is the year, i.e., of shape (n_years,) or
+    (n_scenarios, n_years); own_capital is then a number or an array of shape (n_scenarios,).
+    For renting, return_rate and cumulative_profit_before_tax are nan.
+    """
+    columns = dict(columns, tax_benefit=-columns["income_tax"])
+
+    if usage == UsageContext.OWN_USE:
+        cumulative_profit_before_tax = np.cumsum(
+            columns["profit_before_taxes"], axis=-1
+        )
+
+        return_rate = (
+            cumulative_profit_before_tax
+            / (columns["total_paid"] + np.asarray(own_capital, dtype=float)[..., None])
+            / years
+        )
+
+    else:
+        cumulative_profit_before_tax = np.full(columns["cashflow"].shape, np.nan)
+        return_rate = np.full(columns["cashflow"].shape, np.nan)
+
+    columns["return_rate"] = return_rate
+    columns["cumulative_profit_before_tax"] = cumulative_profit_before_tax
+
+    return {name: columns[name] for name in RESULT_COLUMNS}
+
+
+class CompiledCalculator(Immutable):
+    """
+    A ProfitCalculator compiled for a horizon and resolution: the compiled positions and
+    the parameters of the income tax, without the positions themselves. It is immutable,
+    so simulate_columns is a pure function of it and the same instance can be cached
+    and used concurrently (e.g., from a thread pool or gthread workers) without locks.
+    """
+
+    __slots__ = ("compiled", "usage", "yearly_income", "own_capital", "tax_year")
+
+    def __init__(
+        self,
+        compiled: CompiledPositions,
+        usage: UsageContext,
+        yearly_income: float,
+        own_capital: float,
+        tax_year: int = DEFAULT_TAX_YEAR,
+    ):
+        object.__setattr__(self, "compiled", compiled)
+        object.__setattr__(self, "usage", usage)
+        object.__setattr__(self, "yearly_income", yearly_income)
+        object.__setattr__(self, "own_capital", own_capital)
+        object.__setattr__(self, "tax_year", tax_year)
+
+    @property
+    def n_years(self) -> int:
+        return self.compiled.n_years
+
+    @property
+    def resolution(self) -> str:
+        return "monthly" if self.compiled.periods_per_year == N_MONTHS else "yearly"
+
+    @classmethod
+    def from_input_params(
+        cls, input_params: InputParameters, n_years: int, resolution: str = "yearly"
+    ):
+        return ProfitCalculator.from_input_params(input_params).compile_calculator(
+            n_years, resolution=resolution
+        )
+
+    def get_yearly_income_tax(self, taxable_income: np.ndarray) -> np.ndarray:
+        return get_yearly_income_tax(taxable_income, tax_year=self.tax_year)
+
+    def simulate(self) -> "pd.DataFrame":
+        """
+        See ProfitCalculator.simulate.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.simulate_columns())
+
+    def simulate_columns(self) -> Dict[str, np.ndarray]:
+        """
+        See ProfitCalculator.simulate_columns. Every call returns new arrays.
+        """
+        columns = self.compiled.simulate(
+            usage=self.usage,
+            yearly_income=self.yearly_income,
+            get_yearly_income_tax=self.get_yearly_income_tax,
+        )
+
+        if self.resolution == "monthly":
+            months = np.arange(1, self.n_years * N_MONTHS + 1)
+            return dict(
+                month=months,
+                year=(months - 1) // N_MONTHS + 1,
+                **{name: columns[name] for name in MONTHLY_COLUMNS},
+            )
+
+        years = np.arange(1, self.n_years + 1)
+        return dict(
+            year=years,
+            **postprocess_simulation(
+                years=years,
+                columns=get_simulation_columns(columns),
+                usage=self.usage,
+                own_capital=self.own_capital,
+            ),
+        )
+
+
 class ProfitCalculator:
 
     @staticmethod
@@ -108,10 +293,12 @@ class ProfitCalculator:
         positions: List[Union[AbstractPosition, RentingVsOwnUsageTaxContext]],
         yearly_income: float,
         own_capital: float,
+        tax_year: int = DEFAULT_TAX_YEAR,
     ):
         self.positions = positions
         self.yearly_income = yearly_income
         self.own_capital = own_capital
+        self.tax_year = tax_year
 
         self.usage = self.check_usage(self.positions)
 
@@ -119,29 +306,25 @@ class ProfitCalculator:
         self.initial_debt = self.interest_rate_position.initial_debt
 
     @staticmethod
-    def get_yearly_income_tax(taxable_income: float) -> float:
+    def get_yearly_income_tax(
+        taxable_income: Union[float, np.ndarray], tax_year: int = DEFAULT_TAX_YEAR
+    ) -> Union[float, np.ndarray]:
         """
-        Formula is taken from here:
+        Income tax of the given tax year, see immo_rechner.core.income_tax.
+        For 2024 the formula is taken from here:
             https://www.finanz-tools.de/einkommensteuer/berechnung-formeln/2024
-        :param taxable_income:
+        :param taxable_income: a number or an array of numbers.
+        :param tax_year:
         :return:
         """
-        if 277_826 <= taxable_income:
-            return 0.45 * taxable_income - 18_936.88
-        elif 66_761 <= taxable_income < 277_826:
-            return 0.42 * taxable_income - 10_602.13
-        elif 17_006 <= taxable_income < 66_761:
-            z = (taxable_income - 17_005) / 10_000
-            return (181.19 * z + 2397) * z + 1025.38
-        elif 11_605 <= taxable_income < 17_006:
-            z = (taxable_income - 11_605) / 10_000
-            return (922.98 * z + 1400) * z
-        elif taxable_income < 11_605:
-            return 0.0
-        else:
-            raise ValueError(f"taxable_income {taxable_income} is not acceptable.")
+        income_tax = get_yearly_income_tax(taxable_income, tax_year=tax_year)
+        return income_tax if np.ndim(income_tax) else float(income_tax)
 
-    def yearly_simulation(self):
+    def evaluate_year(self) -> Tuple[float, float, float]:
+        """
+        Evaluates all positions for the next year.
+        :return: cashflow, profit_before_taxes and income_tax (difference)
+        """
         profit_before_taxes = 0
         cashflow = 0
         for position in self.positions:
@@ -150,15 +333,24 @@ class ProfitCalculator:
             cashflow += value if position.is_cashflow else 0.0
 
         if self.usage == UsageContext.RENTING:
-            income_tax_diff = self.get_yearly_income_tax(
-                self.yearly_income + profit_before_taxes
-            ) - self.get_yearly_income_tax(self.yearly_income)
+            income_tax = self.get_yearly_income_tax(
+                np.array(
+                    [self.yearly_income + profit_before_taxes, self.yearly_income]
+                ),
+                tax_year=self.tax_year,
+            )
+            income_tax_diff = float(income_tax[0] - income_tax[1])
         else:
             income_tax_diff = 0.0
 
         logger.debug(f"Removing tax ({income_tax_diff}) from cashflow")
         cashflow -= income_tax_diff  # Why don't we do same for profit_before_taxes (i.e., profit_after_taxes)?
 
+        return cashflow, profit_before_taxes, income_tax_diff
+
+    def yearly_simulation(self) -> YearlySummary:
+        cashflow, profit_before_taxes, income_tax_diff = self.evaluate_year()
+
         return YearlySummary(
             cashflow=cashflow,
             profit_before_taxes=profit_before_taxes,
@@ -169,40 +361,130 @@ class ProfitCalculator:
             total_paid=self.interest_rate_position.total_paid,
         )
 
-    def simulate(self, n_years: int) -> Union[List, pd.DataFrame]:
-        output = []
-        for year in range(1, n_years + 1):
-            output.append(dict(year=year, **self.yearly_simulation().model_dump()))
+    def simulate(self, n_years: int, resolution: str = "yearly") -> "pd.DataFrame":
+        """
+        Yearly (year and RESULT_COLUMNS) or monthly (month, year and MONTHLY_COLUMNS)
+        simulation; see simulate_columns.
+        """
+        import pandas as pd
 
-        df_output = pd.DataFrame.from_records(output)
+        return pd.DataFrame(self.simulate_columns(n_years, resolution=resolution))
 
-        return self.postprocess_simulation(df_output)
+    def simulate_chunks(
+        self, n_years: Optional[int] = None, chunk_years: int = DEFAULT_CHUNK_YEARS
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yields the yearly simulation (as simulate_columns) in chunks of chunk_years
+        years. Without n_years, chunks are yielded until the consumer stops.
+
+        Years are computed for a horizon that doubles whenever a chunk goes beyond it,
+        so a consumer stopping early (e.g., at the payoff year) only pays for about the
+        years it consumed, and at most twice for the others.
+        """
+        if chunk_years < 1:
+            raise ValueError(f"chunk_years should be positive, got: {chunk_years}")
+
+        horizon, columns, start = 0, None, 0
+        while (n_years is None) or (start < n_years):
+            stop = start + chunk_years
+            if n_years is not None:
+                stop = min(stop, n_years)
+
+            if stop > horizon:
+                horizon = max(stop, 2 * horizon)
+                if n_years is not None:
+                    horizon = min(horizon, n_years)
+                columns = self.compile_calculator(horizon).simulate_columns()
+
+            yield {name: values[start:stop] for (name, values) in columns.items()}
+            start = stop
+
+    def simulate_iter(
+        self, n_years: Optional[int] = None, chunk_years: int = DEFAULT_CHUNK_YEARS
+    ) -> Iterator[Dict[str, float]]:
+        """
+        Yields one record (year and RESULT_COLUMNS) per year, see simulate_chunks, e.g.,
+            next(r["year"] for r in pc.simulate_iter() if r["remaining_debt"] <= 0)
+        for the payoff year.
+        """
+        for chunk in self.simulate_chunks(n_years, chunk_years=chunk_years):
+            names = list(chunk)
+            for values in zip(*(chunk[name].tolist() for name in names)):
+                yield dict(zip(names, values))
+
+    def simulate_columns(
+        self, n_years: int, resolution: str = "yearly"
+    ) -> Dict[str, np.ndarray]:
+        """
+        Same as simulate with a dict of arrays instead of a DataFrame, so that pandas is
+        not needed. The simulation always starts in year 1, independent of
+        yearly_simulation calls.
+        With resolution="monthly", flows (e.g., cashflow, rent and interest) are monthly
+        values and stocks (e.g., remaining_debt) are values at the end of every month.
+        The income tax is computed per year and spread evenly over its months.
+        aggregate_monthly turns them back into the yearly simulation.
+        The positions are not modified, so simulating twice gives the same result.
+        """
+        return self.compile_calculator(
+            n_years, resolution=resolution
+        ).simulate_columns()
 
-    def postprocess_simulation(self, df: pd.DataFrame) -> pd.DataFrame:
+    def aggregate_monthly(self, monthly) -> "pd.DataFrame":
+        """
+        Yearly simulation (as simulate) from the output of simulate(resolution="monthly").
         """
-        This method computes
+        import pandas as pd
 
-        return_rate: defined as
-        $
-        \frac{1}{n_years} \frac{\sum_{i=1}^{n_years} profit_i}{initial_capital + \sum_{i=1}^{n_years} paid_i}
-        $
+        return pd.DataFrame(self.aggregate_monthly_columns(monthly))
+
+    def aggregate_monthly_columns(self, monthly) -> Dict[str, np.ndarray]:
+        """
+        See aggregate_monthly; monthly can be a DataFrame or a dict of arrays.
         """
-        if self.usage == UsageContext.OWN_USE:
-            cumulative_profit_before_tax = df.profit_before_taxes.cumsum()
+        columns = aggregate_to_yearly(
+            {name: np.asarray(monthly[name]) for name in MONTHLY_COLUMNS}
+        )
+        years = np.arange(1, columns["cashflow"].shape[-1] + 1)
 
-            return_rate = (
-                cumulative_profit_before_tax
-                / (df.total_paid + self.own_capital)
-                / df.year
-            )
+        return dict(
+            year=years,
+            **self.postprocess_simulation(years, get_simulation_columns(columns)),
+        )
 
-        else:
-            cumulative_profit_before_tax = None
-            return_rate = None
+    def compile(self, n_years: int, resolution: str = "yearly") -> CompiledPositions:
+        """
+        Positions in the struct-of-arrays form of immo_rechner.core.kernel.
+        """
+        return compile_positions(
+            self.positions,
+            interest_rate_position=self.interest_rate_position,
+            n_years=n_years,
+            resolution=resolution,
+        )
+
+    def compile_calculator(
+        self, n_years: int, resolution: str = "yearly"
+    ) -> CompiledCalculator:
+        """
+        Immutable form of the calculator for a horizon and resolution, see
+        CompiledCalculator.
+        """
+        return CompiledCalculator(
+            compiled=self.compile(n_years, resolution=resolution),
+            usage=self.usage,
+            yearly_income=self.yearly_income,
+            own_capital=self.own_capital,
+            tax_year=self.tax_year,
+        )
 
-        return df.assign(
-            return_rate=return_rate,
-            cumulative_profit_before_tax=cumulative_profit_before_tax,
+    def postprocess_simulation(
+        self, years: np.ndarray, columns: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        See postprocess_simulation.
+        """
+        return postprocess_simulation(
+            years=years, columns=columns, usage=self.usage, own_capital=self.own_capital
         )
 
     @classmethod
@@ -221,6 +503,7 @@ class ProfitCalculator:
             positions=positions,
             yearly_income=params.yearly_income,
             own_capital=params.own_capital,
+            tax_year=params.tax_year,
         )
 
     @staticmethod
@@ -6,6 +6,8 @@ N_MONTHS = 12
 
 class RentIncome(AbstractPosition, RentingVsOwnUsageTaxContext):
     is_cashflow = True
+    is_constant = True
+    is_rent = True
 
     def __init__(self, monthly_rent: float, usage: UsageContext):
         RentingVsOwnUsageTaxContext.__init__(self, usage=usage)
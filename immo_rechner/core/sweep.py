@@ -0,0 +1,176 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from immo_rechner.core.batch import (
+    NUMERIC_FIELDS,
+    BatchProfitCalculator,
+    get_batch_params,
+)
+from immo_rechner.core.cost import compute_side_costs
+from immo_rechner.core.profit_calculator import InputParameters
+from immo_rechner.core.tax_contexts import UsageContext
+from immo_rechner.core.utils import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+SWEEPABLE_FIELDS = NUMERIC_FIELDS + ["tax_year"]
+
+
+class SweepResult:
+    """
+    Results of a grid sweep. Every column is an array of shape (*grid_shape, n_years),
+    where the axes of the grid are the swept fields in the order of coords.
+    """
+
+    def __init__(
+        self,
+        coords: Dict[str, np.ndarray],
+        years: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ):
+        self.coords = coords
+        self.years = years
+        self.columns = columns
+
+    @property
+    def dims(self) -> List[str]:
+        return list(self.coords)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(values) for values in self.coords.values())
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def at_year(self, name: str, year: int) -> np.ndarray:
+        """
+        Values of a column in the given year, as an array of shape grid_shape.
+        """
+        return self.columns[name][..., year - 1]
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        Long DataFrame with one row per grid cell and year.
+        """
+        import pandas as pd
+
+        n_years = len(self.years)
+        grid = np.meshgrid(*self.coords.values(), indexing="ij")
+
+        return pd.DataFrame(
+            dict(
+                **{
+                    field: np.repeat(values.ravel(), n_years)
+                    for (field, values) in zip(self.dims, grid)
+                },
+                year=np.tile(self.years, int(np.prod(self.shape))),
+                **{name: values.reshape(-1) for (name, values) in self.columns.items()},
+            )
+        )
+
+
+def resolve_debt(columns: Dict[str, np.ndarray], keep: str):
+    """
+    Vectorized InputParameters.compute_initial_debt_if_needed: computes initial_debt from
+    own_capital if keep == "own_capital", and own_capital from initial_debt otherwise.
+    """
+    side_costs = compute_side_costs(
+        makler=columns["makler"],
+        notar=columns["notar"],
+        transfer_tax=columns["transfer_tax"],
+        purchase_price=columns["purchase_price"],
+    )
+
+    if keep == "own_capital":
+        columns["initial_debt"] = (
+            columns["purchase_price"] - columns["own_capital"] + side_costs
+        )
+    elif keep == "initial_debt":
+        columns["own_capital"] = (
+            columns["purchase_price"] - columns["initial_debt"] + side_costs
+        )
+    else:
+        raise ValueError(f"keep should be own_capital or initial_debt, got: {keep}")
+
+
+def sweep(
+    base: InputParameters,
+    grid: Dict[str, Sequence[float]],
+    n_years: int,
+    keep: str = "own_capital",
+    use_lookup_table: bool = False,
+    dtype=np.float64,
+    chunk_size: Optional[int] = None,
+) -> SweepResult:
+    """
+    Simulates every combination of the values in grid, all other fields taken from base,
+    in one batched pass.
+
+    :param base:
+    :param grid: values per field, e.g., dict(yearly_interest_rate=[...], repayment_amount=[...]).
+    :param n_years:
+    :param keep: which of own_capital and initial_debt stays fixed when the other one has to
+        be recomputed, e.g., when sweeping over the purchase price. Sweeping over own_capital
+        (initial_debt) always keeps own_capital (initial_debt).
+    :param use_lookup_table: see BatchProfitCalculator.
+    :param dtype: dtype of the results, e.g., np.float32 for large grids, see
+        BatchProfitCalculator.
+    :param chunk_size: see BatchProfitCalculator.
+    :return:
+    """
+    unknown_fields = set(grid) - set(SWEEPABLE_FIELDS)
+    if unknown_fields:
+        raise ValueError(f"Fields cannot be swept: {unknown_fields}")
+
+    if {"own_capital", "initial_debt"}.issubset(grid):
+        raise ValueError("own_capital and initial_debt cannot be swept together.")
+    elif "own_capital" in grid:
+        keep = "own_capital"
+    elif "initial_debt" in grid:
+        keep = "initial_debt"
+
+    coords = {field: np.asarray(values) for (field, values) in grid.items()}
+    mesh = np.meshgrid(*coords.values(), indexing="ij")
+    n_scenarios = mesh[0].size if mesh else 1
+    logger.info(f"Sweeping {n_scenarios} scenarios over {list(coords)}")
+
+    columns = {
+        field: np.full(
+            n_scenarios,
+            np.nan if getattr(base, field) is None else getattr(base, field),
+            dtype=int if field == "tax_year" else float,
+        )
+        for field in SWEEPABLE_FIELDS
+    }
+    for field, values in zip(coords, mesh):
+        columns[field] = values.ravel().astype(columns[field].dtype)
+
+    resolve_debt(columns, keep=keep)
+
+    result = BatchProfitCalculator(
+        usage=base.usage,
+        params=get_batch_params(
+            columns,
+            approximate_land_value=np.full(n_scenarios, base.approximate_land_value),
+            renting=base.usage == UsageContext.RENTING,
+        ),
+        use_lookup_table=use_lookup_table,
+        dtype=dtype,
+        chunk_size=chunk_size,
+    ).simulate(n_years=n_years)
+
+    shape = tuple(len(values) for values in coords.values())
+
+    return SweepResult(
+        coords=coords,
+        years=result.years,
+        columns={
+            name: values.reshape(shape + (n_years,))
+            for (name, values) in result.columns.items()
+        },
+    )
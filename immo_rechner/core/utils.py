@@ -14,3 +14,13 @@ def get_logger(name: str, stream=sys.stdout):
     logger.addHandler(handler)
 
     return logger
+
+
+def quiet_loggers(prefix: str = "immo_rechner.core", level: int = logging.WARNING):
+    """
+    Raises the level of all loggers under prefix, e.g., in batch runs where InputParameters
+    would log every computed initial_debt/own_capital.
+    """
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(prefix):
+            logging.getLogger(name).setLevel(level)
@@ -0,0 +1,136 @@
+import unittest
+from unittest import mock
+
+from immo_rechner.app.app import get_app
+from immo_rechner.core.profit_calculator import (
+    RESULT_COLUMNS,
+    InputParameters,
+    ProfitCalculator,
+)
+from tests.integration_tests.app.utils import get_api_params
+
+
+class TestApi(unittest.TestCase):
+
+    def setUp(self):
+        self.server = get_app().server.test_client()
+
+    def test_simulate(self):
+        # When
+        response = self.server.post("/api/simulate?n_years=10", json=get_api_params())
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        expected = ProfitCalculator.from_input_params(
+            InputParameters(**get_api_params())
+        ).simulate_columns(n_years=10)
+        self.assertEqual(list(response.json), ["year"] + RESULT_COLUMNS)
+        self.assertEqual(response.json["year"], list(range(1, 11)))
+        self.assertEqual(response.json["cashflow"], expected["cashflow"].tolist())
+        # nan is not valid JSON
+        self.assertEqual(response.json["return_rate"], [None] * 10)
+
+    def test_simulate_batch(self):
+        # Given
+        payload = [
+            get_api_params(),
+            get_api_params(usage="Own usage", repayment_amount=2_000),
+            get_api_params(monthly_rent=900),
+        ]
+
+        # When
+        response = self.server.post("/api/simulate/batch?n_years=5", json=payload)
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["n_scenarios"], 3)
+        for index, params in enumerate(payload):
+            expected = ProfitCalculator.from_input_params(
+                InputParameters(**params)
+            ).simulate_columns(n_years=5)
+            self.assertEqual(
+                response.json["remaining_debt"][index],
+                expected["remaining_debt"].tolist(),
+            )
+
+    def test_invalid_params(self):
+        # When
+        response = self.server.post(
+            "/api/simulate/batch",
+            json=[get_api_params(), get_api_params(monthly_rent="a")],
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json["error"]), ["1"])
+
+    def test_invalid_n_years(self):
+        for n_years in ["0", "abc", "1.5"]:
+            # When
+            response = self.server.post(
+                f"/api/simulate?n_years={n_years}", json=get_api_params()
+            )
+
+            # Then
+            self.assertEqual(response.status_code, 400, n_years)
+
+    def test_infinite_values(self):
+        # Given: own use without any capital has an infinite return rate
+        params = get_api_params(
+            usage="Own usage", purchase_price=0, initial_debt=0, repayment_amount=0
+        )
+
+        # When
+        response = self.server.post("/api/simulate?n_years=5", json=params)
+        batch_response = self.server.post(
+            "/api/simulate/batch?n_years=5", json=[params]
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["return_rate"], [None] * 5)
+        self.assertEqual(batch_response.status_code, 200)
+        self.assertEqual(batch_response.json["return_rate"], [[None] * 5])
+
+    def test_engine_errors_are_not_bad_requests(self):
+        # Given
+        error = ValueError("bug")
+
+        # When
+        with mock.patch(
+            "immo_rechner.app.api.simulate_scenarios", side_effect=error
+        ), mock.patch(
+            "immo_rechner.app.api.get_compiled_calculator", side_effect=error
+        ):
+            response = self.server.post("/api/simulate", json=get_api_params())
+            batch_response = self.server.post(
+                "/api/simulate/batch", json=[get_api_params()]
+            )
+
+        # Then
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(batch_response.status_code, 500)
+
+    def test_parameters_the_engine_rejects(self):
+        # Given: no land value to approximate it from
+        params = get_api_params(approximate_land_value=False)
+
+        # When
+        response = self.server.post("/api/simulate", json=params)
+        batch_response = self.server.post(
+            "/api/simulate/batch",
+            json=[get_api_params(), params, get_api_params(tax_year=2030)],
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("land_value", response.json["error"])
+        self.assertEqual(batch_response.status_code, 400)
+        self.assertEqual(list(batch_response.json["error"]), ["1", "2"])
+
+    def test_no_json(self):
+        # When
+        response = self.server.post("/api/simulate", data="not json")
+
+        # Then
+        self.assertEqual(response.status_code, 400)
@@ -1,3 +1,5 @@
+import json
+import re
 import unittest
 
 from immo_rechner.app.app import get_app
@@ -28,3 +30,34 @@ class TestApp(unittest.TestCase):
 
         # Check if the response contains Dash's default content (e.g., HTML structure)
         self.assertIn(b"dash-renderer", response.data)
+
+    def test_ui_toggles_run_in_the_browser(self):
+        # When
+        response = self.server.get("/_dash-dependencies")
+
+        # Then
+        clientside_outputs = {
+            dependency["output"]
+            for dependency in response.json
+            if dependency.get("clientside_function")
+        }
+        self.assertLessEqual(
+            {
+                "..repayment-value.disabled...repayment-range.disabled..",
+                "..monthly-rent.disabled...monthly-rent.value..",
+                "..initial-debt.disabled...own-capital.disabled..",
+            },
+            clientside_outputs,
+        )
+
+    def test_every_page_load_has_its_own_session(self):
+        # When
+        layouts = [self.server.get("/_dash-layout").json for _ in range(2)]
+
+        # Then
+        session_ids = [
+            re.search(r'"id": "session-id", "data": "([0-9a-f]+)"', json.dumps(layout))
+            for layout in layouts
+        ]
+        self.assertTrue(all(session_ids))
+        self.assertNotEqual(session_ids[0].group(1), session_ids[1].group(1))
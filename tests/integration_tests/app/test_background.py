@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from immo_rechner.app.background import (
+    BACKGROUND_DIR_ENV,
+    get_background_callback_manager,
+    get_background_options,
+    with_progress,
+)
+from immo_rechner.app.callbacks import HEATMAP_CHUNKS, update_graph, update_heatmap
+from immo_rechner.app.metrics import registry, timed_callback
+from tests.integration_tests.app.utils import get_heatmap_inputs, get_inputs
+
+
+def background_job(value, set_progress=None):
+    return value
+
+
+class TestBackgroundCallbackManager(unittest.TestCase):
+
+    def test_no_directory(self):
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIsNone(get_background_callback_manager())
+        self.assertEqual(get_background_options(None, "graph"), {})
+
+    def test_directory(self):
+        # Given
+        with tempfile.TemporaryDirectory() as directory:
+            # When
+            manager = get_background_callback_manager(directory)
+            with mock.patch.dict(os.environ, {BACKGROUND_DIR_ENV: directory}):
+                manager_from_env = get_background_callback_manager()
+            options = get_background_options(manager, "heatmap")
+
+            # Then
+            self.assertIsNotNone(manager)
+            self.assertIsNotNone(manager_from_env)
+            self.assertTrue(options["background"])
+            self.assertIs(options["manager"], manager)
+            self.assertEqual(
+                [output.component_id for output in options["progress"]],
+                ["heatmap-progress", "heatmap-progress"],
+            )
+            self.assertEqual(options["cancel"][0].component_id, "heatmap-cancel")
+
+    def test_with_progress(self):
+        # Given
+        def func(a, b, set_progress=None):
+            return a, b, set_progress
+
+        # When
+        wrapped = with_progress(func, manager=object())
+
+        # Then
+        self.assertIs(with_progress(func, manager=None), func)
+        self.assertEqual(wrapped("progress", 1, 2), (1, 2, "progress"))
+        self.assertEqual(wrapped.__name__, "func")
+
+
+class TestProgress(unittest.TestCase):
+
+    def test_update_graph(self):
+        # Given
+        progress = []
+
+        # When
+        update_graph(**get_inputs(), set_progress=progress.append)
+
+        # Then: one pass per repayment 500, 1000 and 1500
+        self.assertEqual(progress, [("0", "4"), ("1", "4"), ("2", "4"), ("3", "4")])
+
+    def test_update_heatmap(self):
+        # Given
+        progress = []
+        inputs = get_heatmap_inputs(resolution=40)
+
+        # When
+        figure = update_heatmap(**inputs, set_progress=progress.append)
+        with mock.patch("immo_rechner.app.callbacks.HEATMAP_CHUNKS", 1):
+            expected = update_heatmap(**inputs)
+
+        # Then
+        self.assertEqual(len(progress), HEATMAP_CHUNKS + 1)
+        self.assertEqual(progress[-1], (str(HEATMAP_CHUNKS), str(HEATMAP_CHUNKS + 1)))
+        self.assertEqual(np.shape(figure.data[0].z), (40, 40))
+        np.testing.assert_allclose(figure.data[0].z, expected.data[0].z)
+
+
+class TestBackgroundMetrics(unittest.TestCase):
+
+    def test_metrics_of_a_job_process(self):
+        # Given: a callback wrapped as in get_app, with a manager
+        callback = timed_callback(with_progress(background_job, manager=object()))
+        name = "immo_rechner_callback_duration_seconds_count"
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(
+            registry, "directory", directory
+        ):
+            # When: the callback runs once in the web process and once in a job
+            # process, which is forked like the ones of DiskcacheManager
+            callback(None, 1)
+            process = multiprocessing.get_context("fork").Process(
+                target=callback, args=(None, 2)
+            )
+            process.start()
+            process.join()
+            text = registry.render()
+            second_text = registry.render()
+
+        # Then: the job is reported after its process exited, only once
+        self.assertEqual(process.exitcode, 0)
+        for rendered in [text, second_text]:
+            self.assertIn(
+                f'{name}{{callback="background_job",pid="{os.getpid()}"}} 1.0',
+                rendered,
+            )
+            self.assertIn(
+                f'{name}{{callback="background_job",pid="exited"}} 1.0', rendered
+            )
@@ -0,0 +1,179 @@
+import unittest
+
+from dash import Patch, no_update
+from dash.exceptions import PreventUpdate
+from plotly.graph_objects import Figure
+
+from immo_rechner.app.callbacks import (
+    SCENARIO_TRACES,
+    preset_figures,
+    update_goal_seek,
+    update_graph,
+    update_heatmap,
+    warm_start,
+)
+from immo_rechner.app.input_parameters import DEFAULT_INPUTS
+from tests.integration_tests.app.utils import get_heatmap_inputs, get_inputs
+
+
+class TestUpdateGraph(unittest.TestCase):
+
+    def test_full_figure_without_graph_state(self):
+        # When
+        figure, graph_state = update_graph(**get_inputs())
+
+        # Then
+        self.assertIsInstance(figure, Figure)
+        self.assertEqual(len(figure.data), 3 * len(SCENARIO_TRACES))
+        self.assertEqual(len(graph_state["digests"]), len(figure.data))
+
+    def test_range_narrower_than_one_step(self):
+        for repayment_range in [[1_000, 1_000], [1_500, 1_000]]:
+            # When
+            figure, graph_state = update_graph(
+                **get_inputs(repayment_range=repayment_range)
+            )
+
+            # Then
+            self.assertEqual(
+                graph_state["scenario_names"], [f"repayment: {repayment_range[0]}"]
+            )
+
+    def test_patch_only_changed_traces(self):
+        # Given
+        _, graph_state = update_graph(**get_inputs())
+
+        # When
+        figure, new_graph_state = update_graph(
+            **get_inputs(yearly_income=40_000), graph_state=graph_state
+        )
+
+        # Then
+        self.assertIsInstance(figure, Patch)
+        changed = [
+            index
+            for (index, digest) in enumerate(new_graph_state["digests"])
+            if digest != graph_state["digests"][index]
+        ]
+        # Only cashflow and tax benefit depend on the yearly income.
+        self.assertEqual({index % len(SCENARIO_TRACES) for index in changed}, {0, 1})
+
+    def test_no_update_for_same_inputs(self):
+        # Given
+        _, graph_state = update_graph(**get_inputs())
+
+        # When
+        figure, _ = update_graph(**get_inputs(), graph_state=graph_state)
+
+        # Then
+        self.assertIs(figure, no_update)
+
+    def test_full_figure_when_scenarios_change(self):
+        # Given
+        _, graph_state = update_graph(**get_inputs())
+
+        # When
+        figure, _ = update_graph(
+            **get_inputs(use_repayment_range=[]), graph_state=graph_state
+        )
+
+        # Then
+        self.assertIsInstance(figure, Figure)
+        self.assertEqual(len(figure.data), len(SCENARIO_TRACES))
+
+
+class TestUpdateHeatmap(unittest.TestCase):
+
+    def test_update_heatmap(self):
+        # When
+        figure = update_heatmap(**get_heatmap_inputs(resolution=40))
+
+        # Then
+        self.assertEqual(len(figure.data[0].x), 40)
+        self.assertEqual(len(figure.data[0].z), 40)
+        self.assertAlmostEqual(figure.data[0].x[-1], 8.0)
+
+    def test_update_heatmap_same_axes(self):
+        with self.assertRaises(PreventUpdate):
+            update_heatmap(**get_heatmap_inputs(y_field="yearly_interest_rate"))
+
+
+class TestUpdateGoalSeek(unittest.TestCase):
+
+    def get_inputs(self, **kwargs):
+        inputs = {
+            key: value
+            for (key, value) in get_inputs().items()
+            if key not in {"repayment_range", "num_years", "use_repayment_range"}
+        }
+        inputs.update(n_clicks=1, field="repayment_amount", target="debt_free", year=20)
+        inputs.update(kwargs)
+        return inputs
+
+    def test_solution(self):
+        # When
+        output = update_goal_seek(**self.get_inputs())
+
+        # Then
+        self.assertTrue(output.startswith("Monthly loan repayment (EUR): "))
+
+    def test_no_solution(self):
+        # When
+        output = update_goal_seek(
+            **self.get_inputs(
+                field="own_capital",
+                target="non_negative_cashflow",
+                month_rent=0,
+                facility_costs=2_000,
+                facility_costs_owner_share=100,
+            )
+        )
+
+        # Then
+        self.assertTrue(output.startswith("No own capital"))
+
+    def test_not_clicked(self):
+        with self.assertRaises(PreventUpdate):
+            update_goal_seek(**self.get_inputs(n_clicks=0))
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def test_default_figure_is_served_from_memory(self):
+        # Given
+        figure, graph_state = warm_start()
+
+        # When
+        output, output_graph_state = update_graph(**DEFAULT_INPUTS)
+        output_patch, _ = update_graph(**DEFAULT_INPUTS, graph_state=graph_state)
+
+        # Then
+        self.assertIs(output, figure)
+        self.assertEqual(output_graph_state, graph_state)
+        self.assertIs(output_patch, no_update)
+
+    def test_numbers_as_floats_match(self):
+        # Given
+        figure, _ = warm_start()
+        inputs = dict(
+            DEFAULT_INPUTS, yearly_income=float(DEFAULT_INPUTS["yearly_income"])
+        )
+
+        # When
+        output, _ = update_graph(**inputs)
+
+        # Then
+        self.assertIs(output, figure)
+
+    def test_preset_matches_simulation(self):
+        # Given
+        warm_start()
+        preset_figures.figures.clear()
+
+        # When
+        figure, graph_state = update_graph(**DEFAULT_INPUTS)
+        preset_figure, preset_graph_state = warm_start()
+
+        # Then
+        self.assertEqual(preset_graph_state, graph_state)
+        self.assertEqual(len(preset_figure["data"]), len(figure.data))
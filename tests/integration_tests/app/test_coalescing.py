@@ -0,0 +1,165 @@
+import os
+import random
+import tempfile
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from dash.exceptions import PreventUpdate
+
+from immo_rechner.app.callbacks import update_graph
+from immo_rechner.app.coalescing import RequestCoalescer, request_coalescer
+from immo_rechner.core.cache import simulation_cache
+from tests.integration_tests.app.utils import get_inputs
+
+
+class TestRequestCoalescer(unittest.TestCase):
+
+    def test_newer_request_makes_older_stale(self):
+        # Given
+        coalescer = RequestCoalescer()
+        session_id = uuid.uuid4().hex
+
+        # When
+        first = coalescer.start(session_id, "update_graph", 1)
+        second = coalescer.start(session_id, "update_graph", 2)
+        other = coalescer.start(uuid.uuid4().hex, "update_graph", 1)
+
+        # Then
+        self.assertTrue(coalescer.is_stale(session_id, "update_graph", first))
+        self.assertFalse(coalescer.is_stale(session_id, "update_graph", second))
+        self.assertFalse(coalescer.is_stale(session_id, "update_heatmap", first))
+        with self.assertRaises(PreventUpdate):
+            coalescer.check(session_id, "update_graph", first)
+        self.assertEqual(coalescer.n_dropped["update_graph"], 1)
+        self.assertEqual(other, 1)
+
+    def test_requests_are_ordered_as_sent(self):
+        # Given
+        coalescer = RequestCoalescer()
+        session_id = uuid.uuid4().hex
+
+        # When: the older request starts last
+        newer = coalescer.start(session_id, "update_graph", 2)
+        older = coalescer.start(session_id, "update_graph", 1)
+
+        # Then
+        self.assertTrue(coalescer.is_stale(session_id, "update_graph", older))
+        self.assertFalse(coalescer.is_stale(session_id, "update_graph", newer))
+
+    def test_shared_directory(self):
+        # Given: two workers
+        with tempfile.TemporaryDirectory() as directory:
+            worker_1 = RequestCoalescer(directory=directory)
+            worker_2 = RequestCoalescer(directory=directory)
+            session_id = uuid.uuid4().hex
+
+            # When: worker_1 starts the older request after worker_2 the newer one
+            second = worker_2.start(session_id, "update_graph", 2)
+            first = worker_1.start(session_id, "update_graph", 1)
+
+            # Then
+            self.assertTrue(worker_1.is_stale(session_id, "update_graph", first))
+            self.assertTrue(worker_2.is_stale(session_id, "update_graph", first))
+            self.assertFalse(worker_1.is_stale(session_id, "update_graph", second))
+
+    def test_concurrent_workers_keep_the_highest_sequence(self):
+        # Given
+        with tempfile.TemporaryDirectory() as directory:
+            session_id = uuid.uuid4().hex
+            sequences = list(range(1, 201))
+            random.Random(0).shuffle(sequences)
+
+            def start(sequence):
+                RequestCoalescer(directory=directory).start(
+                    session_id, "update_graph", sequence
+                )
+
+            # When
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(start, sequences))
+
+            # Then
+            coalescer = RequestCoalescer(directory=directory)
+            self.assertEqual(coalescer.read(f"{session_id}-update_graph"), 200)
+
+    def test_without_session_or_sequence_never_stale(self):
+        # Given
+        coalescer = RequestCoalescer()
+
+        for session_id, sequences in [
+            (None, [1, 2]),
+            ("", [1, 2]),
+            ("../../etc/passwd", [1, 2]),
+            (uuid.uuid4().hex, [None, None]),
+        ]:
+            # When
+            first = coalescer.start(session_id, "update_graph", sequences[0])
+            coalescer.start(session_id, "update_graph", sequences[1])
+
+            # Then
+            self.assertFalse(coalescer.is_stale(session_id, "update_graph", first))
+
+    def test_cleanup(self):
+        # Given
+        with tempfile.TemporaryDirectory() as directory:
+            coalescer = RequestCoalescer(directory=directory)
+            session_id = uuid.uuid4().hex
+            token = coalescer.start(session_id, "update_graph", 1)
+
+            # When
+            coalescer.cleanup(max_age=0)
+            coalescer.start(session_id, "update_graph", 2)
+
+            # Then
+            self.assertTrue(coalescer.is_stale(session_id, "update_graph", token))
+            coalescer.cleanup(max_age=-1)
+            self.assertEqual(coalescer.latest, {})
+            self.assertEqual(os.listdir(directory), [])
+
+
+class TestUpdateGraphCoalescing(unittest.TestCase):
+
+    def test_stale_request_is_dropped_between_passes(self):
+        # Given: a newer request of the session starts during the first pass
+        session_id = uuid.uuid4().hex
+        simulate = simulation_cache.simulate
+
+        def simulate_and_start_newer(*args, **kwargs):
+            request_coalescer.start(session_id, "update_graph", 2)
+            return simulate(*args, **kwargs)
+
+        # When / Then
+        with mock.patch.object(
+            simulation_cache, "simulate", side_effect=simulate_and_start_newer
+        ) as simulate_mock:
+            with self.assertRaises(PreventUpdate):
+                update_graph(
+                    **get_inputs(repayment_range=[500, 3000]),
+                    request_sequence=1,
+                    session_id=session_id,
+                )
+
+        simulate_mock.assert_called_once()
+
+    def test_stale_request_is_dropped_before_simulating(self):
+        # Given
+        session_id = uuid.uuid4().hex
+        request_coalescer.start(session_id, "update_graph", 2)
+
+        # When / Then
+        with mock.patch.object(simulation_cache, "simulate") as simulate_mock:
+            with self.assertRaises(PreventUpdate):
+                update_graph(**get_inputs(), request_sequence=1, session_id=session_id)
+
+        simulate_mock.assert_not_called()
+
+    def test_latest_request_is_computed(self):
+        # When
+        figure, graph_state = update_graph(
+            **get_inputs(), request_sequence=1, session_id=uuid.uuid4().hex
+        )
+
+        # Then
+        self.assertIsNotNone(graph_state)
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+
+from immo_rechner.app.app import get_app
+from immo_rechner.app.metrics import Histogram, MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_samples(self):
+        # Given
+        histogram = Histogram("duration", "doc", buckets=(0.1, 1.0), label_names=["a"])
+
+        # When
+        for value in [0.05, 0.5, 5.0]:
+            histogram.observe(value, a="x")
+
+        # Then
+        samples = {
+            (suffix, labels.get("le")): value
+            for (suffix, labels, value) in histogram.get_samples()
+        }
+        self.assertEqual(samples[("_bucket", "0.1")], 1)
+        self.assertEqual(samples[("_bucket", "1.0")], 2)
+        self.assertEqual(samples[("_bucket", "+Inf")], 3)
+        self.assertEqual(samples[("_count", None)], 3)
+        self.assertAlmostEqual(samples[("_sum", None)], 5.55)
+
+    def test_render_merges_live_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            registry = MetricsRegistry(directory=directory)
+            histogram = registry.register(Histogram("duration", "doc"))
+            histogram.observe(0.2)
+            for pid in [os.getppid(), 2**22 + 1]:  # A live and a (likely) dead pid
+                with open(os.path.join(directory, f"{pid}.json"), "w") as f:
+                    json.dump(registry.get_snapshot(), f)
+
+            # When
+            text = registry.render()
+
+            # Then
+            self.assertEqual(text.count("# TYPE duration histogram"), 1)
+            self.assertIn(f'duration_count{{pid="{os.getpid()}"}} 1.0', text)
+            self.assertIn(f'duration_count{{pid="{os.getppid()}"}} 1.0', text)
+            self.assertNotIn(str(2**22 + 1), text)
+            self.assertFalse(
+                os.path.exists(os.path.join(directory, f"{2**22 + 1}.json"))
+            )
+            # The histograms of the dead pid are kept, summed over exited processes
+            self.assertIn('duration_count{pid="exited"} 1.0', text)
+            self.assertIn('duration_count{pid="exited"} 1.0', registry.render())
+
+    def test_metrics_endpoint(self):
+        # Given
+        client = get_app().server.test_client()
+
+        # When
+        response = client.get("/metrics")
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        for name in [
+            "immo_rechner_cache_hit_rate",
+            "immo_rechner_callback_duration_seconds",
+            "process_resident_memory_bytes",
+        ]:
+            self.assertIn(f"# TYPE {name}", text)
@@ -0,0 +1,56 @@
+from immo_rechner.app.callbacks import get_input_parameters
+
+
+def get_inputs(**kwargs):
+    inputs = dict(
+        repayment_range=[500, 2000],
+        yearly_income=100_000,
+        month_rent=1_500,
+        initial_debt=450_000,
+        num_years=20,
+        interest_rate_percentage=3.3,
+        facility_costs=350,
+        facility_costs_owner_share=50,
+        purchase_price=450_000,
+        depreciation_precentage=2,
+        use_repayment_range=["Use Range"],
+        repayment_value=1_500,
+        apt_own_usage="Renting",
+        own_capital_box=[],
+        own_capital=100_000,
+        maker_provision=3.57,
+    )
+    inputs.update(kwargs)
+    return inputs
+
+
+def get_heatmap_inputs(**kwargs):
+    inputs = dict(
+        x_field="yearly_interest_rate",
+        y_field="repayment_amount",
+        column="cashflow",
+        year=10,
+        resolution=50,
+    )
+    inputs.update(kwargs)
+    graph_inputs = get_inputs()
+    for name in ["repayment_range", "num_years", "use_repayment_range"]:
+        graph_inputs.pop(name)
+    return dict(inputs, **graph_inputs)
+
+
+def get_api_params(**kwargs):
+    """
+    JSON parameters of the REST API for the inputs of get_inputs.
+    """
+    inputs = get_inputs()
+    for name in ["repayment_range", "num_years", "use_repayment_range"]:
+        inputs.pop(name)
+    inputs["repayment_amount"] = inputs.pop("repayment_value")
+    params = get_input_parameters(**inputs).model_dump(
+        mode="json",
+        exclude_unset=True,
+        exclude={"own_capital"},  # Resolved from the initial debt
+    )
+    params.update(kwargs)
+    return params
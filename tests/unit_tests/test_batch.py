@@ -0,0 +1,143 @@
+from unittest import TestCase
+
+import numpy as np
+from parameterized import parameterized
+
+from immo_rechner.core.batch import (
+    BatchProfitCalculator,
+    check_simulatable,
+    simulate_scenarios,
+    stack_input_params,
+)
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import COMPARED_COLUMNS, get_input_params
+
+
+class TestBatchProfitCalculator(TestCase):
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING),
+            ("own_usage", UsageContext.OWN_USE),
+        ]
+    )
+    def test_simulate_matches_profit_calculator(self, name, usage):
+        # Given
+        input_params = [
+            get_input_params(usage=usage, repayment_amount=repayment)
+            for repayment in [1_000, 1_500, 2_500]
+        ]
+
+        # When
+        result = BatchProfitCalculator.from_input_params(input_params).simulate(
+            n_years=15
+        )
+
+        # Then
+        self.assertEqual(result["cashflow"].shape, (3, 15))
+        for index, params in enumerate(input_params):
+            expected = ProfitCalculator.from_input_params(params).simulate(n_years=15)
+            for column in COMPARED_COLUMNS:
+                np.testing.assert_allclose(
+                    result[column][index], expected[column].to_numpy(), err_msg=column
+                )
+
+    def test_simulate_scenarios_mixed_usage(self):
+        # Given
+        input_params = [
+            get_input_params(usage=UsageContext.OWN_USE),
+            get_input_params(usage=UsageContext.RENTING, land_value=50_000),
+        ]
+
+        # When
+        result = simulate_scenarios(input_params, n_years=5)
+
+        # Then
+        for index, params in enumerate(input_params):
+            expected = ProfitCalculator.from_input_params(params).simulate(n_years=5)
+            np.testing.assert_allclose(
+                result["cashflow"][index], expected.cashflow.to_numpy()
+            )
+
+    def test_own_use_without_land_value(self):
+        # Given: the land value is only used when renting
+        input_params = [
+            get_input_params(usage=UsageContext.OWN_USE, approximate_land_value=False),
+            get_input_params(usage=UsageContext.RENTING, land_value=50_000),
+        ]
+
+        # When
+        check_simulatable(input_params[0])
+        result = simulate_scenarios(input_params, n_years=5)
+
+        # Then
+        expected = ProfitCalculator.from_input_params(input_params[0]).simulate(5)
+        np.testing.assert_allclose(result["cashflow"][0], expected.cashflow.to_numpy())
+        with self.assertRaises(ValueError):
+            check_simulatable(
+                get_input_params(
+                    usage=UsageContext.RENTING, approximate_land_value=False
+                )
+            )
+
+    def test_simulate_with_lookup_table(self):
+        # Given
+        input_params = [get_input_params(tax_year=year) for year in [2024, 2025]]
+
+        # When
+        result = simulate_scenarios(input_params, n_years=5, use_lookup_table=True)
+
+        # Then
+        for index, params in enumerate(input_params):
+            expected = ProfitCalculator.from_input_params(params).simulate(n_years=5)
+            np.testing.assert_allclose(
+                result["income_tax"][index], expected.income_tax.to_numpy(), atol=2.0
+            )
+
+    @parameterized.expand([("one_chunk", None), ("chunks", 3)])
+    def test_simulate_float32(self, name, chunk_size):
+        # Given
+        input_params = [
+            get_input_params(
+                monthly_rent=rent, repayment_amount=1_000 + 200 * rent / 100
+            )
+            for rent in range(1_000, 1_700, 100)
+        ]
+        expected = BatchProfitCalculator.from_input_params(input_params).simulate(20)
+
+        # When
+        result = BatchProfitCalculator.from_input_params(
+            input_params, dtype=np.float32, chunk_size=chunk_size
+        ).simulate(n_years=20)
+
+        # Then
+        self.assertEqual(result.n_scenarios, 7)
+        for column, values in expected.columns.items():
+            self.assertEqual(result[column].dtype, np.float32)
+            np.testing.assert_allclose(
+                result[column], values, rtol=1e-6, atol=1e-2, err_msg=column
+            )
+
+    def test_chunk_size_raise_error(self):
+        input_params = [get_input_params()]
+
+        with self.assertRaises(ValueError):
+            BatchProfitCalculator.from_input_params(input_params, chunk_size=0)
+        with self.assertRaises(ValueError):
+            BatchProfitCalculator(
+                usage=UsageContext.RENTING,
+                params=stack_input_params(input_params),
+                positions=[],
+                chunk_size=1,
+            )
+
+    def test_from_input_params_raise_error_for_mixed_usage(self):
+        # When, Then
+        with self.assertRaises(ValueError):
+            BatchProfitCalculator.from_input_params(
+                [
+                    get_input_params(usage=UsageContext.OWN_USE),
+                    get_input_params(usage=UsageContext.RENTING),
+                ]
+            )
@@ -0,0 +1,147 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase, mock
+
+import numpy as np
+import pandas as pd
+
+from immo_rechner.core.cache import (
+    DiskBackend,
+    SimulationCache,
+    get_cache_key,
+    get_cache_version,
+    get_compiled_calculator,
+)
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from tests.unit_tests.utils import get_input_params
+
+
+class TestSimulationCache(TestCase):
+
+    def test_get_cache_key(self):
+        # Given
+        params = get_input_params()
+
+        # Then
+        self.assertEqual(
+            get_cache_key(params, 10),
+            get_cache_key(get_input_params(repayment_amount=1_500.0), 10),
+        )
+        self.assertNotEqual(get_cache_key(params, 10), get_cache_key(params, 11))
+        self.assertNotEqual(
+            get_cache_key(params, 10),
+            get_cache_key(get_input_params(repayment_amount=1_501), 10),
+        )
+
+    def test_get_cache_key_depends_on_version(self):
+        # Given
+        params = get_input_params()
+        key = get_cache_key(params, 10)
+
+        # When: e.g., an upgrade or changed tariffs
+        with mock.patch(
+            "immo_rechner.core.cache.get_cache_version", return_value="0.2.0-abc"
+        ):
+            upgraded_key = get_cache_key(params, 10)
+
+        # Then
+        self.assertNotEqual(key, upgraded_key)
+        self.assertEqual(get_cache_version(), get_cache_version())
+
+    def test_lru_eviction(self):
+        # Given
+        cache = SimulationCache(max_size=2)
+
+        # When
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        # Then
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_simulate(self):
+        # Given
+        cache = SimulationCache()
+        input_params = [
+            get_input_params(repayment_amount=repayment) for repayment in [1_000, 2_000]
+        ]
+
+        # When
+        first = cache.simulate(input_params, n_years=10)
+        second = cache.simulate(input_params[::-1], n_years=10)
+
+        # Then
+        expected = ProfitCalculator.from_input_params(input_params[1]).simulate(10)
+        self.assertTrue(first[1].cashflow.equals(expected.cashflow))
+        self.assertIs(second[0], first[1])
+        self.assertEqual(cache.get_stats()["hit_rate"], 0.5)
+
+    def test_disk_backend_is_shared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            input_params = [get_input_params()]
+            SimulationCache(disk_backend=DiskBackend(directory)).simulate(
+                input_params, n_years=5
+            )
+            cache = SimulationCache(disk_backend=DiskBackend(directory))
+
+            # When
+            output = cache.simulate(input_params, n_years=5)
+
+            # Then
+            self.assertEqual(len(output[0]), 5)
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_disk_backend_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            backend = DiskBackend(directory, max_entries=10)
+            df = pd.DataFrame(dict(year=np.arange(1, 4), cashflow=np.ones(3)))
+
+            # When
+            with mock.patch.object(backend, "scan", wraps=backend.scan) as scan:
+                for key in range(12):
+                    backend.put(str(key), df)
+
+            # Then: counted at the first write, evicted down to 9 files at the 11th
+            self.assertEqual(scan.call_count, 2)
+            self.assertEqual(len(os.listdir(directory)), 10)
+            pd.testing.assert_frame_equal(backend.get("11"), df)
+
+    def test_disk_backend_does_not_unpickle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            backend = DiskBackend(directory)
+            with open(backend.get_path("key"), "wb") as f:
+                pickle.dump(pd.DataFrame(dict(year=[1])), f)
+
+            # When / Then
+            self.assertIsNone(backend.get("key"))
+
+    def test_get_compiled_calculator(self):
+        # Given
+        cache = SimulationCache(max_size=4)
+        input_params = get_input_params()
+
+        # When
+        calculator = get_compiled_calculator(input_params, n_years=10, cache=cache)
+
+        # Then
+        self.assertIs(
+            get_compiled_calculator(get_input_params(), n_years=10, cache=cache),
+            calculator,
+        )
+        self.assertIsNot(
+            get_compiled_calculator(
+                input_params, n_years=10, resolution="monthly", cache=cache
+            ),
+            calculator,
+        )
+        self.assertEqual(cache.hits, 1)
@@ -0,0 +1,125 @@
+import importlib.util
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from immo_rechner.cli.batch import main, run_batch
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+def get_records():
+    return [
+        get_input_params(usage=usage, repayment_amount=repayment).model_dump(
+            mode="json",
+            exclude_unset=True,
+            exclude={"own_capital"},  # Resolved from the initial debt
+        )
+        for usage in [UsageContext.RENTING, UsageContext.OWN_USE]
+        for repayment in [1_000, 1_500, 2_000]
+    ]
+
+
+class TestBatchCli(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_path(self, filename):
+        return os.path.join(self.directory.name, filename)
+
+    def test_csv_to_csv_matches_profit_calculator(self):
+        # Given
+        records = get_records()
+        pd.DataFrame(records).to_csv(self.get_path("input.csv"), index=False)
+
+        # When
+        stats = run_batch(
+            self.get_path("input.csv"),
+            self.get_path("output.csv"),
+            n_years=10,
+            chunk_size=4,
+        )
+
+        # Then
+        output = pd.read_csv(self.get_path("output.csv"))
+        self.assertEqual(stats, dict(n_simulated=6, n_invalid=0))
+        self.assertEqual(len(output), 6 * 10)
+        for row, record in enumerate(records):
+            expected = ProfitCalculator.from_input_params(
+                InputParameters(**record)
+            ).simulate(n_years=10)
+            np.testing.assert_allclose(
+                output[output.row == row].cashflow.to_numpy(),
+                expected.cashflow.to_numpy(),
+            )
+
+    def test_invalid_rows(self):
+        # Given
+        records = get_records()
+        records[2]["owner_share"] = "half"
+        pd.DataFrame(records).to_json(
+            self.get_path("input.jsonl"), orient="records", lines=True
+        )
+        args = [self.get_path("input.jsonl"), self.get_path("output.csv")]
+
+        # When
+        failed = CliRunner().invoke(main, args)
+        skipped = CliRunner().invoke(main, args + ["--skip-invalid", "--n-years", "5"])
+
+        # Then
+        self.assertNotEqual(failed.exit_code, 0)
+        self.assertIn("Invalid row 2", failed.output)
+        self.assertEqual(skipped.exit_code, 0)
+        output = pd.read_csv(self.get_path("output.csv"))
+        self.assertEqual(sorted(set(output.row)), [0, 1, 3, 4, 5])
+
+    def test_rows_rejected_by_the_engine(self):
+        # Given: no land value to approximate it from and a tax year without tariff
+        records = get_records()[:4]
+        records[1].update(approximate_land_value=False)
+        records[2].update(tax_year=2030)
+        pd.DataFrame(records).to_csv(self.get_path("input.csv"), index=False)
+        args = [self.get_path("input.csv"), self.get_path("output.csv")]
+
+        # When
+        failed = CliRunner().invoke(main, args)
+        skipped = CliRunner().invoke(main, args + ["--skip-invalid", "--n-years", "5"])
+
+        # Then
+        self.assertNotEqual(failed.exit_code, 0)
+        self.assertIn("Invalid row 1", failed.output)
+        self.assertIn("land_value", failed.output)
+        self.assertEqual(skipped.exit_code, 0, skipped.output)
+        output = pd.read_csv(self.get_path("output.csv"))
+        self.assertEqual(sorted(set(output.row)), [0, 3])
+
+    @skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet_with_several_workers(self):
+        # Given
+        pd.DataFrame(get_records() * 5).to_parquet(self.get_path("input.parquet"))
+
+        # When
+        run_batch(
+            self.get_path("input.parquet"),
+            self.get_path("output.parquet"),
+            n_years=5,
+            chunk_size=7,
+            n_workers=2,
+        )
+
+        # Then
+        output = pd.read_parquet(self.get_path("output.parquet"))
+        np.testing.assert_array_equal(output.row, np.repeat(np.arange(30), 5))
+        np.testing.assert_allclose(
+            output.cashflow.to_numpy().reshape(5, 6, 5)[1],
+            output.cashflow.to_numpy().reshape(5, 6, 5)[0],
+        )
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from click.testing import CliRunner
+
+from immo_rechner.cli.benchmark import (
+    BENCHMARKS,
+    compare_results,
+    main,
+    save_results,
+)
+
+
+class TestBenchmark(TestCase):
+
+    def test_every_benchmark_runs(self):
+        for name, setup in BENCHMARKS.items():
+            with self.subTest(name):
+                setup()()
+
+    def test_compare_results(self):
+        # Given
+        baseline = dict(a=dict(min=1.0), b=dict(min=1.0), c=dict(min=1.0))
+        current = dict(a=dict(min=1.05), b=dict(min=1.2), d=dict(min=1.0))
+
+        # When
+        rows = compare_results(baseline, current, threshold=0.1)
+
+        # Then
+        self.assertEqual([row["name"] for row in rows], ["a", "b"])
+        self.assertEqual([row["regression"] for row in rows], [False, True])
+
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            baseline = os.path.join(directory, "baseline.json")
+            current = os.path.join(directory, "current.json")
+            save_results(dict(income_tax_scalar=dict(min=1e-9)), baseline)
+
+            # When
+            run = CliRunner().invoke(
+                main,
+                ["run", "--name", "income_tax_scalar", "--repeat", "1"]
+                + ["--output", current],
+            )
+            compare = CliRunner().invoke(main, ["compare", baseline, current])
+
+            # Then
+            self.assertEqual(run.exit_code, 0)
+            with open(current) as f:
+                self.assertIn("income_tax_scalar", json.load(f)["results"])
+            self.assertEqual(compare.exit_code, 1)
+            self.assertIn("REGRESSION", compare.output)
@@ -0,0 +1,103 @@
+from unittest import TestCase, mock
+
+import numpy as np
+from parameterized import parameterized
+
+from immo_rechner.core import cost
+from immo_rechner.core.comparison import (
+    USAGES,
+    UsageComparison,
+    compare_usages,
+    compile_usages,
+)
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+class TestCompareUsages(TestCase):
+
+    @parameterized.expand([(usage.name, usage) for usage in UsageContext])
+    def test_matches_profit_calculator(self, name, usage):
+        # Given: the usage of the input parameters does not matter
+        input_params = get_input_params(usage=usage, owner_share=0.9)
+
+        # When
+        comparison = compare_usages(input_params, n_years=30)
+
+        # Then
+        for expected_usage, columns in [
+            (UsageContext.RENTING, comparison.renting),
+            (UsageContext.OWN_USE, comparison.own_use),
+        ]:
+            expected = ProfitCalculator.from_input_params(
+                input_params.model_copy(update=dict(usage=expected_usage))
+            ).simulate_columns(n_years=30)
+            self.assertEqual(list(columns), list(expected))
+            for column, values in expected.items():
+                np.testing.assert_allclose(columns[column], values, err_msg=column)
+
+        np.testing.assert_allclose(
+            comparison.saved_rent, 12 * input_params.monthly_rent
+        )
+
+    def test_schedule_computed_once(self):
+        # When
+        with mock.patch.object(
+            cost, "AmortizationSchedule", wraps=cost.AmortizationSchedule
+        ) as schedule:
+            compiled = compile_usages(get_input_params(), n_years=20)
+
+        # Then
+        schedule.assert_called_once()
+        self.assertEqual(compiled.periodic_profit.shape, (len(USAGES), 20))
+
+    def test_break_even_year(self):
+        # Given: renting is ahead until its income tax outgrows the saved maintenance
+        input_params = get_input_params(owner_share=0.9)
+
+        # When
+        comparison = compare_usages(input_params, n_years=50)
+
+        # Then
+        cumulative_advantage = comparison.cumulative_advantage
+        year = comparison.break_even_year
+        self.assertGreater(cumulative_advantage[0], 0)
+        self.assertTrue(np.all(cumulative_advantage[: year - 1] > 0))
+        self.assertLessEqual(cumulative_advantage[year - 1], 0)
+        np.testing.assert_allclose(
+            comparison.advantage,
+            comparison.renting["cashflow"]
+            - comparison.own_use["cashflow"]
+            - comparison.saved_rent,
+        )
+        self.assertIsNone(compare_usages(input_params, n_years=10).break_even_year)
+
+    @parameterized.expand(
+        [
+            ("crossing", [1.0, -0.5, -1.0, 0.2], 3),
+            ("zero_first_year", [0.0, 1.0, -2.0, 0.5], 3),
+            ("touching_zero", [1.0, -1.0, 2.0, -1.0], None),
+            ("all_zero", [0.0, 0.0, 0.0, 0.0], None),
+        ]
+    )
+    def test_break_even_year_of_advantages(self, name, advantage, expected):
+        # Given
+        comparison = UsageComparison(
+            renting=dict(year=np.arange(1, 5), cashflow=np.array(advantage)),
+            own_use=dict(year=np.arange(1, 5), cashflow=np.zeros(4)),
+            saved_rent=np.zeros(4),
+        )
+
+        # When, Then
+        self.assertEqual(comparison.break_even_year, expected)
+
+    def test_to_frame(self):
+        # When
+        df = compare_usages(get_input_params(), n_years=5).to_frame()
+
+        # Then
+        self.assertEqual(len(df), 5)
+        self.assertIn("renting_cashflow", df.columns)
+        self.assertIn("own_use_cashflow", df.columns)
+        self.assertEqual(df.columns[-1], "cumulative_advantage")
@@ -1,11 +1,14 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 
+import numpy as np
 from parameterized import parameterized
 
 from immo_rechner.core.cost import (
+    AmortizationSchedule,
     InterestRate,
     PurchaseSideCost,
     InstantSideCostWriteOff,
+    RefinancedAmortizationSchedule,
 )
 from immo_rechner.core.tax_contexts import UsageContext
 
@@ -28,6 +31,23 @@ class TestCosts(TestCase):
         self.assertAlmostEqual(total_cost, -9.23, places=2)
         self.assertAlmostEqual(ir.remaining_debt, 0, places=1)
 
+    def test_interest_rate_stops_after_payoff(self):
+        # Given
+        ir = InterestRate(
+            usage=UsageContext.RENTING,
+            yearly_rate=0.03,
+            repayment_amount=2_000,
+            initial_debt=50_000,
+        )
+
+        # When
+        costs = [ir.evaluate() for _ in range(5)]
+
+        # Then
+        self.assertEqual(ir.remaining_debt, 0.0)
+        self.assertEqual(costs[-1], 0.0)
+        self.assertAlmostEqual(ir.total_paid, 50_000 + ir.total_interest_cost)
+
     def test_evaluate_accusation_costs(self):
         # Given
         ac = PurchaseSideCost(
@@ -45,6 +65,145 @@ class TestCosts(TestCase):
         self.assertAlmostEqual(total_costs, -11.07 * ac.depreciation_rate)
 
 
+class TestAmortizationSchedule(TestCase):
+
+    @staticmethod
+    def get_monthly_loop(yearly_rate, repayment_amount, initial_debt, n_months):
+        remaining_debt, interest, payments, debts = initial_debt, [], [], []
+        for _ in range(n_months):
+            cost = yearly_rate / 12 * remaining_debt
+            payment = min(repayment_amount, remaining_debt + cost)
+            remaining_debt = remaining_debt + cost - payment
+            interest.append(cost)
+            payments.append(payment)
+            debts.append(remaining_debt)
+        return dict(
+            interest=np.array(interest),
+            payment=np.array(payments),
+            remaining_debt=np.array(debts),
+            total_paid=np.cumsum(payments),
+            cumulative_interest=np.cumsum(interest),
+        )
+
+    @parameterized.expand(
+        [
+            ("not_paid_off", 0.033, 1_500, 450_000),
+            ("paid_off", 0.04, 3_000, 200_000),
+            ("zero_rate", 0.0, 1_000, 100_000),
+            ("growing_debt", 0.05, 100, 100_000),
+        ]
+    )
+    def test_matches_monthly_loop(
+        self, name, yearly_rate, repayment_amount, initial_debt
+    ):
+        # When
+        schedule = AmortizationSchedule(
+            yearly_rate=yearly_rate,
+            repayment_amount=repayment_amount,
+            initial_debt=initial_debt,
+            n_years=10,
+        )
+        expected = self.get_monthly_loop(
+            yearly_rate, repayment_amount, initial_debt, n_months=120
+        )
+
+        # Then
+        monthly = schedule.get_monthly()
+        for column, values in expected.items():
+            np.testing.assert_allclose(
+                monthly[column], values, atol=1e-4, err_msg=column
+            )
+        self.assertAlmostEqual(
+            monthly["remaining_debt"][-1], expected["remaining_debt"][-1], places=4
+        )
+        self.assertTrue(np.all(monthly["remaining_debt"] >= 0.0))
+        self.assertEqual(schedule.yearly_interest.shape, (10,))
+
+        # The yearly schedule aggregates the monthly one
+        by_year = {name: values.reshape(10, 12) for (name, values) in monthly.items()}
+        np.testing.assert_allclose(
+            schedule.yearly_interest, by_year["interest"].sum(axis=-1), atol=1e-6
+        )
+        np.testing.assert_allclose(
+            schedule.yearly_remaining_debt,
+            by_year["remaining_debt"][:, -1],
+            atol=1e-6,
+        )
+        np.testing.assert_allclose(
+            schedule.yearly_total_paid, by_year["total_paid"][:, -1], atol=1e-6
+        )
+
+    def test_array_parameters(self):
+        # When
+        schedule = AmortizationSchedule(
+            yearly_rate=np.array([0.01, 0.02, 0.03]),
+            repayment_amount=np.array([500, 1_000, 1_500]),
+            initial_debt=100_000,
+            n_years=20,
+        )
+
+        # Then
+        self.assertEqual(schedule.get_monthly()["remaining_debt"].shape, (3, 240))
+        self.assertEqual(schedule.yearly_remaining_debt.shape, (3, 20))
+        np.testing.assert_allclose(
+            schedule.yearly_total_paid[:, -1],
+            100_000
+            - schedule.yearly_remaining_debt[:, -1]
+            + schedule.yearly_cumulative_interest[:, -1],
+        )
+
+    def test_chunks_give_same_schedule(self):
+        # Given
+        params = dict(
+            yearly_rate=np.linspace(0.0, 0.05, 7),
+            repayment_amount=np.linspace(500, 3_000, 7),
+            initial_debt=200_000,
+            n_years=10,
+        )
+        expected = AmortizationSchedule(**params)
+
+        # When
+        with mock.patch("immo_rechner.core.cost.MAX_CHUNK_SIZE", 240):
+            output = AmortizationSchedule(**params)
+
+        # Then
+        np.testing.assert_allclose(output.yearly_interest, expected.yearly_interest)
+        np.testing.assert_allclose(
+            output.yearly_remaining_debt, expected.yearly_remaining_debt
+        )
+
+    def test_refinanced_schedule_with_constant_rate(self):
+        # Given
+        expected = AmortizationSchedule(
+            yearly_rate=np.array([0.02, 0.04]),
+            repayment_amount=1_200,
+            initial_debt=250_000,
+            n_years=25,
+        )
+
+        # When
+        output = RefinancedAmortizationSchedule(
+            period_rates=np.array([[0.02] * 3, [0.04] * 3]),
+            repayment_amount=1_200,
+            initial_debt=250_000,
+            fixed_rate_years=10,
+            n_years=25,
+        )
+
+        # Then
+        for name in [
+            "yearly_interest",
+            "yearly_remaining_debt",
+            "yearly_total_paid",
+            "yearly_cumulative_interest",
+        ]:
+            np.testing.assert_allclose(
+                getattr(output, name), getattr(expected, name), err_msg=name
+            )
+        for name, values in expected.get_monthly().items():
+            np.testing.assert_allclose(output.get_monthly()[name], values, err_msg=name)
+
+
 class TestInstantSideCostWriteOff(TestCase):
 
     def setUp(self):
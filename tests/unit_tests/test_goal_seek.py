@@ -0,0 +1,112 @@
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from immo_rechner.core.goal_seek import goal_seek, with_value
+from immo_rechner.core.profit_calculator import InputParameters, ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+def simulate(params: InputParameters, year: int):
+    return ProfitCalculator.from_input_params(params).simulate_columns(n_years=year)
+
+
+class TestGoalSeek(TestCase):
+
+    @parameterized.expand(
+        [
+            ("repayment_renting", "repayment_amount", UsageContext.RENTING),
+            ("repayment_own_usage", "repayment_amount", UsageContext.OWN_USE),
+            ("own_capital_renting", "own_capital", UsageContext.RENTING),
+        ]
+    )
+    def test_debt_free(self, name, field, usage):
+        # Given
+        base = get_input_params(usage=usage)
+
+        # When
+        result = goal_seek(base, field=field, target="debt_free", year=15, xtol=1.0)
+
+        # Then
+        self.assertTrue(result.feasible)
+        self.assertLessEqual(result.n_evaluations, 30)
+        self.assertEqual(
+            simulate(with_value(base, field, result.value), 15)["remaining_debt"][-1],
+            0.0,
+        )
+        self.assertGreater(
+            simulate(with_value(base, field, result.value - 1.0), 15)["remaining_debt"][
+                -1
+            ],
+            0.0,
+        )
+
+    def test_non_negative_cashflow(self):
+        # Given
+        base = get_input_params(monthly_rent=1_200)
+
+        # When
+        result = goal_seek(
+            base, field="repayment_amount", target="non_negative_cashflow", year=20
+        )
+
+        # Then
+        self.assertTrue(result.feasible)
+        self.assertLessEqual(result.n_evaluations, 30)
+        self.assertGreaterEqual(result.margin, 0.0)
+        self.assertGreaterEqual(
+            simulate(with_value(base, "repayment_amount", result.value), 20)[
+                "cashflow"
+            ].min(),
+            0.0,
+        )
+        self.assertLess(
+            simulate(with_value(base, "repayment_amount", result.value - 1.0), 20)[
+                "cashflow"
+            ].min(),
+            0.0,
+        )
+
+    def test_infeasible(self):
+        # Given: without rent the facility costs are a loss, even without debt
+        base = get_input_params(
+            monthly_rent=0, facility_monthly_cost=2_000, owner_share=1.0
+        )
+
+        # When
+        result = goal_seek(
+            base, field="own_capital", target="non_negative_cashflow", year=10
+        )
+
+        # Then
+        self.assertFalse(result.feasible)
+        self.assertIsNone(result.value)
+        self.assertEqual(result.n_evaluations, 1)
+
+    def test_lower_bound_already_meets_target(self):
+        # When
+        result = goal_seek(
+            get_input_params(),
+            field="repayment_amount",
+            target="debt_free",
+            year=30,
+            low=5_000,
+        )
+
+        # Then
+        self.assertEqual(result.value, 5_000)
+
+    def test_own_capital_resolves_initial_debt(self):
+        # When
+        params = with_value(get_input_params(), "own_capital", 200_000)
+
+        # Then
+        self.assertEqual(params.own_capital, 200_000)
+        self.assertLess(params.initial_debt, 450_000)
+
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            goal_seek(
+                get_input_params(), field="repayment_amount", target="rich", year=10
+            )
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+from unittest import TestCase
+
+from parameterized import parameterized
+
+# Seconds for importing a module in a fresh interpreter. Importing pandas alone takes
+# about as long, so the budget fails if it comes back to the import path.
+IMPORT_TIME_BUDGET = 0.6
+HEAVY_MODULES = ["pandas", "plotly", "dash", "matplotlib", "numba"]
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps(dict(duration=duration, modules=sorted(sys.modules))))
+"""
+
+
+def import_in_subprocess(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestImportTime(TestCase):
+
+    @parameterized.expand(
+        [
+            ("profit_calculator", "immo_rechner.core.profit_calculator"),
+            ("batch", "immo_rechner.core.batch"),
+            ("cache", "immo_rechner.core.cache"),
+            ("sweep", "immo_rechner.core.sweep"),
+            ("monte_carlo", "immo_rechner.core.monte_carlo"),
+            ("batch_cli", "immo_rechner.cli.batch"),
+        ]
+    )
+    def test_import_is_light(self, name, module):
+        # When
+        result = import_in_subprocess(module)
+
+        # Then
+        loaded = {name.split(".")[0] for name in result["modules"]}
+        self.assertFalse(loaded.intersection(HEAVY_MODULES))
+        duration = result["duration"]
+        for _ in range(2):  # Retries to be robust against a busy machine
+            if duration < IMPORT_TIME_BUDGET:
+                break
+            duration = min(duration, import_in_subprocess(module)["duration"])
+        self.assertLess(duration, IMPORT_TIME_BUDGET)
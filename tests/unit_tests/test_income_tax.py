@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+import numpy as np
+from parameterized import parameterized
+
+from immo_rechner.core.income_tax import (
+    IncomeTaxTariff,
+    get_available_tax_years,
+    get_yearly_income_tax,
+)
+
+
+def get_yearly_income_tax_2024(taxable_income: float) -> float:
+    if 277_826 <= taxable_income:
+        return 0.45 * taxable_income - 18_936.88
+    elif 66_761 <= taxable_income < 277_826:
+        return 0.42 * taxable_income - 10_602.13
+    elif 17_006 <= taxable_income < 66_761:
+        z = (taxable_income - 17_005) / 10_000
+        return (181.19 * z + 2397) * z + 1025.38
+    elif 11_605 <= taxable_income < 17_006:
+        z = (taxable_income - 11_605) / 10_000
+        return (922.98 * z + 1400) * z
+    return 0.0
+
+
+class TestIncomeTaxTariff(TestCase):
+
+    def test_available_tax_years(self):
+        self.assertTrue({2024, 2025, 2026}.issubset(get_available_tax_years()))
+
+    def test_matches_2024_formula(self):
+        # Given
+        taxable_income = np.linspace(-1_000, 400_000, 10_001)
+
+        # When
+        output = IncomeTaxTariff.from_tax_year(2024)(taxable_income)
+
+        # Then
+        expected = [get_yearly_income_tax_2024(x) for x in taxable_income]
+        np.testing.assert_allclose(output, expected)
+
+    @parameterized.expand([(year,) for year in [2024, 2025, 2026]])
+    def test_continuous_and_increasing(self, tax_year):
+        # Given
+        tariff = IncomeTaxTariff.from_tax_year(tax_year)
+
+        # When
+        output = tariff(np.arange(0, 300_000, 1.0))
+
+        # Then
+        self.assertTrue(np.all(np.diff(output) >= 0.0))
+        self.assertLess(np.max(np.diff(output)), 1.0)
+
+    @parameterized.expand(
+        [
+            ("2025_basic_allowance", 2025, 12_096, 0),
+            ("2025_zone_4", 2025, 100_000, 31_088),
+            ("2026_zone_3", 2026, 40_000, 7_209),
+        ]
+    )
+    def test_exact(self, name, tax_year, taxable_income, expected):
+        # When
+        output = IncomeTaxTariff.from_tax_year(tax_year).exact(taxable_income + 0.99)
+
+        # Then
+        self.assertEqual(output, expected)
+
+    def test_lookup_table(self):
+        # Given
+        tariff = IncomeTaxTariff.from_tax_year(2025)
+        table = tariff.get_lookup_table(max_income=100_000)
+        taxable_income = np.array([-10.0, 0.0, 15_000.5, 99_999.9, 250_000.3])
+
+        # When
+        output = table(taxable_income)
+
+        # Then
+        np.testing.assert_array_equal(output, tariff.exact(taxable_income))
+
+    def test_mixed_tax_years(self):
+        # When
+        output = get_yearly_income_tax(
+            np.array([50_000.0, 50_000.0]), tax_year=np.array([2024, 2026])
+        )
+
+        # Then
+        self.assertAlmostEqual(output[0], IncomeTaxTariff.from_tax_year(2024)(50_000))
+        self.assertAlmostEqual(output[1], IncomeTaxTariff.from_tax_year(2026)(50_000))
+
+    def test_unknown_tax_year(self):
+        with self.assertRaises(ValueError):
+            IncomeTaxTariff.from_tax_year(1990)
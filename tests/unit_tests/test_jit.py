@@ -0,0 +1,140 @@
+import os
+from unittest import TestCase, mock
+
+import numpy as np
+from parameterized import parameterized
+
+from immo_rechner.core import jit
+from immo_rechner.core.batch import BatchProfitCalculator
+from immo_rechner.core.jit import NUMBA_CACHE_DIR_ENV
+from immo_rechner.core.kernel import JIT_MIN_SCENARIOS, KERNEL_ENV, get_kernel
+from immo_rechner.core.monte_carlo import MonteCarloParameters, simulate_monte_carlo
+from immo_rechner.core.profit_calculator import (
+    ProfitCalculator,
+    get_simulation_columns,
+)
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import COMPARED_COLUMNS, get_input_params
+
+
+def get_scenarios(usage):
+    # Including loans paid off within the horizon, a zero rate and other tax years
+    return [
+        get_input_params(usage=usage, repayment_amount=1_000),
+        get_input_params(usage=usage, repayment_amount=6_000),
+        get_input_params(usage=usage, yearly_interest_rate=0.0),
+        get_input_params(usage=usage, yearly_income=20_000, tax_year=2025),
+        get_input_params(usage=usage, monthly_rent=3_000, tax_year=2026),
+    ]
+
+
+class TestLoopKernel(TestCase):
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING, False),
+            ("renting_lookup_table", UsageContext.RENTING, True),
+            ("own_usage", UsageContext.OWN_USE, False),
+        ]
+    )
+    def test_matches_profit_calculator(self, name, usage, use_lookup_table):
+        # Given
+        input_params = get_scenarios(usage)
+        calculator = BatchProfitCalculator.from_input_params(
+            input_params, use_lookup_table=use_lookup_table
+        )
+
+        # When: the loop kernel, compiled if numba is installed
+        result = calculator.postprocess_simulation(
+            years=np.arange(1, 31),
+            columns=get_simulation_columns(calculator.simulate_loop(n_years=30)),
+        )
+
+        # Then: the exact tax of the lookup table is compared to the NumPy kernel
+        expected = BatchProfitCalculator.from_input_params(
+            input_params, use_lookup_table=use_lookup_table, kernel="numpy"
+        ).simulate(n_years=30)
+        for index, params in enumerate(input_params):
+            if not use_lookup_table:
+                expected_scenario = ProfitCalculator.from_input_params(params).simulate(
+                    n_years=30
+                )
+            else:
+                expected_scenario = expected.scenario(index)
+
+            for column in COMPARED_COLUMNS:
+                np.testing.assert_allclose(
+                    result[column][index],
+                    expected_scenario[column],
+                    rtol=1e-9,
+                    atol=1e-6,
+                    err_msg=column,
+                )
+
+    def test_monte_carlo(self):
+        # Given: refinanced rates and stochastic rent and appreciation
+        mc_params = MonteCarloParameters(n_paths=300, seed=3, fixed_rate_years=5)
+
+        # When
+        results = {
+            kernel: simulate_monte_carlo(
+                get_input_params(),
+                mc_params.model_copy(update=dict(kernel=kernel)),
+                n_years=25,
+            )
+            for kernel in ["numpy", "numba"]
+        }
+
+        # Then
+        for column in COMPARED_COLUMNS:
+            np.testing.assert_allclose(
+                results["numba"][column],
+                results["numpy"][column],
+                rtol=1e-9,
+                atol=1e-6,
+                err_msg=column,
+            )
+
+
+class TestGetKernel(TestCase):
+
+    def test_get_kernel(self):
+        with mock.patch.dict(os.environ, clear=True), mock.patch(
+            "immo_rechner.core.kernel.is_numba_available", return_value=True
+        ):
+            self.assertEqual(get_kernel(JIT_MIN_SCENARIOS - 1), "numpy")
+            self.assertEqual(get_kernel(JIT_MIN_SCENARIOS), "numba")
+            self.assertEqual(get_kernel(1, kernel="numba"), "numba")
+            self.assertEqual(get_kernel(10**6, kernel="numpy"), "numpy")
+
+            with mock.patch.dict(os.environ, {KERNEL_ENV: "numpy"}):
+                self.assertEqual(get_kernel(10**6), "numpy")
+
+            with self.assertRaises(ValueError):
+                get_kernel(1, kernel="fortran")
+
+    def test_without_numba(self):
+        with mock.patch(
+            "immo_rechner.core.kernel.is_numba_available", return_value=False
+        ):
+            self.assertEqual(get_kernel(10**6, kernel="numba"), "numpy")
+
+
+class TestNjit(TestCase):
+
+    def test_cache_only_with_cache_dir(self):
+        # Given
+        func = mock.Mock()
+
+        for environ, cache in [
+            ({}, False),
+            ({NUMBA_CACHE_DIR_ENV: "/tmp/numba"}, True),
+        ]:
+            with mock.patch.dict(os.environ, environ, clear=True), mock.patch.object(
+                jit, "numba"
+            ) as numba:
+                # When
+                jit.njit(func)
+
+                # Then
+                numba.njit.assert_called_once_with(cache=cache)
@@ -0,0 +1,147 @@
+from unittest import TestCase
+
+import numpy as np
+from parameterized import parameterized
+
+from immo_rechner.core.abstract_position import AbstractPosition
+from immo_rechner.core.cost import InstantSideCostWriteOff, InterestRate
+from immo_rechner.core.hypothetical_positions import HypotheticalAppreciation
+from immo_rechner.core.kernel import compile_positions
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+def get_profit_calculator(usage):
+    return ProfitCalculator.from_input_params(get_input_params(usage=usage))
+
+
+class TestCompiledPositions(TestCase):
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING),
+            ("own_usage", UsageContext.OWN_USE),
+        ]
+    )
+    def test_matches_yearly_evaluation(self, name, usage):
+        # Given
+        pc = get_profit_calculator(usage)
+        expected = np.array([pc.evaluate_year() for _ in range(30)])
+
+        # When
+        output = get_profit_calculator(usage).simulate_columns(n_years=30)
+
+        # Then
+        for index, column in enumerate(
+            ["cashflow", "profit_before_taxes", "income_tax"]
+        ):
+            np.testing.assert_allclose(output[column], expected[:, index], atol=1e-6)
+
+    def test_constant_positions_are_folded(self):
+        # Given
+        pc = get_profit_calculator(UsageContext.RENTING)
+
+        # When
+        kernel = compile_positions(
+            pc.positions, interest_rate_position=pc.interest_rate_position, n_years=10
+        )
+
+        # Then
+        self.assertEqual(kernel.constant_profit.shape, ())
+        self.assertEqual(kernel.periodic_profit.shape, (10,))
+        self.assertFalse(hasattr(kernel, "__dict__"))
+        np.testing.assert_allclose(
+            kernel.periodic_cashflow, -kernel.interest_cost, atol=1e-9
+        )
+
+    @parameterized.expand(
+        [
+            (
+                "appreciation",
+                lambda: HypotheticalAppreciation(
+                    appreciation_rate=np.array([0.02, 0.05]),
+                    initial_price=300_000,
+                    usage=UsageContext.OWN_USE,
+                ),
+            ),
+            (
+                "side_cost_write_off",
+                lambda: InstantSideCostWriteOff(
+                    usage=UsageContext.OWN_USE, purchase_price=np.array([1e5, 2e5])
+                ),
+            ),
+            (
+                "interest_rate",
+                lambda: InterestRate(
+                    usage=UsageContext.RENTING,
+                    yearly_rate=np.array([0.01, 0.04]),
+                    repayment_amount=1_000,
+                    initial_debt=200_000,
+                ),
+            ),
+        ]
+    )
+    def test_evaluate_years_matches_evaluate(self, name, get_position):
+        # When
+        output = get_position().evaluate_years(12)
+
+        # Then
+        expected = AbstractPosition.evaluate_years(get_position(), 12)
+        self.assertEqual(output.shape, (2, 12))
+        np.testing.assert_allclose(output, expected)
+
+
+class TestMonthlyResolution(TestCase):
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING),
+            ("own_usage", UsageContext.OWN_USE),
+        ]
+    )
+    def test_aggregate_matches_yearly(self, name, usage):
+        # Given
+        pc = get_profit_calculator(usage)
+        expected = pc.simulate(n_years=30)
+
+        # When
+        monthly = pc.simulate(n_years=30, resolution="monthly")
+        output = pc.aggregate_monthly(monthly)
+
+        # Then
+        self.assertEqual(len(monthly), 360)
+        self.assertEqual(list(output.columns), list(expected.columns))
+        np.testing.assert_allclose(
+            output.to_numpy(dtype=float), expected.to_numpy(dtype=float), atol=1e-6
+        )
+
+    def test_monthly_series(self):
+        # Given
+        pc = get_profit_calculator(UsageContext.RENTING)
+
+        # When
+        output = pc.simulate_columns(n_years=2, resolution="monthly")
+
+        # Then
+        np.testing.assert_array_equal(output["month"], np.arange(1, 25))
+        np.testing.assert_array_equal(output["year"], np.repeat([1, 2], 12))
+        np.testing.assert_allclose(output["rent"], 1_200)
+        # The debt decreases every month and interest is charged on the remaining debt.
+        self.assertTrue(np.all(np.diff(output["remaining_debt"]) < 0))
+        np.testing.assert_allclose(
+            output["interest_cost"][1:],
+            output["remaining_debt"][:-1] * 0.035 / 12,
+            rtol=1e-9,
+        )
+        np.testing.assert_allclose(
+            np.cumsum(output["interest_cost"]), output["cumulative_interest_cost"]
+        )
+
+    def test_unknown_resolution(self):
+        # Given
+        pc = get_profit_calculator(UsageContext.RENTING)
+
+        # When / Then
+        with self.assertRaises(ValueError):
+            pc.simulate_columns(n_years=2, resolution="weekly")
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+import numpy as np
+from parameterized import parameterized
+from pydantic import ValidationError
+
+from immo_rechner.core.monte_carlo import MonteCarloParameters, simulate_monte_carlo
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+class TestMonteCarlo(TestCase):
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING),
+            ("own_usage", UsageContext.OWN_USE),
+        ]
+    )
+    def test_no_volatility_matches_profit_calculator(self, name, usage):
+        # Given
+        params = get_input_params(usage=usage)
+        mc_params = MonteCarloParameters(
+            n_paths=3,
+            appreciation_volatility=0.0,
+            rent_growth_rate=0.0,
+            rent_growth_volatility=0.0,
+            refinancing_rate_volatility=0.0,
+        )
+
+        # When
+        result = simulate_monte_carlo(params, mc_params, n_years=25)
+
+        # Then
+        expected = ProfitCalculator.from_input_params(params).simulate(n_years=25)
+        for column in ["cashflow", "remaining_debt", "total_paid"]:
+            np.testing.assert_allclose(
+                result[column], np.tile(expected[column].to_numpy(), (3, 1))
+            )
+
+    def test_seeded_and_independent_of_workers(self):
+        # Given
+        mc_params = MonteCarloParameters(n_paths=250, seed=42, chunk_size=100)
+
+        # When
+        first = simulate_monte_carlo(get_input_params(), mc_params, n_years=20)
+        second = simulate_monte_carlo(
+            get_input_params(), mc_params, n_years=20, n_workers=2
+        )
+
+        # Then
+        self.assertEqual(first["cashflow"].shape, (250, 20))
+        np.testing.assert_array_equal(first["cashflow"], second["cashflow"])
+        self.assertGreater(np.std(first["remaining_debt"][:, -1]), 0.0)
+
+    def test_get_percentiles(self):
+        # Given
+        result = simulate_monte_carlo(
+            get_input_params(usage=UsageContext.OWN_USE),
+            MonteCarloParameters(n_paths=200, seed=0),
+            n_years=15,
+        )
+
+        # When
+        df = result.get_percentiles()
+
+        # Then
+        self.assertEqual(len(df), 3 * 15)
+        self.assertTrue((df.p5 <= df.p50).all() and (df.p50 <= df.p95).all())
+
+    @parameterized.expand(
+        [
+            ("no_paths", dict(n_paths=0)),
+            ("no_fixed_rate_years", dict(fixed_rate_years=0)),
+            ("no_chunk_size", dict(chunk_size=0)),
+        ]
+    )
+    def test_invalid_parameters(self, name, params):
+        with self.assertRaises(ValidationError):
+            MonteCarloParameters(**params)
+
+    def test_invalid_n_years(self):
+        for n_years in [0, -1]:
+            with self.assertRaisesRegex(ValueError, "n_years"):
+                simulate_monte_carlo(
+                    get_input_params(), MonteCarloParameters(n_paths=10), n_years
+                )
@@ -0,0 +1,127 @@
+from unittest import TestCase
+
+import numpy as np
+
+from immo_rechner.core.income_tax import get_yearly_income_tax
+from immo_rechner.core.portfolio import (
+    PORTFOLIO_COLUMNS,
+    Portfolio,
+    get_acquisition_years,
+    get_random_orders,
+)
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import COMPARED_COLUMNS, get_input_params
+
+
+class TestPortfolio(TestCase):
+
+    def test_single_property_matches_profit_calculator(self):
+        # Given
+        input_params = get_input_params()
+
+        # When
+        columns = Portfolio(
+            [input_params], yearly_income=input_params.yearly_income
+        ).simulate(n_years=20)
+        expected = ProfitCalculator.from_input_params(input_params).simulate_columns(
+            n_years=20
+        )
+
+        # Then
+        self.assertEqual(list(columns), ["year"] + PORTFOLIO_COLUMNS)
+        for name in COMPARED_COLUMNS:
+            np.testing.assert_allclose(columns[name], expected[name], err_msg=name)
+        np.testing.assert_allclose(
+            columns["separate_income_tax"], columns["income_tax"]
+        )
+
+    def test_joint_income_tax(self):
+        # Given
+        properties = [
+            get_input_params(monthly_rent=rent, repayment_amount=1_000)
+            for rent in [1_500, 2_000, 2_500]
+        ] + [get_input_params(usage=UsageContext.OWN_USE)]
+        properties = [
+            p.model_copy(update=dict(yearly_income=40_000)) for p in properties
+        ]
+        separate = [
+            ProfitCalculator.from_input_params(p).simulate_columns(n_years=10)
+            for p in properties
+        ]
+
+        # When
+        columns = Portfolio(properties, yearly_income=40_000).simulate(n_years=10)
+
+        # Then: in the progressive zone, the combined profit is taxed higher
+        taxable_profit = sum(c["profit_before_taxes"] for c in separate[:3])
+        expected_tax = get_yearly_income_tax(40_000 + taxable_profit) - (
+            get_yearly_income_tax(40_000)
+        )
+        np.testing.assert_allclose(columns["income_tax"], expected_tax)
+        np.testing.assert_allclose(
+            columns["separate_income_tax"], sum(c["income_tax"] for c in separate)
+        )
+        self.assertTrue(np.all(columns["income_tax"] > columns["separate_income_tax"]))
+        np.testing.assert_allclose(
+            columns["cashflow"],
+            sum(c["cashflow"] + c["income_tax"] for c in separate)
+            - columns["income_tax"],
+        )
+        np.testing.assert_allclose(
+            columns["remaining_debt"], sum(c["remaining_debt"] for c in separate)
+        )
+
+    def test_acquisition_years(self):
+        # Given
+        properties = [get_input_params(), get_input_params(purchase_price=500_000)]
+        portfolio = Portfolio(properties, yearly_income=80_000)
+        separate = portfolio.simulate_properties(n_years=10)
+
+        # When
+        columns = portfolio.simulate(n_years=10, acquisition_years=[1, 4])
+
+        # Then
+        np.testing.assert_allclose(
+            columns["remaining_debt"][:3], separate["remaining_debt"][0, :3]
+        )
+        np.testing.assert_allclose(
+            columns["remaining_debt"][3:],
+            separate["remaining_debt"][0, 3:] + separate["remaining_debt"][1, :7],
+        )
+        np.testing.assert_allclose(
+            portfolio.simulate(n_years=10, acquisition_years=[1, 11])["total_paid"],
+            separate["total_paid"][0],
+        )
+
+    def test_sweep_orders(self):
+        # Given
+        properties = [
+            get_input_params(purchase_price=price, monthly_rent=price / 250)
+            for price in [250_000, 300_000, 400_000, 600_000]
+        ]
+        portfolio = Portfolio(properties, yearly_income=60_000)
+        orders = get_random_orders(n_orders=6, n_properties=4, seed=1)
+        acquisition_years = get_acquisition_years(orders, slots=[1, 3, 5, 7])
+
+        # When
+        result = portfolio.sweep_orders(n_years=15, acquisition_years=acquisition_years)
+
+        # Then
+        self.assertEqual(result.n_scenarios, 6)
+        self.assertEqual(result["cashflow"].shape, (6, 15))
+        for index, order in enumerate(orders):
+            self.assertEqual(acquisition_years[index, order[2]], 5)
+            expected = portfolio.simulate(15, acquisition_years[index])
+            for name in PORTFOLIO_COLUMNS:
+                np.testing.assert_allclose(result[name][index], expected[name])
+
+    def test_invalid_acquisition_years(self):
+        portfolio = Portfolio([get_input_params()], yearly_income=80_000)
+
+        with self.assertRaises(ValueError):
+            portfolio.simulate(n_years=10, acquisition_years=[1, 2])
+        with self.assertRaises(ValueError):
+            portfolio.simulate(n_years=10, acquisition_years=[0])
+        with self.assertRaises(ValueError):
+            Portfolio([], yearly_income=80_000)
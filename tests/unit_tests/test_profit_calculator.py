@@ -1,15 +1,21 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase, mock
 
+import numpy as np
 from parameterized import parameterized
+from pydantic import ValidationError
 
 from immo_rechner.core.cost import PurchaseCost, BuildingMaintenance, InterestRate
 from immo_rechner.core.profit_calculator import (
+    CompiledCalculator,
     ProfitCalculator,
     YearlySummary,
     InputParameters,
 )
 from immo_rechner.core.revenue import RentIncome
 from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
 
 
 def get_positions(
@@ -166,7 +172,7 @@ class TestProfitCalculator(TestCase):
     ):
         # Given
         pc = ProfitCalculator(positions=positions, yearly_income=100_000, own_capital=0)
-        mock_tax.side_effect = lambda x: 0.2 * x
+        mock_tax.side_effect = lambda x, tax_year: 0.2 * x
 
         # When
         output = pc.yearly_simulation()
@@ -229,7 +235,7 @@ class TestProfitCalculator(TestCase):
     def test_from_raw_data(self, mock_tax):
         # Given
         pc = self.get_profit_calculator()
-        mock_tax.side_effect = lambda x: 0.2 * x
+        mock_tax.side_effect = lambda x, tax_year: 0.2 * x
 
         expected_output = YearlySummary(
             profit_before_taxes=-1777.12, income_tax=-355.424, cashflow=355.424
@@ -255,6 +261,91 @@ class TestProfitCalculator(TestCase):
         # Then
         self.assertEqual(output_pd.shape[0], 10)
 
+    def test_simulate_matches_yearly_simulation(self):
+        # Given
+        pc = self.get_profit_calculator()
+        expected = [pc.yearly_simulation() for _ in range(5)]
+
+        # When
+        output = YearlySummary.from_simulation(
+            self.get_profit_calculator().simulate(n_years=5)
+        )
+
+        # Then
+        self.assertEqual(output, expected)
+
+    def test_simulate_chunks(self):
+        # Given
+        pc = self.get_profit_calculator()
+
+        # When
+        chunks = list(pc.simulate_chunks(n_years=12, chunk_years=5))
+
+        # Then
+        expected = pc.simulate_columns(n_years=12)
+        self.assertEqual([len(chunk["year"]) for chunk in chunks], [5, 5, 2])
+        for name, values in expected.items():
+            np.testing.assert_allclose(
+                np.concatenate([chunk[name] for chunk in chunks]), values, err_msg=name
+            )
+
+    def test_simulate_iter(self):
+        # Given
+        pc = self.get_profit_calculator()
+        expected = pc.simulate(n_years=7)
+
+        # When
+        records = list(pc.simulate_iter(n_years=7, chunk_years=3))
+
+        # Then
+        self.assertEqual([r["year"] for r in records], list(range(1, 8)))
+        for name in expected.columns:
+            np.testing.assert_allclose(
+                [r[name] for r in records], expected[name], err_msg=name
+            )
+
+    def test_simulate_iter_early_exit(self):
+        # Given
+        pc = ProfitCalculator.from_input_params(get_input_params())
+        expected = pc.simulate(n_years=40)
+        payoff_year = expected.year[expected.remaining_debt <= 0].iloc[0]
+
+        # When: without a horizon
+        with mock.patch.object(
+            pc, "compile_calculator", wraps=pc.compile_calculator
+        ) as compile_calculator:
+            year = next(
+                r["year"]
+                for r in pc.simulate_iter(chunk_years=4)
+                if r["remaining_debt"] <= 0
+            )
+
+        # Then: the horizon doubles until the payoff year
+        self.assertEqual(year, payoff_year)
+        self.assertEqual(
+            [c.args[0] for c in compile_calculator.call_args_list], [4, 8, 16, 32]
+        )
+
+    def test_simulate_chunks_raise_error(self):
+        with self.assertRaises(ValueError):
+            next(self.get_profit_calculator().simulate_chunks(chunk_years=0))
+
+    def test_input_parameters_raise_error_for_unknown_tax_year(self):
+        # When, Then
+        with self.assertRaisesRegex(ValidationError, "Tax year 2030 is not available"):
+            InputParameters(
+                usage=UsageContext.RENTING,
+                yearly_income=50_000,
+                monthly_rent=1_000,
+                facility_monthly_cost=200.0,
+                owner_share=0.5,
+                repayment_amount=1_000,
+                yearly_interest_rate=0.03,
+                initial_debt=100_000,
+                purchase_price=120_000,
+                tax_year=2030,
+            )
+
     def test_get_own_usage_positions(self):
         # Given
         params = InputParameters(
@@ -286,3 +377,74 @@ class TestProfitCalculator(TestCase):
         # Then
         self.assertAlmostEqual(output.profit_before_taxes, 11600)
         self.assertAlmostEqual(output.cashflow, -2400)
+
+
+class TestCompiledCalculator(TestCase):
+
+    def test_simulate_twice(self):
+        # Given: positions which step through evaluate, after some yearly simulations
+        pc = ProfitCalculator.from_input_params(
+            get_input_params(usage=UsageContext.OWN_USE)
+        )
+        expected = pc.simulate_columns(n_years=12)
+        for _ in range(3):
+            pc.yearly_simulation()
+
+        # When
+        output = pc.simulate_columns(n_years=12)
+
+        # Then
+        for name, values in expected.items():
+            np.testing.assert_array_equal(output[name], values)
+
+    def test_immutable(self):
+        # Given
+        calculator = CompiledCalculator.from_input_params(
+            get_input_params(usage=UsageContext.OWN_USE), n_years=10
+        )
+
+        # Then
+        with self.assertRaises(AttributeError):
+            calculator.yearly_income = 0
+        with self.assertRaises(AttributeError):
+            calculator.compiled.n_years = 5
+        with self.assertRaises(ValueError):
+            calculator.compiled.remaining_debt[..., 0] = 0.0
+
+        output = calculator.simulate_columns()
+        output["cashflow"][0] = 0.0  # Outputs are new arrays
+        self.assertNotEqual(calculator.simulate_columns()["cashflow"][0], 0.0)
+
+        copied = pickle.loads(pickle.dumps(calculator))
+        np.testing.assert_array_equal(
+            copied.simulate_columns()["cashflow"],
+            calculator.simulate_columns()["cashflow"],
+        )
+
+    @parameterized.expand(
+        [
+            ("renting", UsageContext.RENTING, "yearly"),
+            ("own_usage_monthly", UsageContext.OWN_USE, "monthly"),
+        ]
+    )
+    def test_concurrent_simulations(self, name, usage, resolution):
+        # Given
+        input_params = get_input_params(usage=usage)
+        calculator = CompiledCalculator.from_input_params(
+            input_params, n_years=20, resolution=resolution
+        )
+        expected = ProfitCalculator.from_input_params(input_params).simulate_columns(
+            n_years=20, resolution=resolution
+        )
+
+        # When
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(
+                executor.map(lambda _: calculator.simulate_columns(), range(64))
+            )
+
+        # Then
+        self.assertEqual(calculator.resolution, resolution)
+        for output in outputs:
+            for column, values in expected.items():
+                np.testing.assert_array_equal(output[column], values)
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import numpy as np
+
+from immo_rechner.core.profit_calculator import ProfitCalculator
+from immo_rechner.core.sweep import sweep
+from immo_rechner.core.tax_contexts import UsageContext
+from tests.unit_tests.utils import get_input_params
+
+
+class TestSweep(TestCase):
+
+    def setUp(self):
+        self.params = dict(
+            initial_debt=0.0,  # Computed from own_capital
+            own_capital=50_000,
+        )
+        self.base = get_input_params(**self.params)
+
+    def test_sweep_matches_profit_calculator(self):
+        # Given
+        grid = dict(
+            yearly_interest_rate=[0.01, 0.03, 0.05],
+            repayment_amount=[1_000, 2_000],
+            purchase_price=[300_000, 400_000],
+            own_capital=[0, 100_000],
+        )
+
+        # When
+        result = sweep(self.base, grid, n_years=10)
+
+        # Then
+        self.assertEqual(result.shape, (3, 2, 2, 2))
+        self.assertEqual(result["cashflow"].shape, (3, 2, 2, 2, 10))
+
+        params = dict(
+            self.params,
+            yearly_interest_rate=0.05,
+            repayment_amount=1_000,
+            purchase_price=400_000,
+            own_capital=100_000,
+        )
+        expected = ProfitCalculator.from_input_params(
+            get_input_params(**params)
+        ).simulate(n_years=10)
+        np.testing.assert_allclose(
+            result["cashflow"][2, 0, 1, 1], expected.cashflow.to_numpy()
+        )
+        np.testing.assert_allclose(
+            result.at_year("remaining_debt", 10)[2, 0, 1, 1],
+            expected.remaining_debt.iloc[-1],
+        )
+
+    def test_sweep_keep_initial_debt(self):
+        # When
+        result = sweep(
+            self.base,
+            dict(purchase_price=[300_000, 400_000]),
+            n_years=1,
+            keep="initial_debt",
+        )
+
+        # Then
+        np.testing.assert_allclose(
+            result["remaining_debt"][0], result["remaining_debt"][1]
+        )
+
+    def test_sweep_float32(self):
+        # Given
+        grid = dict(
+            yearly_interest_rate=[0.01, 0.03, 0.05], repayment_amount=[1_000, 2_000]
+        )
+        expected = sweep(self.base, grid, n_years=10)
+
+        # When
+        result = sweep(self.base, grid, n_years=10, dtype=np.float32, chunk_size=4)
+
+        # Then
+        self.assertEqual(result["cashflow"].shape, (3, 2, 10))
+        self.assertEqual(result["cashflow"].dtype, np.float32)
+        np.testing.assert_allclose(
+            result["remaining_debt"], expected["remaining_debt"], rtol=1e-6
+        )
+
+    def test_to_frame(self):
+        # When
+        df = sweep(
+            self.base,
+            dict(yearly_interest_rate=[0.01, 0.02], repayment_amount=[1_000, 2_000]),
+            n_years=5,
+        ).to_frame()
+
+        # Then
+        self.assertEqual(len(df), 2 * 2 * 5)
+        self.assertEqual(
+            df[["yearly_interest_rate", "repayment_amount", "year"]].iloc[5].tolist(),
+            [0.01, 2_000, 1],
+        )
+
+    def test_sweep_raise_error_for_unknown_field(self):
+        with self.assertRaises(ValueError):
+            sweep(self.base, dict(usage=[UsageContext.OWN_USE]), n_years=5)
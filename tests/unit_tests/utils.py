@@ -0,0 +1,30 @@
+from immo_rechner.core.profit_calculator import InputParameters
+from immo_rechner.core.tax_contexts import UsageContext
+
+COMPARED_COLUMNS = [
+    "cashflow",
+    "profit_before_taxes",
+    "income_tax",
+    "remaining_debt",
+    "cumulative_interest_cost",
+    "yearly_interest_cost",
+    "total_paid",
+    "tax_benefit",
+]
+
+
+def get_input_params(usage=UsageContext.RENTING, **kwargs):
+    params = dict(
+        usage=usage,
+        yearly_income=80_000,
+        monthly_rent=1_200,
+        facility_monthly_cost=300.0,
+        owner_share=0.5,
+        repayment_amount=1_500,
+        yearly_interest_rate=0.035,
+        initial_debt=300_000,
+        depreciation_rate=0.02,
+        purchase_price=350_000,
+    )
+    params.update(kwargs)
+    return InputParameters(**params)